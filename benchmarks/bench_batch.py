@@ -0,0 +1,66 @@
+"""N single task calls vs one /tasks/batch call (create, complete, delete).
+
+Usage: python -m benchmarks.bench_batch --items 1000
+"""
+import argparse
+import os
+import tempfile
+import time
+import uuid
+from pathlib import Path
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--items", type=int, default=1000)
+    args = parser.parse_args()
+
+    db_path = Path(tempfile.mkdtemp()) / "bench_batch.db"
+    os.environ["DATABASE_URL"] = f"sqlite:///{db_path.as_posix()}"
+    os.environ.setdefault("SECRET_KEY", "bench-secret")
+    os.environ.setdefault("RATE_LIMIT_ENABLED", "false")
+    os.environ.setdefault("TASK_BATCH_MAX_ITEMS", str(args.items))
+
+    from fastapi.testclient import TestClient
+    from python_api.main import app
+    from python_api.database import create_schema
+
+    create_schema()
+    client = TestClient(app)
+    email = f"bench_{uuid.uuid4().hex[:8]}@example.com"
+    client.post("/auth/register", json={"email": email, "password": "password123"})
+    token = client.post("/auth/login", data={"username": email, "password": "password123"}).json()["accessToken"]
+    headers = {"Authorization": f"Bearer {token}"}
+
+    def timed(fn):
+        t0 = time.perf_counter()
+        result = fn()
+        return time.perf_counter() - t0, result
+
+    n = args.items
+    single_create, ids = timed(lambda: [
+        client.post("/tasks/", json={"title": f"Task {i}"}, headers=headers).json()["id"] for i in range(n)
+    ])
+    single_complete, _ = timed(lambda: [client.patch(f"/tasks/{i}/complete", headers=headers) for i in ids])
+    single_delete, _ = timed(lambda: [client.delete(f"/tasks/{i}", headers=headers) for i in ids])
+
+    batch_create, r = timed(lambda: client.post(
+        "/tasks/batch", json={"tasks": [{"title": f"Task {i}"} for i in range(n)]}, headers=headers
+    ))
+    ids = [item["id"] for item in r.json()["results"]]
+    batch_complete, _ = timed(lambda: client.patch(
+        "/tasks/batch", json={"tasks": [{"id": i, "status": "completed"} for i in ids]}, headers=headers
+    ))
+    batch_delete, _ = timed(lambda: client.request("DELETE", "/tasks/batch", json={"ids": ids}, headers=headers))
+
+    print(f"{'operation':<10} {'single s':>10} {'batch s':>10} {'speedup':>8}")
+    for name, single, batch in (
+        ("create", single_create, batch_create),
+        ("complete", single_complete, batch_complete),
+        ("delete", single_delete, batch_delete),
+    ):
+        print(f"{name:<10} {single:>10.3f} {batch:>10.3f} {single / batch:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""Incremental sync via GET /tasks/changes vs re-downloading every page of GET /tasks.
+
+A client that is in sync fetches what changed after --changed task updates
+(plus one delete), once through the change feed and once by paging the whole
+task list with cursors, as clients without the feed have to.
+
+Usage: python -m benchmarks.bench_changes --tasks 10000 --changed 50
+"""
+import argparse
+import os
+import statistics
+import tempfile
+import time
+import uuid
+from pathlib import Path
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--tasks", type=int, default=10_000)
+    parser.add_argument("--changed", type=int, default=50)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    db_path = Path(tempfile.mkdtemp()) / "bench_changes.db"
+    os.environ["DATABASE_URL"] = f"sqlite:///{db_path.as_posix()}"
+    os.environ.setdefault("SECRET_KEY", "bench-secret")
+    os.environ.setdefault("RATE_LIMIT_ENABLED", "false")
+
+    from fastapi.testclient import TestClient
+    from python_api.main import app
+    from python_api.database import create_schema
+
+    create_schema()
+    client = TestClient(app)
+    email = f"bench_{uuid.uuid4().hex[:8]}@example.com"
+    client.post("/auth/register", json={"email": email, "password": "password123"})
+    token = client.post("/auth/login", data={"username": email, "password": "password123"}).json()["accessToken"]
+    headers = {"Authorization": f"Bearer {token}"}
+
+    # Through the API, so every task has its change log entry
+    body = "".join(f'{{"title": "Task {i}"}}\n' for i in range(args.tasks))
+    client.post("/tasks/import", content=body, headers={**headers, "Content-Type": "application/x-ndjson"})
+    # Catch up with the feed, as a synced client would have
+    since, has_more = 0, True
+    while has_more:
+        page = client.get("/tasks/changes", params={"since": since, "limit": 1000}, headers=headers).json()
+        since, has_more = page["nextSince"], page["hasMore"]
+
+    ids = [task["id"] for task in client.get("/tasks/", params={"limit": 100}, headers=headers).json()["tasks"]]
+    for task_id in ids[1:args.changed + 1]:
+        client.put(f"/tasks/{task_id}", json={"title": "Changed"}, headers=headers)
+    client.delete(f"/tasks/{ids[0]}", headers=headers)
+
+    def feed():
+        r = client.get("/tasks/changes", params={"since": since, "limit": 1000}, headers=headers)
+        return len(r.content)
+
+    def full_download():
+        size, params = 0, {"limit": 100}
+        while True:
+            r = client.get("/tasks/", params=params, headers=headers)
+            size += len(r.content)
+            cursor = r.json()["pagination"]["nextCursor"]
+            if cursor is None:
+                return size
+            params = {"limit": 100, "cursor": cursor}
+
+    def timed(fn):
+        samples = []
+        for _ in range(args.repeat):
+            t0 = time.perf_counter()
+            size = fn()
+            samples.append((time.perf_counter() - t0) * 1000)
+        return statistics.median(samples), size
+
+    print(f"{'sync':<28} {'median ms':>10} {'bytes':>12}")
+    for name, fn in (("GET /tasks/changes", feed), ("GET /tasks (every page)", full_download)):
+        ms, size = timed(fn)
+        print(f"{name:<28} {ms:>10.2f} {size:>12}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+"""Rows per second for POST /tasks/import with a streamed NDJSON body.
+
+Usage: python -m benchmarks.bench_import --rows 200000
+"""
+import argparse
+import json
+import os
+import tempfile
+import time
+import uuid
+from pathlib import Path
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--chunk-rows", type=int, default=None, help="Override TASK_IMPORT_CHUNK_ROWS")
+    args = parser.parse_args()
+
+    db_path = Path(tempfile.mkdtemp()) / "bench_import.db"
+    os.environ["DATABASE_URL"] = f"sqlite:///{db_path.as_posix()}"
+    os.environ.setdefault("SECRET_KEY", "bench-secret")
+    os.environ.setdefault("RATE_LIMIT_ENABLED", "false")
+    if args.chunk_rows:
+        os.environ["TASK_IMPORT_CHUNK_ROWS"] = str(args.chunk_rows)
+
+    from fastapi.testclient import TestClient
+    from python_api.main import app
+    from python_api.database import create_schema
+
+    create_schema()
+    client = TestClient(app)
+    email = f"bench_{uuid.uuid4().hex[:8]}@example.com"
+    client.post("/auth/register", json={"email": email, "password": "password123"})
+    token = client.post("/auth/login", data={"username": email, "password": "password123"}).json()["accessToken"]
+
+    def body():
+        # Generated lazily, 1000 lines per chunk, so the client side stays bounded too
+        for start in range(0, args.rows, 1000):
+            yield "".join(
+                json.dumps({"title": f"Imported {i}", "description": "x" * 64, "priority": "high"}) + "\n"
+                for i in range(start, min(start + 1000, args.rows))
+            ).encode()
+
+    t0 = time.perf_counter()
+    r = client.post(
+        "/tasks/import", content=body(),
+        headers={"Authorization": f"Bearer {token}", "Content-Type": "application/x-ndjson"},
+    )
+    elapsed = time.perf_counter() - t0
+    result = r.json()
+    print(f"inserted={result['inserted']} rejected={result['rejected']} in {elapsed:.2f}s "
+          f"-> {result['inserted'] / elapsed:,.0f} rows/s")
+
+
+if __name__ == "__main__":
+    main()
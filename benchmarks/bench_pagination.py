@@ -0,0 +1,85 @@
+"""Offset vs cursor pagination latency across page depth for GET /tasks.
+
+Usage: python -m benchmarks.bench_pagination --tasks 200000 --limit 20
+"""
+import argparse
+import os
+import statistics
+import tempfile
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--tasks", type=int, default=100_000)
+    parser.add_argument("--limit", type=int, default=20)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    db_path = Path(tempfile.mkdtemp()) / "bench_pagination.db"
+    os.environ["DATABASE_URL"] = f"sqlite:///{db_path.as_posix()}"
+    os.environ.setdefault("SECRET_KEY", "bench-secret")
+    os.environ.setdefault("RATE_LIMIT_ENABLED", "false")
+
+    from fastapi.testclient import TestClient
+    from jose import jwt
+    from sqlalchemy import String, insert, select, type_coerce
+    from python_api.main import app
+    from python_api.database import SessionLocal, create_schema
+    from python_api.models.task import Task
+    from python_api.services.task_counters import rebuild_task_counters
+    from python_api.utils.pagination import encode_cursor
+
+    create_schema()
+    client = TestClient(app)
+    email = f"bench_{uuid.uuid4().hex[:8]}@example.com"
+    client.post("/auth/register", json={"email": email, "password": "password123"})
+    token = client.post("/auth/login", data={"username": email, "password": "password123"}).json()["accessToken"]
+    headers = {"Authorization": f"Bearer {token}"}
+    user_id = jwt.get_unverified_claims(token)["sub"]
+
+    db = SessionLocal()
+    base = datetime.now(timezone.utc)
+    rows = [
+        {"id": str(uuid.uuid4()), "title": f"Task {i}", "user_id": user_id, "created_at": base + timedelta(milliseconds=i)}
+        for i in range(args.tasks)
+    ]
+    for start in range(0, len(rows), 10_000):
+        db.execute(insert(Task), rows[start:start + 10_000])
+    rebuild_task_counters(db, user_id)
+    db.commit()
+    created_key = type_coerce(Task.created_at, String)
+
+    def timed(url):
+        samples = []
+        for _ in range(args.repeat):
+            t0 = time.perf_counter()
+            r = client.get(url, headers=headers)
+            samples.append((time.perf_counter() - t0) * 1000)
+            assert r.status_code == 200, r.text
+        return statistics.median(samples)
+
+    print(f"{'depth':>10} {'offset ms':>10} {'cursor ms':>10}")
+    depth = args.limit
+    while depth < args.tasks:
+        # Cursor pointing at the last row of the previous page
+        created, task_id = db.execute(
+            select(created_key, Task.id)
+            .where(Task.user_id == user_id)
+            .order_by(created_key, Task.id)
+            .offset(depth - 1)
+            .limit(1)
+        ).one()
+        cursor = encode_cursor(created, task_id)
+        offset_ms = timed(f"/tasks/?limit={args.limit}&offset={depth}")
+        cursor_ms = timed(f"/tasks/?limit={args.limit}&cursor={cursor}")
+        print(f"{depth:>10} {offset_ms:>10.2f} {cursor_ms:>10.2f}")
+        depth *= 4
+    db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""FTS5 search vs LIKE scan latency for GET /tasks?q= as the task table grows.
+
+Usage: python -m benchmarks.bench_search --tasks 1000000
+"""
+import argparse
+import os
+import random
+import statistics
+import tempfile
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+WORDS = (
+    "buy call write review fix deploy plan email meeting report invoice budget groceries "
+    "plumber dentist garden backup release draft slides contract renew license schedule"
+).split()
+# Rare reference tags make some queries selective; common words match a large share of rows
+TAGS = 20_000
+QUERIES = ["ref123", "ref77 invoice", "ref1999", "dentist schedule", "groceries"]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--tasks", type=int, default=1_000_000)
+    parser.add_argument("--limit", type=int, default=20)
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args()
+
+    db_path = Path(tempfile.mkdtemp()) / "bench_search.db"
+    os.environ["DATABASE_URL"] = f"sqlite:///{db_path.as_posix()}"
+    os.environ.setdefault("SECRET_KEY", "bench-secret")
+    os.environ.setdefault("RATE_LIMIT_ENABLED", "false")
+
+    from fastapi.testclient import TestClient
+    from jose import jwt
+    from sqlalchemy import insert
+    from python_api.main import app
+    from python_api.database import SessionLocal, create_schema
+    from python_api.models.task import Task
+    from python_api.services import task_search
+    from python_api.services.task_counters import rebuild_task_counters
+
+    create_schema()
+    client = TestClient(app)
+    email = f"bench_{uuid.uuid4().hex[:8]}@example.com"
+    client.post("/auth/register", json={"email": email, "password": "password123"})
+    token = client.post("/auth/login", data={"username": email, "password": "password123"}).json()["accessToken"]
+    headers = {"Authorization": f"Bearer {token}"}
+    user_id = jwt.get_unverified_claims(token)["sub"]
+
+    rng = random.Random(42)
+    db = SessionLocal()
+    base = datetime.now(timezone.utc)
+    t0 = time.perf_counter()
+    for start in range(0, args.tasks, 10_000):
+        db.execute(insert(Task), [
+            {
+                "id": str(uuid.uuid4()),
+                "title": " ".join(rng.sample(WORDS, 3)) + f" ref{rng.randrange(TAGS)}",
+                "description": " ".join(rng.choices(WORDS, k=12)),
+                "user_id": user_id,
+                "created_at": base + timedelta(milliseconds=i),
+            }
+            for i in range(start, min(start + 10_000, args.tasks))
+        ])
+    rebuild_task_counters(db, user_id)
+    db.commit()
+    db.close()
+    print(f"seeded {args.tasks} tasks (FTS triggers on) in {time.perf_counter() - t0:.1f}s")
+
+    def timed(url):
+        samples = []
+        for _ in range(args.repeat):
+            t0 = time.perf_counter()
+            r = client.get(url, headers=headers)
+            samples.append((time.perf_counter() - t0) * 1000)
+            assert r.status_code == 200, r.text
+        return statistics.median(samples)
+
+    print(f"{'query':>20} {'fts ms':>10} {'like ms':>10}")
+    for q in QUERIES:
+        url = f"/tasks/?limit={args.limit}&q={q}"
+        task_search.fts_available = True
+        fts_ms = timed(url)
+        task_search.fts_available = False
+        like_ms = timed(url)
+        print(f"{q:>20} {fts_ms:>10.2f} {like_ms:>10.2f}")
+    task_search.fts_available = True
+
+
+if __name__ == "__main__":
+    main()
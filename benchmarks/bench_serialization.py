@@ -0,0 +1,105 @@
+"""Per-page cost of GET /tasks: ORM + response_model vs row tuples + orjson,
+and of embedding categories (lazy relationship vs include=category) or
+projecting columns (fields=).
+
+Usage: python -m benchmarks.bench_serialization --limit 100
+"""
+import argparse
+import os
+import statistics
+import tempfile
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--limit", type=int, default=100)
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+
+    db_path = Path(tempfile.mkdtemp()) / "bench_serialization.db"
+    os.environ["DATABASE_URL"] = f"sqlite:///{db_path.as_posix()}"
+    os.environ.setdefault("SECRET_KEY", "bench-secret")
+    os.environ.setdefault("RATE_LIMIT_ENABLED", "false")
+
+    import json
+    from fastapi.encoders import jsonable_encoder
+    from fastapi.testclient import TestClient
+    from sqlalchemy import insert
+    from python_api.core.config import settings
+    from python_api.main import app
+    from python_api.database import SessionLocal, create_schema
+    from python_api.models.category import Category
+    from python_api.models.task import Task
+    from python_api.routers.tasks import _list_tasks
+    from python_api.schemas.task import PaginatedTasks
+    from python_api.services.task_counters import rebuild_task_counters
+    from python_api.services.task_serialization import dumps
+
+    create_schema()
+    client = TestClient(app)
+    email = f"bench_{uuid.uuid4().hex[:8]}@example.com"
+    client.post("/auth/register", json={"email": email, "password": "password123"})
+    token = client.post("/auth/login", data={"username": email, "password": "password123"}).json()["accessToken"]
+    headers = {"Authorization": f"Bearer {token}"}
+    from jose import jwt
+    user_id = jwt.get_unverified_claims(token)["sub"]
+
+    db = SessionLocal()
+    now = datetime.now(timezone.utc)
+    category_ids = [str(uuid.uuid4()) for _ in range(10)]
+    db.execute(insert(Category), [{"id": cid, "name": f"Category {i}", "color": "#3498DB"} for i, cid in enumerate(category_ids)])
+    db.execute(insert(Task), [
+        {"id": str(uuid.uuid4()), "title": f"Task {i}", "description": "d" * 80, "user_id": user_id,
+         "due_date": now + timedelta(days=i), "created_at": now + timedelta(seconds=i),
+         "category_id": category_ids[i % len(category_ids)]}
+        for i in range(args.limit)
+    ])
+    rebuild_task_counters(db, user_id)
+    db.commit()
+
+    def timed(fn):
+        samples = []
+        for _ in range(args.repeat):
+            t0 = time.perf_counter()
+            fn()
+            samples.append((time.perf_counter() - t0) * 1000)
+        return statistics.median(samples)
+
+    def slow_page():
+        payload = _list_tasks(db, user_id, None, None, args.limit, 0, None)
+        content = PaginatedTasks.model_validate(payload).model_dump(mode="json", by_alias=True)
+        json.dumps(jsonable_encoder(content), ensure_ascii=False, separators=(",", ":")).encode()
+        db.expunge_all()
+
+    def fast_page():
+        dumps(_list_tasks(db, user_id, None, None, args.limit, 0, None, fast=True))
+
+    print(f"page of {args.limit} tasks, median ms")
+    print(f"  query + serialize, ORM/pydantic: {timed(slow_page):7.3f}")
+    print(f"  query + serialize, rows/orjson:  {timed(fast_page):7.3f}")
+    for fast in (False, True):
+        settings.FAST_JSON_RESPONSES = fast
+        ms = timed(lambda: client.get(f"/tasks/?limit={args.limit}", headers=headers))
+        print(f"  full request, FAST_JSON_RESPONSES={fast!s:<5}: {ms:7.3f}")
+
+    def lazy_categories():
+        # What touching Task.category per row costs: one SELECT per distinct category
+        for task in _list_tasks(db, user_id, None, None, args.limit, 0, None)["tasks"]:
+            task.category and task.category.name
+        db.expunge_all()
+
+    print(f"  categories via lazy Task.category: {timed(lazy_categories):7.3f}")
+    print("full request, median ms / response bytes")
+    for query in ("", "&include=category", "&fields=id,title,status", "&fields=id,title,status&include=category"):
+        url = f"/tasks/?limit={args.limit}{query}"
+        size = len(client.get(url, headers=headers).content)
+        print(f"  {query or 'default':<42} {timed(lambda: client.get(url, headers=headers)):7.3f} {size:>8}")
+    db.close()
+
+
+if __name__ == "__main__":
+    main()
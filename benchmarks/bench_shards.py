@@ -0,0 +1,63 @@
+"""Write throughput as DATABASE_SHARDS grows.
+
+For each shard count: seed one database (benchmarks.seed), spread it over the
+shards with ``python -m python_api rebalance-shards``, start the server and run
+a write-heavy mix (benchmarks.load). 0 is the unsharded baseline. Gains need
+writers that actually overlap: several workers, or the threadpool of one.
+
+Usage: python -m benchmarks.bench_shards --shards 0,1,2,4 --workers 4 --duration 15
+"""
+import argparse
+import asyncio
+import os
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+from .load import _free_port, parse_mix, run_load, start_server
+from .report import percentile
+from .seed import seed
+
+WRITES = ("POST /tasks", "PATCH /tasks/{id}/complete", "DELETE /tasks/{id}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--shards", default="0,1,2,4", help="comma-separated DATABASE_SHARDS values")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--users", type=int, default=50)
+    parser.add_argument("--tasks", type=int, default=200, help="tasks per user")
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--duration", type=float, default=15.0)
+    parser.add_argument("--mix", default="create=60,complete=20,delete=20")
+    args = parser.parse_args()
+    mix = parse_mix(args.mix)
+
+    print(f"{args.workers} worker(s), mix {args.mix}, concurrency {args.concurrency}")
+    print(f"{'shards':>6} {'write rps':>10} {'p50 ms':>8} {'p99 ms':>8} {'errors':>7}")
+    for shards in [int(count) for count in args.shards.split(",")]:
+        database_url = f"sqlite:///{(Path(tempfile.mkdtemp()) / 'bench_shards.db').as_posix()}"
+        os.environ["DATABASE_URL"] = database_url
+        os.environ["DATABASE_SHARDS"] = str(shards)
+        print("seeded", seed(database_url, args.users, args.tasks, 10, 42), file=sys.stderr)
+        subprocess.run([sys.executable, "-m", "python_api", "rebalance-shards"], check=True, stdout=sys.stderr)
+
+        port = _free_port()
+        server = start_server(database_url, port, args.workers)
+        try:
+            recorder, elapsed = asyncio.run(
+                run_load(f"http://127.0.0.1:{port}", args.users, args.concurrency, args.duration, mix)
+            )
+        finally:
+            server.terminate()
+            server.wait(timeout=60)
+        samples = sorted(ms for name in WRITES for ms in recorder.samples.get(name, []))
+        print(
+            f"{shards:>6} {len(samples) / elapsed:>10.1f} {percentile(samples, 50):>8.2f} "
+            f"{percentile(samples, 99):>8.2f} {sum(recorder.errors.values()):>7}"
+        )
+
+
+if __name__ == "__main__":
+    main()
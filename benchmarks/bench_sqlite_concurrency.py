@@ -0,0 +1,136 @@
+"""Concurrent readers + writers on SQLite: default pragmas vs the WAL profile with a read pool.
+
+Each profile runs in its own process (settings are read at import); every
+reader and writer is a separate process, as with several uvicorn workers.
+Readers run the GET /tasks list query (page + counters), writers create tasks.
+
+Usage: python -m benchmarks.bench_sqlite_concurrency --readers 8 --writers 2 --seconds 5
+"""
+import argparse
+import json
+import os
+import multiprocessing
+import subprocess
+import sys
+import tempfile
+import time
+import uuid
+from pathlib import Path
+
+PROFILES = {
+    # SQLite defaults: rollback journal, synchronous=FULL, reads share the write pool
+    "default": {
+        "SQLITE_JOURNAL_MODE": "delete", "SQLITE_SYNCHRONOUS": "full", "SQLITE_CACHE_SIZE": "-2000",
+        "SQLITE_MMAP_SIZE": "0", "SQLITE_TEMP_STORE": "", "SQLITE_READ_POOL_SIZE": "0",
+    },
+    # Settings defaults: WAL, synchronous=NORMAL, bigger cache, mmap, read-only pool
+    "wal": {},
+}
+
+
+def worker(role, user_id, seconds, results):
+    # Runs in its own process, like a uvicorn worker, so the GIL is not the bottleneck
+    from sqlalchemy.exc import OperationalError
+    import python_api.models  # noqa: F401 - registers every model
+    from python_api.database import ReadSessionLocal, SessionLocal
+    from python_api.routers.tasks import _create_task, _list_tasks
+    from python_api.schemas.task import TaskCreate
+
+    task = TaskCreate(title="Concurrent write")
+    samples, errors = [], 0
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        t0 = time.perf_counter()
+        session = ReadSessionLocal() if role == "read" else SessionLocal()
+        try:
+            if role == "read":
+                _list_tasks(session, user_id, None, None, 20, 0, None, fast=True)
+            else:
+                _create_task(session, task, user_id)
+            samples.append((time.perf_counter() - t0) * 1000)
+        except OperationalError:
+            errors += 1
+        finally:
+            session.close()
+    results.put((role, samples, errors))
+
+
+def run_profile(args):
+    db_path = Path(tempfile.mkdtemp()) / "bench_concurrency.db"
+    os.environ["DATABASE_URL"] = f"sqlite:///{db_path.as_posix()}"
+    os.environ.setdefault("SECRET_KEY", "bench-secret")
+
+    from sqlalchemy import insert
+    from python_api.database import SessionLocal, create_schema, engine
+    from python_api.models.task import Task
+    from python_api.models.user import User
+    from python_api.services.task_counters import rebuild_task_counters
+
+    create_schema()
+    db = SessionLocal()
+    user_id = str(uuid.uuid4())
+    db.execute(insert(User), [{"id": user_id, "email": f"{user_id}@example.com", "hashed_password": "x"}])
+    db.execute(insert(Task), [{"id": str(uuid.uuid4()), "title": f"Task {i}", "user_id": user_id} for i in range(args.tasks)])
+    rebuild_task_counters(db, user_id)
+    db.commit()
+    db.close()
+    engine.dispose()
+
+    ctx = multiprocessing.get_context("spawn")
+    results = ctx.Queue()
+    roles = ["read"] * args.readers + ["write"] * args.writers
+    procs = [ctx.Process(target=worker, args=(role, user_id, args.seconds, results)) for role in roles]
+    for proc in procs:
+        proc.start()
+    samples = {"read": [], "write": []}
+    errors = 0
+    for _ in procs:
+        role, role_samples, role_errors = results.get(timeout=args.seconds + 120)
+        samples[role].extend(role_samples)
+        errors += role_errors
+    for proc in procs:
+        proc.join()
+
+    def p(values, q):
+        return sorted(values)[int(len(values) * q)] if values else 0.0
+
+    print(json.dumps({
+        "reads_per_s": len(samples["read"]) / args.seconds,
+        "writes_per_s": len(samples["write"]) / args.seconds,
+        "read_p50_ms": p(samples["read"], 0.5),
+        "read_p99_ms": p(samples["read"], 0.99),
+        "write_p99_ms": p(samples["write"], 0.99),
+        "errors": errors,
+    }))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--tasks", type=int, default=20_000)
+    parser.add_argument("--readers", type=int, default=8)
+    parser.add_argument("--writers", type=int, default=2)
+    parser.add_argument("--seconds", type=float, default=5.0)
+    parser.add_argument("--profile", choices=sorted(PROFILES), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.profile:
+        run_profile(args)
+        return
+
+    print(f"{'profile':>8} {'reads/s':>10} {'writes/s':>10} {'read p50':>10} {'read p99':>10} {'write p99':>10} {'errors':>7}")
+    for name, env in PROFILES.items():
+        out = subprocess.run(
+            [sys.executable, "-m", "benchmarks.bench_sqlite_concurrency", "--profile", name,
+             "--tasks", str(args.tasks), "--readers", str(args.readers), "--writers", str(args.writers),
+             "--seconds", str(args.seconds)],
+            env={**os.environ, **env}, capture_output=True, text=True, check=True,
+        ).stdout
+        r = json.loads(out.strip().splitlines()[-1])
+        print(
+            f"{name:>8} {r['reads_per_s']:>10.0f} {r['writes_per_s']:>10.0f} "
+            f"{r['read_p50_ms']:>10.2f} {r['read_p99_ms']:>10.2f} {r['write_p99_ms']:>10.2f} {r['errors']:>7}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""GET /tasks/stats vs a single-task read vs downloading every task, for one large user.
+
+Usage: python -m benchmarks.bench_stats --tasks 100000
+"""
+import argparse
+import os
+import random
+import statistics
+import tempfile
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--tasks", type=int, default=100_000)
+    parser.add_argument("--categories", type=int, default=20)
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+
+    db_path = Path(tempfile.mkdtemp()) / "bench_stats.db"
+    os.environ["DATABASE_URL"] = f"sqlite:///{db_path.as_posix()}"
+    os.environ.setdefault("SECRET_KEY", "bench-secret")
+    os.environ.setdefault("RATE_LIMIT_ENABLED", "false")
+
+    from fastapi.testclient import TestClient
+    from jose import jwt
+    from sqlalchemy import insert
+    from python_api.main import app
+    from python_api.database import SessionLocal, create_schema
+    from python_api.models.category import Category
+    from python_api.models.task import Task, TaskPriority, TaskStatus
+    from python_api.services.task_counters import rebuild_task_counters
+
+    create_schema()
+    client = TestClient(app)
+    email = f"bench_{uuid.uuid4().hex[:8]}@example.com"
+    client.post("/auth/register", json={"email": email, "password": "password123"})
+    token = client.post("/auth/login", data={"username": email, "password": "password123"}).json()["accessToken"]
+    headers = {"Authorization": f"Bearer {token}"}
+    user_id = jwt.get_unverified_claims(token)["sub"]
+
+    rng = random.Random(42)
+    db = SessionLocal()
+    category_ids = [str(uuid.uuid4()) for _ in range(args.categories)]
+    db.execute(insert(Category), [{"id": cid, "name": f"Category {i}"} for i, cid in enumerate(category_ids)])
+    now = datetime.now(timezone.utc)
+    rows = [
+        {
+            "id": str(uuid.uuid4()), "title": f"Task {i}", "user_id": user_id,
+            "status": rng.choice(list(TaskStatus)), "priority": rng.choice(list(TaskPriority)),
+            "due_date": now + timedelta(hours=rng.randint(-24 * 30, 24 * 60)) if rng.random() < 0.5 else None,
+            "category_id": rng.choice(category_ids) if rng.random() < 0.6 else None,
+        }
+        for i in range(args.tasks)
+    ]
+    for start in range(0, len(rows), 10_000):
+        db.execute(insert(Task), rows[start:start + 10_000])
+    rebuild_task_counters(db, user_id)
+    db.commit()
+    db.close()
+
+    def timed(url, repeat=args.repeat):
+        samples = []
+        for _ in range(repeat):
+            t0 = time.perf_counter()
+            r = client.get(url, headers=headers)
+            samples.append((time.perf_counter() - t0) * 1000)
+            assert r.status_code == 200, r.text
+        return statistics.median(samples)
+
+    print(f"{'request':<28} {'median ms':>10}")
+    print(f"{'GET /tasks/{id}':<28} {timed('/tasks/' + rows[len(rows) // 2]['id']):>10.2f}")
+    print(f"{'GET /tasks/stats':<28} {timed('/tasks/stats'):>10.2f}")
+    print(f"{'GET /tasks/export (all)':<28} {timed('/tasks/export', repeat=3):>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+"""Throughput of ``python -m python_api serve`` as the worker count grows.
+
+Seeds one SQLite database, then for each worker count starts the server on it,
+runs the load driver (benchmarks.load) for --duration seconds and stops it.
+Past the number of CPUs extra workers only add context switches, and the
+share of writes in --mix bounds scaling: SQLite has a single writer.
+
+Usage: python -m benchmarks.bench_workers --workers 1,2,4 --duration 15
+"""
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+from .load import _free_port, parse_mix, run_load, start_server
+from .report import summarize
+from .seed import seed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", default=None, help="comma-separated worker counts (default 1,2,... up to the CPU count)")
+    parser.add_argument("--users", type=int, default=50)
+    parser.add_argument("--tasks", type=int, default=500, help="tasks per user")
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--duration", type=float, default=15.0)
+    parser.add_argument("--mix", default="list=90,create=10")
+    args = parser.parse_args()
+    mix = parse_mix(args.mix)
+    cpus = os.cpu_count() or 1
+    if args.workers:
+        counts = [int(count) for count in args.workers.split(",")]
+    else:
+        counts = sorted({1, *(2 ** i for i in range(1, cpus.bit_length())), cpus})
+
+    database_url = f"sqlite:///{(Path(tempfile.mkdtemp()) / 'bench_workers.db').as_posix()}"
+    os.environ["DATABASE_URL"] = database_url
+    print("seeded", seed(database_url, args.users, args.tasks, 10, 42), file=sys.stderr)
+
+    print(f"{cpus} CPU(s), mix {args.mix}, concurrency {args.concurrency}")
+    print(f"{'workers':>7} {'rps':>9} {'p50 ms':>8} {'p99 ms':>8} {'errors':>7}")
+    for workers in counts:
+        port = _free_port()
+        server = start_server(database_url, port, workers)
+        base_url = f"http://127.0.0.1:{port}"
+        try:
+            recorder, elapsed = asyncio.run(run_load(base_url, args.users, args.concurrency, args.duration, mix))
+        finally:
+            server.terminate()
+            server.wait(timeout=60)
+        report = summarize(recorder.samples, recorder.errors, elapsed, {})
+        reads = report["endpoints"].get("GET /tasks", {})
+        errors = sum(endpoint["errors"] for endpoint in report["endpoints"].values())
+        print(
+            f"{workers:>7} {report['throughput_rps']:>9.1f} {reads.get('p50_ms', 0):>8.2f} "
+            f"{reads.get('p99_ms', 0):>8.2f} {errors:>7}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,237 @@
+"""Async load driver: mixed workload against a uvicorn instance on localhost.
+
+Without --base-url it seeds a fresh SQLite database (benchmarks.seed), starts
+``python -m python_api serve`` on it and stops it afterwards. Each virtual user logs in as one of the
+seeded users and then loops over the weighted mix until the time is up.
+The report (benchmarks.report) is printed and, with --output, saved as JSON.
+
+Usage:
+    python -m benchmarks.load --users 100 --tasks 1000 --concurrency 32 --duration 30 --output after.json
+    python -m benchmarks.load --base-url http://127.0.0.1:8000 --users 100 --mix list=80,create=20
+
+Login storm, with and without refresh tokens (compare server_bcrypt_s):
+    python -m benchmarks.load --mix list=50,login=50 --output login.json
+    python -m benchmarks.load --mix list=50,refresh=50 --output refresh.json
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from pathlib import Path
+
+from .report import summarize
+from .seed import PASSWORD, seed, user_email
+
+DEFAULT_MIX = "list=60,create=15,complete=10,delete=10,login=5"
+OPERATIONS = {"list", "create", "complete", "delete", "login", "refresh"}
+
+
+def parse_mix(text: str) -> dict:
+    mix = {}
+    for part in text.split(","):
+        name, _, weight = part.partition("=")
+        mix[name.strip()] = float(weight or 1)
+    unknown = set(mix) - OPERATIONS
+    if unknown:
+        raise ValueError(f"Unknown operations in mix: {', '.join(sorted(unknown))}")
+    return mix
+
+
+class Recorder:
+    def __init__(self):
+        self.samples = defaultdict(list)
+        self.errors = defaultdict(int)
+        self.bcrypt_seconds = 0.0
+
+    async def call(self, endpoint: str, send, expected=(200,)):
+        t0 = time.perf_counter()
+        try:
+            response = await send()
+        except Exception:
+            self.errors[endpoint] += 1
+            return None
+        elapsed = (time.perf_counter() - t0) * 1000
+        if response.status_code not in expected:
+            self.errors[endpoint] += 1
+            return None
+        self.samples[endpoint].append(elapsed)
+        return response
+
+
+async def login(client, recorder: Recorder, email: str):
+    response = await recorder.call("POST /auth/login", lambda: client.post(
+        "/auth/login", data={"username": email, "password": PASSWORD}
+    ))
+    return response.json() if response is not None else None
+
+
+async def refresh(client, recorder: Recorder, refresh_token: str):
+    response = await recorder.call("POST /auth/refresh", lambda: client.post(
+        "/auth/refresh", json={"refreshToken": refresh_token}
+    ))
+    return response.json() if response is not None else None
+
+
+def bearer(tokens: dict) -> dict:
+    return {"Authorization": f"Bearer {tokens['accessToken']}"}
+
+
+async def virtual_user(client, recorder: Recorder, rng: random.Random, users: int, mix: dict, deadline: float):
+    email = user_email(rng.randrange(users))
+    tokens = await login(client, recorder, email)
+    if tokens is None:
+        return
+    headers = bearer(tokens)
+    operations, weights = list(mix), list(mix.values())
+    created = []
+    while time.perf_counter() < deadline:
+        op = rng.choices(operations, weights)[0]
+        if op in ("complete", "delete") and not created:
+            op = "create"
+        if op == "list":
+            params = {"limit": rng.choice((10, 20, 50))}
+            if rng.random() < 0.5:
+                params["status"] = rng.choice(("pending", "completed"))
+            if rng.random() < 0.3:
+                params["priority"] = rng.choice(("low", "medium", "high"))
+            await recorder.call("GET /tasks", lambda: client.get("/tasks/", params=params, headers=headers))
+        elif op == "create":
+            body = {"title": f"Load test {rng.randrange(1_000_000)}", "priority": rng.choice(("low", "medium", "high"))}
+            response = await recorder.call(
+                "POST /tasks", lambda: client.post("/tasks/", json=body, headers=headers), expected=(201,)
+            )
+            if response is not None:
+                created.append(response.json()["id"])
+        elif op == "complete":
+            task_id = rng.choice(created)
+            await recorder.call(
+                "PATCH /tasks/{id}/complete", lambda: client.patch(f"/tasks/{task_id}/complete", headers=headers)
+            )
+        elif op == "delete":
+            task_id = created.pop(rng.randrange(len(created)))
+            await recorder.call(
+                "DELETE /tasks/{id}", lambda: client.delete(f"/tasks/{task_id}", headers=headers), expected=(204,)
+            )
+        elif op in ("login", "refresh"):
+            # Staying logged in: full bcrypt login, or a refresh token (rotated on every use)
+            fresh = await (login(client, recorder, email) if op == "login" else refresh(client, recorder, tokens["refreshToken"]))
+            if fresh is not None:
+                tokens, headers = fresh, bearer(fresh)
+
+
+async def bcrypt_seconds(client) -> float:
+    """Server-side bcrypt time so far (password_hash_seconds_sum in /metrics); one worker's view."""
+    try:
+        response = await client.get("/metrics")
+    except Exception:
+        return 0.0
+    if response.status_code != 200:
+        return 0.0
+    return sum(
+        float(line.rsplit(" ", 1)[1]) for line in response.text.splitlines() if line.startswith("password_hash_seconds_sum")
+    )
+
+
+async def run_load(base_url: str, users: int, concurrency: int, duration: float, mix: dict, seed: int = 0):
+    import httpx
+
+    recorder = Recorder()
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=60) as client:
+        bcrypt_before = await bcrypt_seconds(client)
+        started = time.perf_counter()
+        deadline = started + duration
+        await asyncio.gather(*(
+            virtual_user(client, recorder, random.Random(seed + i), users, mix, deadline) for i in range(concurrency)
+        ))
+        elapsed = time.perf_counter() - started
+        recorder.bcrypt_seconds = await bcrypt_seconds(client) - bcrypt_before
+    return recorder, elapsed
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_server(database_url: str, port: int, workers: int) -> subprocess.Popen:
+    import httpx
+
+    env = {**os.environ, "DATABASE_URL": database_url, "BCRYPT_ROUNDS": os.getenv("BCRYPT_ROUNDS", "4")}
+    env.setdefault("SECRET_KEY", "bench-secret")
+    # Every virtual user comes from 127.0.0.1; per-IP login limits would throttle the driver itself
+    env.setdefault("RATE_LIMIT_ENABLED", "false")
+    server = subprocess.Popen(
+        [sys.executable, "-m", "python_api", "serve", "--host", "127.0.0.1", "--port", str(port),
+         "--workers", str(workers), "--log-level", "warning", "--no-access-log"],
+        env=env, stdout=subprocess.DEVNULL,
+    )
+    deadline = time.monotonic() + 60
+    while time.monotonic() < deadline:
+        if server.poll() is not None:
+            raise RuntimeError("uvicorn exited during startup")
+        try:
+            httpx.get(f"http://127.0.0.1:{port}/openapi.json", timeout=1)
+            return server
+        except httpx.TransportError:
+            time.sleep(0.2)
+    server.terminate()
+    raise RuntimeError("uvicorn did not start within 60s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--base-url", help="running server to target (its database must be seeded)")
+    parser.add_argument("--database-url", help="seeded database for the spawned server (default: seed a new one)")
+    parser.add_argument("--users", type=int, default=100)
+    parser.add_argument("--tasks", type=int, default=1000, help="tasks per user when seeding")
+    parser.add_argument("--categories", type=int, default=20)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--duration", type=float, default=30.0)
+    parser.add_argument("--mix", default=DEFAULT_MIX)
+    parser.add_argument("--workers", type=int, default=1, help="worker processes for the spawned server")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="write the JSON report here")
+    args = parser.parse_args()
+    mix = parse_mix(args.mix)
+
+    server = None
+    base_url = args.base_url
+    if base_url is None:
+        database_url = args.database_url
+        if database_url is None:
+            database_url = f"sqlite:///{(Path(tempfile.mkdtemp()) / 'bench_load.db').as_posix()}"
+            os.environ["DATABASE_URL"] = database_url
+            print("seeded", seed(database_url, args.users, args.tasks, args.categories, args.seed), file=sys.stderr)
+        port = _free_port()
+        server = start_server(database_url, port, args.workers)
+        base_url = f"http://127.0.0.1:{port}"
+    try:
+        recorder, elapsed = asyncio.run(run_load(base_url, args.users, args.concurrency, args.duration, mix, args.seed))
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait(timeout=30)
+
+    config = {
+        "users": args.users, "tasks_per_user": args.tasks, "concurrency": args.concurrency,
+        "duration_s": args.duration, "mix": mix, "workers": args.workers,
+    }
+    report = summarize(recorder.samples, recorder.errors, elapsed, config)
+    report["server_bcrypt_s"] = round(recorder.bcrypt_seconds, 3)
+    text = json.dumps(report, indent=2)
+    print(text)
+    if args.output:
+        Path(args.output).write_text(text + "\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""Latency/throughput reports for the load driver, and a diff between two of them.
+
+Usage: python -m benchmarks.report before.json after.json
+"""
+import argparse
+import json
+import platform
+import subprocess
+from datetime import datetime, timezone
+from typing import Dict, List
+
+
+def percentile(sorted_values: List[float], q: float) -> float:
+    """Nearest-rank percentile of an already sorted list (q in 0..100)."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, -(-len(sorted_values) * q // 100))
+    return sorted_values[int(rank) - 1]
+
+
+def _git_commit() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def summarize(samples: Dict[str, List[float]], errors: Dict[str, int], seconds: float, config: dict) -> dict:
+    """Build a report from per-endpoint latencies (ms) collected over ``seconds``."""
+    endpoints = {}
+    for name in sorted(set(samples) | set(errors)):
+        values = sorted(samples.get(name, []))
+        endpoints[name] = {
+            "requests": len(values),
+            "errors": errors.get(name, 0),
+            "throughput_rps": round(len(values) / seconds, 2),
+            "p50_ms": round(percentile(values, 50), 3),
+            "p95_ms": round(percentile(values, 95), 3),
+            "p99_ms": round(percentile(values, 99), 3),
+        }
+    total = sum(e["requests"] for e in endpoints.values())
+    return {
+        "commit": _git_commit(),
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "config": config,
+        "duration_s": round(seconds, 2),
+        "throughput_rps": round(total / seconds, 2),
+        "endpoints": endpoints,
+    }
+
+
+def compare(before: dict, after: dict) -> List[str]:
+    """One line per endpoint with throughput and p50/p95/p99 changes (negative latency % = faster)."""
+    def change(old, new):
+        return f"{(new - old) / old * 100:+6.1f}%" if old else "   n/a"
+
+    lines = [f"{'endpoint':<32} {'rps':>8} {'p50':>8} {'p95':>8} {'p99':>8}"]
+    for name in sorted(set(before["endpoints"]) | set(after["endpoints"])):
+        old, new = before["endpoints"].get(name), after["endpoints"].get(name)
+        if old is None or new is None:
+            lines.append(f"{name:<32} {'only in ' + ('after' if old is None else 'before'):>8}")
+            continue
+        lines.append(
+            f"{name:<32} {change(old['throughput_rps'], new['throughput_rps']):>8} "
+            + " ".join(f"{change(old[key], new[key]):>8}" for key in ("p50_ms", "p95_ms", "p99_ms"))
+        )
+    if "server_bcrypt_s" in before and "server_bcrypt_s" in after:
+        old, new = before["server_bcrypt_s"], after["server_bcrypt_s"]
+        lines.append(f"{'server bcrypt seconds':<32} {old:>8} -> {new} ({change(old, new).strip()})")
+    return lines
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("before")
+    parser.add_argument("after")
+    args = parser.parse_args()
+    with open(args.before) as f:
+        before = json.load(f)
+    with open(args.after) as f:
+        after = json.load(f)
+    print(f"{before.get('commit')} -> {after.get('commit')}")
+    print("\n".join(compare(before, after)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+"""Seed a database with N users x M tasks (plus shared categories) using bulk inserts.
+
+Users are bench_user_<i>@example.com with one shared password, so the load
+driver can log in as any of them. The same --seed gives the same dataset.
+
+Usage: python -m benchmarks.seed --database-url sqlite:///./bench.db --users 100 --tasks 1000
+"""
+import argparse
+import os
+import random
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+
+PASSWORD = "password123"
+WORDS = (
+    "buy call write review fix deploy plan email meeting report invoice budget groceries "
+    "plumber dentist garden backup release draft slides contract renew license schedule"
+).split()
+COLORS = ("#E74C3C", "#3498DB", "#2ECC71", "#F1C40F", "#9B59B6", "#1ABC9C")
+CHUNK_ROWS = 10_000
+
+
+def user_email(index: int) -> str:
+    return f"bench_user_{index}@example.com"
+
+
+def seed(database_url: str, users: int, tasks_per_user: int, categories: int, seed: int = 42, rounds: int = 4) -> dict:
+    """Create the schema at ``database_url`` and fill it; returns row counts and timing."""
+    from passlib.context import CryptContext
+    from sqlalchemy import create_engine, insert
+    from sqlalchemy.orm import Session
+    from python_api.database import create_schema
+    from python_api.models.category import Category
+    from python_api.models.task import Task, TaskPriority, TaskStatus
+    from python_api.models.user import User
+    from python_api.services.task_counters import rebuild_task_counters
+
+    rng = random.Random(seed)
+    engine = create_engine(database_url)
+    create_schema(engine)
+    # One bcrypt hash for everyone: seeding should not be dominated by hashing
+    hashed = CryptContext(schemes=["bcrypt"], bcrypt__rounds=rounds).hash(PASSWORD)
+    now = datetime.now(timezone.utc)
+    statuses, priorities = list(TaskStatus), list(TaskPriority)
+
+    t0 = time.perf_counter()
+    with Session(engine) as db:
+        category_ids = [str(uuid.uuid4()) for _ in range(categories)]
+        if category_ids:
+            db.execute(insert(Category), [
+                {"id": cid, "name": f"Category {i}", "color": COLORS[i % len(COLORS)]}
+                for i, cid in enumerate(category_ids)
+            ])
+        user_ids = [str(uuid.uuid4()) for _ in range(users)]
+        db.execute(insert(User), [
+            {"id": uid, "email": user_email(i), "username": f"bench_user_{i}", "hashed_password": hashed}
+            for i, uid in enumerate(user_ids)
+        ])
+        rows = []
+        for uid in user_ids:
+            for j in range(tasks_per_user):
+                rows.append({
+                    "id": str(uuid.uuid4()),
+                    "title": " ".join(rng.sample(WORDS, 3)),
+                    "description": " ".join(rng.choices(WORDS, k=8)) if rng.random() < 0.7 else None,
+                    "status": rng.choice(statuses),
+                    "priority": rng.choice(priorities),
+                    "due_date": now + timedelta(days=rng.randint(-30, 60)) if rng.random() < 0.5 else None,
+                    "category_id": rng.choice(category_ids) if category_ids and rng.random() < 0.6 else None,
+                    "user_id": uid,
+                    "created_at": now - timedelta(minutes=tasks_per_user - j),
+                })
+                if len(rows) >= CHUNK_ROWS:
+                    db.execute(insert(Task), rows)
+                    rows = []
+        if rows:
+            db.execute(insert(Task), rows)
+        rebuild_task_counters(db)
+        db.commit()
+    engine.dispose()
+    return {
+        "users": users,
+        "tasks": users * tasks_per_user,
+        "categories": categories,
+        "seconds": round(time.perf_counter() - t0, 2),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--database-url", default=os.getenv("DATABASE_URL", "sqlite:///./bench.db"))
+    parser.add_argument("--users", type=int, default=100)
+    parser.add_argument("--tasks", type=int, default=1000, help="tasks per user")
+    parser.add_argument("--categories", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+    os.environ["DATABASE_URL"] = args.database_url
+    print(seed(args.database_url, args.users, args.tasks, args.categories, args.seed))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,199 @@
+"""Maintenance commands and the production server: ``python -m python_api <command>``."""
+import argparse
+import asyncio
+import importlib.util
+import os
+
+LOOPS = ("auto", "asyncio", "uvloop")
+HTTP_PARSERS = ("auto", "h11", "httptools")
+
+
+def create_schema(args):
+    from .database import create_schema as create
+
+    create()
+    print("Schema is up to date")
+
+
+def rebuild_counters(args):
+    from .database import task_sessionmakers
+    from .services.task_counters import rebuild_task_counters
+
+    rows = 0
+    for sessionmaker in task_sessionmakers(args.user):
+        db = sessionmaker()
+        try:
+            rows += rebuild_task_counters(db, user_id=args.user)
+            db.commit()
+        finally:
+            db.close()
+    print(f"Rebuilt {rows} task counter rows")
+
+
+def rebuild_search(args):
+    from .database import task_sessionmakers
+    from .services.task_search import rebuild_search_index
+
+    for sessionmaker in task_sessionmakers():
+        db = sessionmaker()
+        try:
+            rebuild_search_index(db)
+            db.commit()
+        finally:
+            db.close()
+    print("Rebuilt task search index")
+
+
+def compact_changes(args):
+    from datetime import datetime, timedelta, timezone
+    from .core.config import settings
+    from .database import task_sessionmakers
+    from .services.task_changes import compact_task_changes
+
+    days = args.retention_days if args.retention_days is not None else settings.TASK_CHANGES_RETENTION_DAYS
+    before = datetime.now(timezone.utc) - timedelta(days=days)
+    result = {"superseded": 0, "tombstones": 0, "logged": 0}
+    for sessionmaker in task_sessionmakers(args.user):
+        db = sessionmaker()
+        try:
+            for key, count in compact_task_changes(db, before, user_id=args.user).items():
+                result[key] += count
+            db.commit()
+        finally:
+            db.close()
+    print(
+        f"Removed {result['superseded']} superseded entries and {result['tombstones']} tombstones, "
+        f"logged {result['logged']} untracked tasks"
+    )
+
+
+def shift_due_dates(args):
+    from .database import task_sessionmakers
+    from .services.task_due_dates import shift_due_dates as shift
+
+    shifted = 0
+    for sessionmaker in task_sessionmakers(args.user):
+        db = sessionmaker()
+        try:
+            shifted += shift(db, args.utc_offset, user_id=args.user)
+            db.commit()
+        finally:
+            db.close()
+    print(f"Shifted the due dates of {shifted} tasks to UTC")
+
+
+def _utc_offset(value: str):
+    """``+05:00`` / ``-0330`` as a timedelta (argparse type)."""
+    from datetime import datetime
+
+    try:
+        return datetime.strptime(value, "%z").utcoffset()
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"not a UTC offset like +05:00: {value!r}")
+
+
+def rebalance_shards(args):
+    from .core.config import settings
+    from .services.task_shards import rebalance_shards as rebalance
+
+    moved = rebalance(dry_run=args.dry_run)
+    if args.dry_run:
+        print(f"{moved['users']} users would move to match DATABASE_SHARDS={settings.DATABASE_SHARDS}")
+    else:
+        print(f"Moved {moved['users']} users ({moved['rows']} rows) to match DATABASE_SHARDS={settings.DATABASE_SHARDS}")
+
+
+def _implementation(name: str, choice: str, choices: tuple) -> str:
+    """What uvicorn will use for ``choice``: "auto" means the fast option (last in ``choices``) when installed."""
+    fallback, fast = choices[1], choices[-1]
+    if choice not in choices:
+        raise SystemExit(f"{name} must be one of {', '.join(choices)}, not {choice!r}")
+    if choice == "auto":
+        return fast if importlib.util.find_spec(fast) is not None else fallback
+    if choice == fast and importlib.util.find_spec(fast) is None:
+        raise SystemExit(f"{fast} is not installed (pip install {fast})")
+    return choice
+
+
+def serve(args):
+    import uvicorn
+    from .core.config import settings
+
+    workers = args.workers if args.workers is not None else settings.SERVE_WORKERS
+    workers = workers if workers > 0 else os.cpu_count() or 1
+    loop = _implementation("SERVE_LOOP", settings.SERVE_LOOP, LOOPS)
+    http = _implementation("SERVE_HTTP", settings.SERVE_HTTP, HTTP_PARSERS)
+
+    if not args.no_create_schema:
+        # Once, in the supervisor: workers must not race each other through CREATE TABLE
+        from . import database
+
+        database.create_schema()
+        asyncio.run(database.dispose_engines())
+    # Workers are new interpreters that read their settings from the environment
+    os.environ["CREATE_SCHEMA_ON_STARTUP"] = "false"
+
+    print(f"Serving on {args.host}:{args.port} with {workers} worker(s), loop={loop}, http={http}", flush=True)
+    uvicorn.run(
+        "python_api.main:create_app",
+        factory=True,
+        host=args.host,
+        port=args.port,
+        workers=workers,
+        loop=loop,
+        http=http,
+        backlog=settings.SERVE_BACKLOG,
+        timeout_keep_alive=settings.SERVE_KEEP_ALIVE_SECONDS,
+        timeout_graceful_shutdown=settings.SERVE_GRACEFUL_TIMEOUT_SECONDS,
+        log_level=args.log_level,
+        access_log=not args.no_access_log,
+    )
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m python_api")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    schema = commands.add_parser("create-schema", help="Create missing tables and the full-text search index")
+    schema.set_defaults(func=create_schema)
+
+    rebuild = commands.add_parser("rebuild-counters", help="Recompute per-user task counters from the tasks table")
+    rebuild.add_argument("--user", help="Only rebuild counters for this user id")
+    rebuild.set_defaults(func=rebuild_counters)
+
+    search = commands.add_parser("rebuild-search", help="Re-index task titles/descriptions for full-text search")
+    search.set_defaults(func=rebuild_search)
+
+    compact = commands.add_parser("compact-changes", help="Shrink the task change log used by GET /tasks/changes")
+    compact.add_argument("--retention-days", type=int, help="Keep tombstones this recent (default TASK_CHANGES_RETENTION_DAYS)")
+    compact.add_argument("--user", help="Only compact this user's changes")
+    compact.set_defaults(func=compact_changes)
+
+    due = commands.add_parser(
+        "shift-due-dates", help="Convert due dates stored as local time (before they were stored in UTC) to UTC"
+    )
+    due.add_argument("--utc-offset", type=_utc_offset, required=True, help="Offset the clients sent, e.g. +05:00")
+    due.add_argument("--user", help="Only shift this user's tasks")
+    due.set_defaults(func=shift_due_dates)
+
+    shards = commands.add_parser("rebalance-shards", help="Move users' tasks to the shard DATABASE_SHARDS assigns them (API stopped)")
+    shards.add_argument("--dry-run", action="store_true", help="Only count the users that would move")
+    shards.set_defaults(func=rebalance_shards)
+
+    from .core.config import settings
+
+    server = commands.add_parser("serve", help="Run the API under uvicorn with SERVE_* settings (workers, loop, keep-alive)")
+    server.add_argument("--host", default=settings.SERVE_HOST)
+    server.add_argument("--port", type=int, default=settings.SERVE_PORT)
+    server.add_argument("--workers", type=int, help="Worker processes (default SERVE_WORKERS; 0 = one per CPU)")
+    server.add_argument("--log-level", default="info")
+    server.add_argument("--no-access-log", action="store_true")
+    server.add_argument("--no-create-schema", action="store_true", help="Skip creating missing tables before the workers start")
+    server.set_defaults(func=serve)
+
+    args = parser.parse_args(argv)
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
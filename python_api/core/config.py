@@ -1,6 +1,7 @@
 import os
 from pathlib import Path
 from dotenv import load_dotenv
+from starlette.requests import Request
 
 
 # Load .env located in the package root (python-api/.env) if present
@@ -8,17 +9,124 @@ _env_path = Path(__file__).resolve().parents[1] / ".env"
 load_dotenv(dotenv_path=_env_path if _env_path.exists() else None)
 
 
+def _async_database_url(url: str) -> str:
+    # Map a sync URL to its async driver: aiosqlite for SQLite, asyncpg for PostgreSQL
+    scheme, sep, rest = url.partition("://")
+    if "+" in scheme:
+        return url
+    if scheme == "sqlite":
+        return f"sqlite+aiosqlite{sep}{rest}"
+    if scheme in ("postgresql", "postgres"):
+        return f"postgresql+asyncpg{sep}{rest}"
+    return url
+
+
+def _bool_env(name: str, default: bool) -> bool:
+    value = os.getenv(name)
+    if value is None:
+        return default
+    return value.strip().lower() in ("1", "true", "yes", "on")
+
+
+def _int_env(name: str, default: int) -> int:
+    try:
+        return int(os.getenv(name, default))
+    except ValueError:
+        return default
+
+
 class Settings:
     def __init__(self) -> None:
         # Database
         self.DATABASE_URL: str = os.getenv("DATABASE_URL", "sqlite:///./todo.db")
+        # "sync" runs handlers' DB work in the threadpool; "async" uses an AsyncEngine
+        self.DB_MODE: str = os.getenv("DB_MODE", "sync").lower()
+        if self.DB_MODE not in ("sync", "async"):
+            self.DB_MODE = "sync"
+        self.ASYNC_DATABASE_URL: str = os.getenv("ASYNC_DATABASE_URL") or _async_database_url(self.DATABASE_URL)
+        # Task data split by user over N SQLite files next to DATABASE_URL (todo-shard0.db, ...);
+        # users and categories stay in DATABASE_URL. 0 keeps everything in one database
+        self.DATABASE_SHARDS: int = _int_env("DATABASE_SHARDS", 0)
+        # Create missing tables when the app starts (otherwise: python -m python_api create-schema)
+        self.CREATE_SCHEMA_ON_STARTUP: bool = _bool_env("CREATE_SCHEMA_ON_STARTUP", False)
+        # SQLite connection profile, applied with PRAGMAs on every new connection
+        # (an empty value leaves that pragma at the SQLite default)
+        self.SQLITE_JOURNAL_MODE: str = os.getenv("SQLITE_JOURNAL_MODE", "wal")
+        self.SQLITE_SYNCHRONOUS: str = os.getenv("SQLITE_SYNCHRONOUS", "normal")
+        self.SQLITE_BUSY_TIMEOUT_MS: int = _int_env("SQLITE_BUSY_TIMEOUT_MS", 5000)
+        # Negative cache_size is in KiB: -65536 = 64 MiB page cache per connection
+        self.SQLITE_CACHE_SIZE: int = _int_env("SQLITE_CACHE_SIZE", -65536)
+        self.SQLITE_MMAP_SIZE: int = _int_env("SQLITE_MMAP_SIZE", 268435456)
+        self.SQLITE_TEMP_STORE: str = os.getenv("SQLITE_TEMP_STORE", "memory")
+        # Connections in the read-only pool used by GET routes (0 = share the write pool)
+        self.SQLITE_READ_POOL_SIZE: int = _int_env("SQLITE_READ_POOL_SIZE", 8)
+        # Metrics: /metrics endpoint and request instrumentation
+        self.METRICS_ENABLED: bool = _bool_env("METRICS_ENABLED", True)
+        # Log SQL statements slower than this (0 disables)
+        self.SLOW_QUERY_MS: int = _int_env("SLOW_QUERY_MS", 500)
+        # Add a Server-Timing header (app, db, pool, bcrypt durations) to every response
+        self.SERVER_TIMING: bool = _bool_env("SERVER_TIMING", False)
+        # Rate limiting: token bucket per user (per client IP on /auth and /categories);
+        # PER_MINUTE is the refill rate, BURST the bucket size, 0 per minute disables that router's limit
+        self.RATE_LIMIT_ENABLED: bool = _bool_env("RATE_LIMIT_ENABLED", True)
+        self.RATE_LIMIT_AUTH_PER_MINUTE: int = _int_env("RATE_LIMIT_AUTH_PER_MINUTE", 30)
+        self.RATE_LIMIT_AUTH_BURST: int = _int_env("RATE_LIMIT_AUTH_BURST", 10)
+        self.RATE_LIMIT_TASKS_PER_MINUTE: int = _int_env("RATE_LIMIT_TASKS_PER_MINUTE", 1200)
+        self.RATE_LIMIT_TASKS_BURST: int = _int_env("RATE_LIMIT_TASKS_BURST", 100)
+        self.RATE_LIMIT_CATEGORIES_PER_MINUTE: int = _int_env("RATE_LIMIT_CATEGORIES_PER_MINUTE", 600)
+        self.RATE_LIMIT_CATEGORIES_BURST: int = _int_env("RATE_LIMIT_CATEGORIES_BURST", 60)
+        # Requests served at once before new ones get 503 + Retry-After (0 disables)
+        self.MAX_IN_FLIGHT_REQUESTS: int = _int_env("MAX_IN_FLIGHT_REQUESTS", 256)
+        # python -m python_api serve: worker processes (0 = one per CPU), listen socket,
+        # idle keep-alive, accept backlog and how long SIGTERM waits for in-flight requests
+        self.SERVE_HOST: str = os.getenv("SERVE_HOST", "0.0.0.0")
+        self.SERVE_PORT: int = _int_env("SERVE_PORT", 8000)
+        self.SERVE_WORKERS: int = _int_env("SERVE_WORKERS", 0)
+        self.SERVE_KEEP_ALIVE_SECONDS: int = _int_env("SERVE_KEEP_ALIVE_SECONDS", 5)
+        self.SERVE_BACKLOG: int = _int_env("SERVE_BACKLOG", 2048)
+        self.SERVE_GRACEFUL_TIMEOUT_SECONDS: int = _int_env("SERVE_GRACEFUL_TIMEOUT_SECONDS", 30)
+        # Event loop / HTTP parser: "auto" uses uvloop / httptools when installed
+        self.SERVE_LOOP: str = os.getenv("SERVE_LOOP", "auto")
+        self.SERVE_HTTP: str = os.getenv("SERVE_HTTP", "auto")
         # Auth
         self.SECRET_KEY: str = os.getenv("SECRET_KEY", "secret")
         try:
             self.ACCESS_TOKEN_EXPIRE_MINUTES: int = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", 30))
         except ValueError:
             self.ACCESS_TOKEN_EXPIRE_MINUTES = 30
+        self.REFRESH_TOKEN_EXPIRE_DAYS: int = _int_env("REFRESH_TOKEN_EXPIRE_DAYS", 7)
+        # POST /auth/refresh revokes the refresh token it receives and returns a new one
+        self.REFRESH_TOKEN_ROTATION: bool = _bool_env("REFRESH_TOKEN_ROTATION", True)
+        # Serialize task responses from row tuples with orjson instead of ORM objects + pydantic
+        self.FAST_JSON_RESPONSES: bool = _bool_env("FAST_JSON_RESPONSES", True)
+        # GET /categories cache: "memory://" (per process), "redis://..." (shared) or "none"
+        self.CATEGORY_CACHE_URL: str = os.getenv("CATEGORY_CACHE_URL", "memory://")
+        # Verified access tokens kept in memory (0 disables the cache)
+        self.TOKEN_CACHE_SIZE: int = _int_env("TOKEN_CACHE_SIZE", 10000)
+        # GET /tasks/stats: "dueSoon" counts pending tasks due within this many hours
+        self.TASK_DUE_SOON_HOURS: int = _int_env("TASK_DUE_SOON_HOURS", 24)
+        # GET /tasks/changes: longest long-poll wait, how long an SSE stream stays open,
+        # how often waiters re-read the log (changes from other workers, SSE keep-alives)
+        self.TASK_CHANGES_MAX_WAIT_SECONDS: int = _int_env("TASK_CHANGES_MAX_WAIT_SECONDS", 30)
+        self.TASK_CHANGES_STREAM_SECONDS: int = _int_env("TASK_CHANGES_STREAM_SECONDS", 300)
+        self.TASK_CHANGES_POLL_SECONDS: int = _int_env("TASK_CHANGES_POLL_SECONDS", 5)
+        # python -m python_api compact-changes drops tombstones older than this
+        self.TASK_CHANGES_RETENTION_DAYS: int = _int_env("TASK_CHANGES_RETENTION_DAYS", 30)
+        # Maximum items accepted by the /tasks/batch endpoints
+        self.TASK_BATCH_MAX_ITEMS: int = _int_env("TASK_BATCH_MAX_ITEMS", 1000)
+        # NDJSON import: rows per INSERT/COMMIT, longest accepted line, errors echoed back
+        self.TASK_IMPORT_CHUNK_ROWS: int = _int_env("TASK_IMPORT_CHUNK_ROWS", 1000)
+        self.TASK_IMPORT_MAX_LINE_BYTES: int = _int_env("TASK_IMPORT_MAX_LINE_BYTES", 65536)
+        self.TASK_IMPORT_MAX_ERRORS: int = _int_env("TASK_IMPORT_MAX_ERRORS", 100)
+        # Password hashing: bcrypt cost and the process pool that runs it
+        self.BCRYPT_ROUNDS: int = _int_env("BCRYPT_ROUNDS", 12)
+        self.PASSWORD_HASH_WORKERS: int = _int_env("PASSWORD_HASH_WORKERS", min(4, os.cpu_count() or 1))
+        self.PASSWORD_HASH_MAX_PENDING: int = _int_env("PASSWORD_HASH_MAX_PENDING", 64)
 
 
 settings = Settings()
 
+
+def get_settings(request: Request) -> Settings:
+    """Dependency: the Settings the serving app was built with (``create_app``)."""
+    return request.app.state.settings
@@ -4,6 +4,7 @@ from fastapi.encoders import jsonable_encoder
 from starlette.exceptions import HTTPException as StarletteHTTPException
 from fastapi.exceptions import RequestValidationError
 from ..schemas.error import ErrorDetail, ErrorResponse
+from ..utils.error_format import validation_details
 from datetime import datetime, timezone
 
 
@@ -11,14 +12,9 @@ def add_error_handlers(app: FastAPI):
     @app.exception_handler(RequestValidationError)
     async def validation_exception_handler(request: Request, exc: RequestValidationError):
         # Transform list of validation errors into { field: [messages] }
-        details = {}
         try:
-            for err in exc.errors():
-                loc = err.get("loc", [])
-                # Ignore the first segment like 'body', 'query', etc.
-                key_parts = [str(p) for p in loc[1:]] if len(loc) > 1 else [str(loc[0])] if loc else ["__root__"]
-                key = ".".join(key_parts)
-                details.setdefault(key, []).append(err.get("msg", "Invalid value"))
+            # Ignore the first segment like 'body', 'query', etc.
+            details = validation_details(exc.errors(), skip=1)
         except Exception:
             details = None
 
@@ -43,7 +39,7 @@ def add_error_handlers(app: FastAPI):
             timestamp=datetime.now(timezone.utc),
             path=str(request.url.path),
         )
-        return JSONResponse(status_code=exc.status_code, content=jsonable_encoder(err))
+        return JSONResponse(status_code=exc.status_code, content=jsonable_encoder(err), headers=getattr(exc, "headers", None))
 
     @app.exception_handler(Exception)
     async def generic_exception_handler(request: Request, exc: Exception):
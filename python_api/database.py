@@ -1,11 +1,401 @@
-from sqlalchemy import create_engine
+import hashlib
+import os
+import threading
+import time
+from functools import lru_cache
+from pathlib import Path
+from typing import Optional, Union
+from fastapi import Depends
+from sqlalchemy import create_engine, event, inspect
+from sqlalchemy.engine import make_url
+from sqlalchemy.orm import Session
 from sqlalchemy.orm import declarative_base
 from sqlalchemy.orm import sessionmaker
-from .core.config import settings
+from starlette.concurrency import run_in_threadpool
+from .core.config import Settings, settings
+from .services import metrics
+
+
+def _sqlite_pragmas(cfg: Settings, read_only: bool = False) -> list:
+    pragmas = [
+        # journal_mode is persistent in the database file; only the writer sets it
+        ("journal_mode", None if read_only else cfg.SQLITE_JOURNAL_MODE),
+        ("synchronous", cfg.SQLITE_SYNCHRONOUS),
+        ("busy_timeout", cfg.SQLITE_BUSY_TIMEOUT_MS),
+        ("cache_size", cfg.SQLITE_CACHE_SIZE),
+        ("mmap_size", cfg.SQLITE_MMAP_SIZE),
+        ("temp_store", cfg.SQLITE_TEMP_STORE),
+        ("query_only", "ON" if read_only else None),
+    ]
+    return [(name, value) for name, value in pragmas if value not in (None, "")]
+
+
+def _apply_sqlite_pragmas(engine, cfg: Settings, read_only: bool = False):
+    """Run the configured PRAGMAs on every connection ``engine`` opens (no-op for other databases)."""
+    if engine.dialect.name != "sqlite":
+        return engine
+    pragmas = _sqlite_pragmas(cfg, read_only)
+
+    @event.listens_for(engine, "connect")
+    def _on_connect(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        for name, value in pragmas:
+            cursor.execute(f"PRAGMA {name}={value}")
+        cursor.close()
+
+    return engine
+
+
+_timed_pools = {}
+
+
+def _timed_pool_class(pool_class, name: str):
+    # Subclass of the engine's own pool class that times checkouts; kept across
+    # dispose(), which recreates the pool from its class
+    key = (pool_class, name)
+    if key not in _timed_pools:
+        def _do_get(self):
+            started = time.perf_counter()
+            try:
+                return pool_class._do_get(self)
+            finally:
+                metrics.record_pool_checkout(name, time.perf_counter() - started)
+
+        _timed_pools[key] = type(f"Timed{pool_class.__name__}", (pool_class,), {"_do_get": _do_get})
+    return _timed_pools[key]
+
+
+def _instrument_engine(engine, cfg: Settings, pool: str):
+    """Count statements and DB time for the current request, and time pool checkouts."""
+    if not cfg.METRICS_ENABLED:
+        return engine
+    slow_query_seconds = cfg.SLOW_QUERY_MS / 1000 if cfg.SLOW_QUERY_MS > 0 else None
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        context._metrics_started = time.perf_counter()
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        metrics.record_statement(time.perf_counter() - context._metrics_started, statement, slow_query_seconds)
+
+    engine.pool.__class__ = _timed_pool_class(type(engine.pool), pool)
+    return engine
+
+
+def _sqlite_file(url: str) -> Optional[str]:
+    """Path of the SQLite file behind ``url``; None for other databases and in-memory SQLite."""
+    parsed = make_url(url)
+    in_memory = parsed.database in (None, "", ":memory:") or "mode=memory" in str(parsed)
+    return parsed.database if parsed.get_backend_name() == "sqlite" and not in_memory else None
+
+
+def _separate_read_pool(url: str, cfg: Settings) -> bool:
+    # In-memory databases are private to one connection, so they cannot have a second pool
+    return _sqlite_file(url) is not None and cfg.SQLITE_READ_POOL_SIZE > 0
+
+
+def _attach_global(engine, path: Optional[str]):
+    """Attach the global database to every connection of a shard engine.
+
+    SQLite resolves unqualified names in the main database first, so task
+    queries on a shard still join ``categories`` (which only exists globally).
+    """
+    if path is None:
+        return engine
+
+    @event.listens_for(engine, "connect")
+    def _on_connect(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        cursor.execute("ATTACH DATABASE ? AS shared", (path,))
+        cursor.close()
+
+    return engine
+
+
+def shard_url(url: str, index: int) -> str:
+    """``url`` with ``-shard<index>`` added to the SQLite file name (todo.db -> todo-shard0.db)."""
+    parsed = make_url(url)
+    path = Path(parsed.database)
+    return parsed.set(database=str(path.with_name(f"{path.stem}-shard{index}{path.suffix}"))).render_as_string(
+        hide_password=False
+    )
+
 
-engine = create_engine(
-    settings.DATABASE_URL,
-    connect_args={"check_same_thread": False} if settings.DATABASE_URL.startswith("sqlite") else {},
-)
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 Base = declarative_base()
+
+# Engines and session factories are built on first use (see __getattr__), so
+# importing the app, a router or a model never opens or configures a database.
+_cfg = settings
+_lock = threading.Lock()
+_built = {}
+# Per-shard engines and session factories (same names as _built), by shard index
+_shards = {}
+_SYNC_NAMES = ("engine", "SessionLocal", "read_engine", "ReadSessionLocal")
+_ASYNC_NAMES = ("async_engine", "AsyncSessionLocal", "async_read_engine", "AsyncReadSessionLocal")
+
+
+def _build_sync(cfg: Settings, url: Optional[str] = None, attach: Optional[str] = None) -> dict:
+    url = url or cfg.DATABASE_URL
+    sqlite = url.startswith("sqlite")
+    engine = _instrument_engine(_attach_global(_apply_sqlite_pragmas(create_engine(
+        url,
+        connect_args={"check_same_thread": False} if sqlite else {},
+    ), cfg), attach), cfg, "write")
+    # Read-only pool for GET routes: with WAL, readers on their own connections never
+    # queue behind the writer, and query_only guarantees they cannot take the write lock
+    if _separate_read_pool(url, cfg):
+        read_engine = _instrument_engine(_attach_global(_apply_sqlite_pragmas(create_engine(
+            url,
+            connect_args={"check_same_thread": False},
+            pool_size=cfg.SQLITE_READ_POOL_SIZE,
+        ), cfg, read_only=True), attach), cfg, "read")
+    else:
+        read_engine = engine
+    return {
+        "engine": engine,
+        "SessionLocal": sessionmaker(autocommit=False, autoflush=False, bind=engine),
+        "read_engine": read_engine,
+        "ReadSessionLocal": sessionmaker(autocommit=False, autoflush=False, bind=read_engine),
+    }
+
+
+def _build_async(cfg: Settings, url: Optional[str] = None, attach: Optional[str] = None) -> dict:
+    if cfg.DB_MODE != "async":
+        return dict.fromkeys(_ASYNC_NAMES)
+    from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+    url = url or cfg.ASYNC_DATABASE_URL
+    async_engine = create_async_engine(url)
+    _instrument_engine(_attach_global(_apply_sqlite_pragmas(async_engine.sync_engine, cfg), attach), cfg, "write")
+    if _separate_read_pool(url, cfg):
+        async_read_engine = create_async_engine(url, pool_size=cfg.SQLITE_READ_POOL_SIZE)
+        _instrument_engine(
+            _attach_global(_apply_sqlite_pragmas(async_read_engine.sync_engine, cfg, read_only=True), attach), cfg, "read"
+        )
+    else:
+        async_read_engine = async_engine
+    return {
+        "async_engine": async_engine,
+        "AsyncSessionLocal": async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False),
+        "async_read_engine": async_read_engine,
+        "AsyncReadSessionLocal": async_sessionmaker(async_read_engine, autoflush=False, expire_on_commit=False),
+    }
+
+
+def __getattr__(name: str):
+    if name not in _SYNC_NAMES and name not in _ASYNC_NAMES:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    with _lock:
+        if name not in _built:
+            _built.update(_build_sync(_cfg) if name in _SYNC_NAMES else _build_async(_cfg))
+        return _built[name]
+
+
+def shard(index: int, name: str):
+    """``name`` (engine, SessionLocal, ...) of shard ``index``, built on first use like the globals."""
+    if name not in _SYNC_NAMES and name not in _ASYNC_NAMES:
+        raise AttributeError(f"shards have no attribute {name!r}")
+    with _lock:
+        built = _shards.setdefault(index, {})
+        if name not in built:
+            attach = _sqlite_file(_cfg.DATABASE_URL)
+            if attach is None:
+                raise RuntimeError("DATABASE_SHARDS needs a file-based SQLite DATABASE_URL")
+            if name in _SYNC_NAMES:
+                built.update(_build_sync(_cfg, shard_url(_cfg.DATABASE_URL, index), attach))
+            else:
+                built.update(_build_async(_cfg, shard_url(_cfg.ASYNC_DATABASE_URL, index), attach))
+        return built[name]
+
+
+@lru_cache(maxsize=65536)
+def _rendezvous(user_id: str, shards: int) -> int:
+    # Highest-random-weight hashing: going from N to N+1 shards moves only the
+    # ~1/(N+1) of users whose new shard wins, where modulo would move most of them
+    return max(range(shards), key=lambda index: hashlib.blake2b(f"{index}:{user_id}".encode(), digest_size=8).digest())
+
+
+def shard_for(user_id: str, shards: Optional[int] = None) -> Optional[int]:
+    """Shard holding ``user_id``'s tasks (stable across processes); None when DATABASE_SHARDS is 0."""
+    shards = _cfg.DATABASE_SHARDS if shards is None else shards
+    return _rendezvous(user_id, shards) if shards > 0 else None
+
+
+def user_sessionmaker(user_id: str, read: bool = False):
+    """Session factory for ``user_id``'s task data: its shard, or the global database when unsharded."""
+    name = ("Async" if _cfg.DB_MODE == "async" else "") + ("ReadSessionLocal" if read else "SessionLocal")
+    index = shard_for(user_id)
+    return __getattr__(name) if index is None else shard(index, name)
+
+
+def user_engine(user_id: str, read: bool = False):
+    """Engine behind ``user_sessionmaker`` (the sync side of an AsyncEngine), e.g. for event listeners."""
+    name = ("async_" if _cfg.DB_MODE == "async" else "") + ("read_engine" if read else "engine")
+    index = shard_for(user_id)
+    engine = __getattr__(name) if index is None else shard(index, name)
+    return getattr(engine, "sync_engine", engine)
+
+
+def task_sessionmakers(user_id: Optional[str] = None) -> list:
+    """Sync write session factories of every database holding task data (only ``user_id``'s, if given)."""
+    if _cfg.DATABASE_SHARDS <= 0:
+        return [__getattr__("SessionLocal")]
+    if user_id is not None:
+        return [shard(shard_for(user_id), "SessionLocal")]
+    return [shard(index, "SessionLocal") for index in range(_cfg.DATABASE_SHARDS)]
+
+
+def existing_shards() -> list:
+    """Indexes of the shard files on disk: the configured ones plus any left over from a larger DATABASE_SHARDS."""
+    index, found = 0, []
+    while True:
+        exists = Path(make_url(shard_url(_cfg.DATABASE_URL, index)).database).exists()
+        if not exists and index >= _cfg.DATABASE_SHARDS:
+            return found
+        if exists:
+            found.append(index)
+        index += 1
+
+
+def configure(cfg: Settings) -> None:
+    """Use ``cfg`` for engines built from now on (call before the first request)."""
+    global _cfg
+    with _lock:
+        _cfg = cfg
+        for built in (_built, *_shards.values()):
+            for engine in {built.get("engine"), built.get("read_engine")} - {None}:
+                engine.dispose()
+        _built.clear()
+        _shards.clear()
+
+
+async def dispose_engines() -> None:
+    """Close every pooled connection; engines are rebuilt lazily if used again."""
+    with _lock:
+        everything = [dict(_built), *(dict(built) for built in _shards.values())]
+        _built.clear()
+        _shards.clear()
+    for built in everything:
+        for name in ("engine", "read_engine"):
+            if built.get(name) is not None:
+                built[name].dispose()
+        for name in ("async_engine", "async_read_engine"):
+            if built.get(name) is not None:
+                await built[name].dispose()
+
+
+def _after_fork_in_child() -> None:
+    # A forked worker (gunicorn --preload, a fork-based supervisor) inherits the
+    # parent's pooled SQLite connections; give it fresh pools without closing the
+    # parent's sockets/file handles. uvicorn --workers spawns, so nothing is inherited.
+    global _lock
+    _lock = threading.Lock()
+    for built in (_built, *_shards.values()):
+        for name in ("engine", "read_engine"):
+            if built.get(name) is not None:
+                built[name].dispose(close=False)
+        for name in ("async_engine", "async_read_engine"):
+            if built.get(name) is not None:
+                built[name].sync_engine.dispose(close=False)
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_after_fork_in_child)
+
+
+def _create_task_tables(bind, tables=None) -> None:
+    from .models.task import Task
+    from .models.task_counter import TaskCategoryCounter, TaskCounter
+    from .services.task_counters import rebuild_task_counters
+    from .services.task_search import ensure_search_index
+
+    existing = set(inspect(bind).get_table_names())
+    Base.metadata.create_all(bind=bind, tables=tables)
+    ensure_search_index(bind)
+    # Counter tables added to a database that already has tasks start from those tasks
+    counters = {TaskCounter.__tablename__, TaskCategoryCounter.__tablename__}
+    if Task.__tablename__ in existing and not counters <= existing:
+        with Session(bind) as db:
+            rebuild_task_counters(db)
+            db.commit()
+
+
+def create_schema(bind=None) -> None:
+    """Create missing tables and the search index (``python -m python_api create-schema``).
+
+    With DATABASE_SHARDS, users and categories go to the global database and
+    the task tables and search index to every shard. Counters are backfilled
+    when their tables are new to a database that already has tasks.
+    """
+    from . import models  # registers every table on Base.metadata
+
+    if bind is None and _cfg.DATABASE_SHARDS > 0:
+        Base.metadata.create_all(bind=__getattr__("engine"), tables=models.GLOBAL_TABLES)
+        for index in range(_cfg.DATABASE_SHARDS):
+            _create_task_tables(shard(index, "engine"), models.USER_TABLES)
+        return
+    _create_task_tables(bind if bind is not None else __getattr__("engine"))
+
+
+# Session type handed to routes by get_db, depending on settings.DB_MODE
+if settings.DB_MODE == "async":
+    from sqlalchemy.ext.asyncio import AsyncSession
+
+    AnySession = Union[Session, AsyncSession]
+
+    async def get_db():
+        async with __getattr__("AsyncSessionLocal")() as db:
+            yield db
+
+    async def get_read_db():
+        async with __getattr__("AsyncReadSessionLocal")() as db:
+            yield db
+
+    def user_db(current_user, read: bool = False):
+        """get_db (or get_read_db) on the authenticated user's shard; ``current_user`` resolves the user id."""
+        async def get_user_db(user_id: str = Depends(current_user)):
+            async with user_sessionmaker(user_id, read)() as db:
+                yield db
+
+        return get_user_db
+else:
+    # sqlalchemy.ext.asyncio (and greenlet) is only imported in async mode
+    AnySession = Session
+
+    def get_db():
+        db = __getattr__("SessionLocal")()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    def get_read_db():
+        db = __getattr__("ReadSessionLocal")()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    def user_db(current_user, read: bool = False):
+        """get_db (or get_read_db) on the authenticated user's shard; ``current_user`` resolves the user id."""
+        def get_user_db(user_id: str = Depends(current_user)):
+            db = user_sessionmaker(user_id, read)()
+            try:
+                yield db
+            finally:
+                db.close()
+
+        return get_user_db
+
+
+async def run_db(db: AnySession, fn, *args, **kwargs):
+    """Run ``fn(session, *args, **kwargs)`` without blocking the event loop.
+
+    With an AsyncSession the function runs through ``run_sync`` on the async
+    driver; with a sync Session it is dispatched to the threadpool.
+    """
+    run_sync = getattr(db, "run_sync", None)
+    if run_sync is not None:
+        return await run_sync(fn, *args, **kwargs)
+    return await run_in_threadpool(fn, db, *args, **kwargs)
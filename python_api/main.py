@@ -1,25 +1,77 @@
-from fastapi import FastAPI
+from contextlib import asynccontextmanager
+from typing import Optional
+from fastapi import Depends, FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from .database import Base, engine
-from .routers import tasks, users, categories
+from starlette.concurrency import run_in_threadpool
+from . import database
+from .routers import tasks, users, categories, metrics
+from .core.config import Settings, settings
 from .core.error_handlers import add_error_handlers
+from .services.metrics import MetricsMiddleware
+from .services.passwords import password_hasher
+from .services.rate_limit import LoadSheddingMiddleware, RateLimiter, limit_by_ip, limit_by_user
 
-Base.metadata.create_all(bind=engine)
 
+def _rate_limit(app_settings: Settings, name: str, dependency) -> list:
+	# RATE_LIMIT_<NAME>_PER_MINUTE / _BURST; each app gets its own buckets
+	per_minute = getattr(app_settings, f"RATE_LIMIT_{name.upper()}_PER_MINUTE")
+	if not app_settings.RATE_LIMIT_ENABLED or per_minute <= 0:
+		return []
+	limiter = RateLimiter(name, per_minute, getattr(app_settings, f"RATE_LIMIT_{name.upper()}_BURST"))
+	return [Depends(dependency(limiter))]
 
-app = FastAPI(title="ToDo List API", version="1.0.0")
 
-# Permitir CORS para el frontend local (ajusta el puerto si es necesario)
-app.add_middleware(
-	CORSMiddleware,
-	allow_origins=["http://localhost:5173", "http://127.0.0.1:5173"],
-	allow_credentials=True,
-	allow_methods=["*"],
-	allow_headers=["*"],
-)
+def create_app(app_settings: Optional[Settings] = None) -> FastAPI:
+	"""Build the application. Nothing here touches the database: engines are
+	created on first use, and the schema only when CREATE_SCHEMA_ON_STARTUP is
+	set (otherwise run ``python -m python_api create-schema`` once).
 
-app.include_router(users.router, prefix="/auth", tags=["Authentication"])
-app.include_router(tasks.router, prefix="/tasks", tags=["Tasks"])
-app.include_router(categories.router, prefix="/categories", tags=["Categories"])
+	Routes read ``app_settings`` per request (``get_settings``). DB_MODE picks
+	the session type when ``database`` is imported, so it must match the
+	environment's; process-wide singletons (password hasher, token and
+	category caches) are configured from the environment."""
+	if app_settings is None:
+		app_settings = settings
+	else:
+		if app_settings.DB_MODE != settings.DB_MODE:
+			raise ValueError(f"DB_MODE={app_settings.DB_MODE!r} differs from the environment's {settings.DB_MODE!r}")
+		database.configure(app_settings)
 
-add_error_handlers(app)
+	@asynccontextmanager
+	async def lifespan(app: FastAPI):
+		if app_settings.CREATE_SCHEMA_ON_STARTUP:
+			await run_in_threadpool(database.create_schema)
+		yield
+		password_hasher.shutdown()
+		await database.dispose_engines()
+
+	app = FastAPI(title="ToDo List API", version="1.0.0", lifespan=lifespan)
+	app.state.settings = app_settings
+
+	if app_settings.MAX_IN_FLIGHT_REQUESTS > 0:
+		app.add_middleware(LoadSheddingMiddleware, max_in_flight=app_settings.MAX_IN_FLIGHT_REQUESTS)
+
+	# Permitir CORS para el frontend local (ajusta el puerto si es necesario)
+	app.add_middleware(
+		CORSMiddleware,
+		allow_origins=["http://localhost:5173", "http://127.0.0.1:5173"],
+		allow_credentials=True,
+		allow_methods=["*"],
+		allow_headers=["*"],
+	)
+
+	app.include_router(users.router, prefix="/auth", tags=["Authentication"],
+		dependencies=_rate_limit(app_settings, "auth", limit_by_ip))
+	app.include_router(tasks.router, prefix="/tasks", tags=["Tasks"],
+		dependencies=_rate_limit(app_settings, "tasks", lambda limiter: limit_by_user(limiter, tasks.get_current_user)))
+	app.include_router(categories.router, prefix="/categories", tags=["Categories"],
+		dependencies=_rate_limit(app_settings, "categories", limit_by_ip))
+	if app_settings.METRICS_ENABLED:
+		app.include_router(metrics.router)
+		app.add_middleware(MetricsMiddleware, server_timing=app_settings.SERVER_TIMING)
+
+	add_error_handlers(app)
+	return app
+
+
+app = create_app()
@@ -0,0 +1,13 @@
+# Importing the package registers every table on Base.metadata
+from . import category, task, task_change, task_counter, task_version, user  # noqa: F401
+
+# Tables keyed by user: with DATABASE_SHARDS they live in each user's shard, the rest stay global
+USER_TABLES = (
+    task.Task.__table__,
+    task_counter.TaskCounter.__table__,
+    task_counter.TaskCategoryCounter.__table__,
+    task_version.TaskVersion.__table__,
+    task_change.TaskChange.__table__,
+    task_change.TaskChangeFloor.__table__,
+)
+GLOBAL_TABLES = (user.User.__table__, category.Category.__table__)
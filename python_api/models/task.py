@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, DateTime, Enum, ForeignKey
+from sqlalchemy import Column, String, DateTime, Enum, ForeignKey, Index, Integer, literal_column, text
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from ..database import Base
@@ -14,6 +14,15 @@ class TaskPriority(str, enum.Enum):
     medium = "medium"
     high = "high"
 
+# Sort keys for GET /tasks?sort=..., indexed as expressions. They are written as
+# literal SQL because SQLite only uses an expression index when the ORDER BY /
+# WHERE expression is the same one: priority in low < medium < high order, and
+# due_date with undated tasks after every dated one.
+PRIORITY_RANK_SQL = "CASE priority WHEN 'low' THEN 0 WHEN 'medium' THEN 1 WHEN 'high' THEN 2 END"
+DUE_KEY_SQL = "coalesce(due_date, '9999-12-31 23:59:59.999999')"
+PRIORITY_RANK = literal_column(PRIORITY_RANK_SQL, Integer)
+DUE_KEY = literal_column(DUE_KEY_SQL, DateTime(timezone=True))
+
 class Task(Base):
     __tablename__ = "tasks"
     id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
@@ -28,3 +37,19 @@ class Task(Base):
     user_id = Column(String, ForeignKey("users.id"), nullable=True)
     category = relationship("Category", back_populates="tasks")
     user = relationship("User", back_populates="tasks")
+
+    # Keyset pagination walks (sort key, created_at, id) within a user's tasks.
+    # Every index ends in (created_at, id) so any of them returns rows in list
+    # order; the equality columns in front cover the common filters for each
+    # sort. The due-date ones also serve the overdue/due-soon counts of /tasks/stats.
+    __table_args__ = (
+        Index("ix_tasks_user_created", "user_id", "created_at", "id"),
+        Index("ix_tasks_user_status_created", "user_id", "status", "created_at", "id"),
+        Index("ix_tasks_user_priority_created", "user_id", "priority", "created_at", "id"),
+        Index("ix_tasks_user_status_priority_created", "user_id", "status", "priority", "created_at", "id"),
+        Index("ix_tasks_user_category_created", "user_id", "category_id", "created_at", "id"),
+        Index("ix_tasks_user_due_created", "user_id", text(DUE_KEY_SQL), "created_at", "id"),
+        Index("ix_tasks_user_status_due_created", "user_id", "status", text(DUE_KEY_SQL), "created_at", "id"),
+        Index("ix_tasks_user_rank_created", "user_id", text(PRIORITY_RANK_SQL), "created_at", "id"),
+        Index("ix_tasks_user_status_rank_created", "user_id", "status", text(PRIORITY_RANK_SQL), "created_at", "id"),
+    )
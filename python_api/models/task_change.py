@@ -0,0 +1,40 @@
+import enum
+from sqlalchemy import Column, String, Integer, DateTime, Enum, ForeignKey, Index
+from sqlalchemy.sql import func
+from ..database import Base
+
+class TaskChangeOp(str, enum.Enum):
+    upsert = "upsert"
+    delete = "delete"
+
+class TaskChange(Base):
+    """Append-only task change log read by GET /tasks/changes; deletes are kept as tombstones.
+
+    ``seq`` never goes backwards, even after compaction removes the newest rows
+    (AUTOINCREMENT on SQLite), so a client's ``since`` stays meaningful.
+    """
+    __tablename__ = "task_changes"
+    seq = Column(Integer, primary_key=True, autoincrement=True)
+    user_id = Column(String, ForeignKey("users.id"), nullable=False)
+    task_id = Column(String, nullable=False)
+    op = Column(Enum(TaskChangeOp), nullable=False)
+    changed_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+
+    __table_args__ = (
+        # The feed: one user's changes after a sequence number
+        Index("ix_task_changes_user_seq", "user_id", "seq"),
+        # Compaction: older entries for the same task
+        Index("ix_task_changes_task_seq", "task_id", "seq"),
+        {"sqlite_autoincrement": True},
+    )
+
+
+class TaskChangeFloor(Base):
+    """Highest ``seq`` compaction has dropped a tombstone at, per user.
+
+    A client asking for changes since an older sequence number may have missed
+    a delete and has to resync from GET /tasks.
+    """
+    __tablename__ = "task_change_floors"
+    user_id = Column(String, ForeignKey("users.id"), primary_key=True)
+    seq = Column(Integer, nullable=False, default=0)
@@ -0,0 +1,19 @@
+from sqlalchemy import Column, String, Integer, Enum, ForeignKey
+from ..database import Base
+from .task import TaskStatus, TaskPriority
+
+class TaskCounter(Base):
+    """Number of tasks a user has per (status, priority), kept in step with the tasks table."""
+    __tablename__ = "task_counters"
+    user_id = Column(String, ForeignKey("users.id"), primary_key=True)
+    status = Column(Enum(TaskStatus), primary_key=True)
+    priority = Column(Enum(TaskPriority), primary_key=True)
+    count = Column(Integer, nullable=False, default=0)
+
+
+class TaskCategoryCounter(Base):
+    """Number of tasks a user has per category; uncategorized tasks are the total minus these."""
+    __tablename__ = "task_category_counters"
+    user_id = Column(String, ForeignKey("users.id"), primary_key=True)
+    category_id = Column(String, ForeignKey("categories.id"), primary_key=True)
+    count = Column(Integer, nullable=False, default=0)
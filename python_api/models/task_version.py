@@ -0,0 +1,8 @@
+from sqlalchemy import Column, String, Integer, ForeignKey
+from ..database import Base
+
+class TaskVersion(Base):
+    """Per-user change counter, bumped by every task mutation (drives list ETags)."""
+    __tablename__ = "task_versions"
+    user_id = Column(String, ForeignKey("users.id"), primary_key=True)
+    version = Column(Integer, nullable=False, default=0)
@@ -1,28 +1,52 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
+from pydantic import TypeAdapter
 from sqlalchemy.orm import Session
 from ..schemas.category import CategoryCreate, CategoryOut
 from ..schemas.error import ErrorResponse
-from ..database import SessionLocal
+from ..database import AnySession, get_db, get_read_db, run_db
 from ..models.category import Category
+from ..services.category_cache import category_cache
+from ..utils.etag import etag_matches, make_etag
 from typing import List
 
 router = APIRouter()
+_category_list = TypeAdapter(List[CategoryOut])
 
-def get_db():
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
-
-@router.post("/", response_model=CategoryOut, responses={400: {"model": ErrorResponse}})
-def create_category(category: CategoryCreate, db: Session = Depends(get_db)):
+def _create_category(db: Session, category: CategoryCreate):
     db_category = Category(**category.model_dump())
     db.add(db_category)
     db.commit()
     db.refresh(db_category)
     return db_category
 
-@router.get("/", response_model=List[CategoryOut])
-def list_categories(db: Session = Depends(get_db)):
+@router.post("/", response_model=CategoryOut, responses={400: {"model": ErrorResponse}})
+async def create_category(category: CategoryCreate, db: AnySession = Depends(get_db)):
+    db_category = await run_db(db, _create_category, category)
+    if category_cache is not None:
+        await category_cache.invalidate()
+    return db_category
+
+def _list_categories(db: Session):
     return db.query(Category).all()
+
+def _encode_categories(db: Session) -> bytes:
+    categories = _category_list.validate_python(_list_categories(db), from_attributes=True)
+    return _category_list.dump_json(categories, by_alias=True)
+
+def _rebuild_categories(db: Session, generation: int):
+    return category_cache.rebuild(generation, lambda: _encode_categories(db))
+
+@router.get("/", response_model=List[CategoryOut], responses={304: {"description": "Not modified"}})
+async def list_categories(request: Request, db: AnySession = Depends(get_read_db)):
+    if category_cache is None:
+        # Same bytes and ETag as a cached response, encoded on every request
+        body = await run_db(db, _encode_categories)
+        etag = make_etag(body)
+    else:
+        generation, cached = await category_cache.lookup()
+        if cached is None:
+            cached = await run_db(db, _rebuild_categories, generation)
+        body, etag = cached
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers={"ETag": etag})
+    return Response(body, media_type="application/json", headers={"ETag": etag})
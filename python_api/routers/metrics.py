@@ -0,0 +1,24 @@
+from fastapi import APIRouter, Response
+from ..services import metrics
+from ..services.category_cache import category_cache
+from ..services.passwords import password_hasher
+from ..services.token_cache import token_cache
+
+router = APIRouter()
+
+# Components that already keep their own counters are read at scrape time
+metrics.register_callbacks([
+    ("password_hash_pending", "Hash/verify jobs queued or running", "gauge", lambda: password_hasher.stats()["pending"]),
+    ("password_hash_rejected_total", "Hash/verify jobs rejected with 503", "counter", lambda: password_hasher.stats()["rejected"]),
+    ("token_cache_hits_total", "Verified-token cache hits", "counter", lambda: token_cache.stats()["hits"]),
+    ("token_cache_misses_total", "Verified-token cache misses", "counter", lambda: token_cache.stats()["misses"]),
+])
+if category_cache is not None:
+    metrics.register_callbacks([
+        ("category_cache_hits_total", "Category list cache hits", "counter", lambda: category_cache.stats()["hits"]),
+        ("category_cache_misses_total", "Category list cache misses", "counter", lambda: category_cache.stats()["misses"]),
+    ])
+
+@router.get("/metrics", include_in_schema=False)
+async def get_metrics():
+    return Response(metrics.registry.render(), media_type=metrics.CONTENT_TYPE)
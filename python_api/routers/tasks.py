@@ -1,96 +1,826 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+import uuid
+from fastapi import APIRouter, Depends, Header, HTTPException, status, Query, Request
+from fastapi.exceptions import RequestValidationError
+from fastapi.responses import Response, StreamingResponse
+import asyncio
+from pydantic import ValidationError
+from sqlalchemy import String, and_, delete, func, insert, select, tuple_, type_coerce, update
 from sqlalchemy.orm import Session
-from ..schemas.task import TaskCreate, TaskUpdate, TaskOut, PaginatedTasks
-from ..schemas.error import ErrorResponse
-from ..database import SessionLocal
-from ..models.task import Task, TaskStatus, TaskPriority
-from typing import List, Optional
+from sqlalchemy.sql import operators
+from sqlalchemy.sql.expression import UnaryExpression
+from ..schemas.task import (
+    TaskCreate, TaskUpdate, TaskOut, PaginatedTasks,
+    TaskBatchCreate, TaskBatchUpdate, TaskBatchUpdateItem, TaskBatchDelete, TaskBatchItemResult, TaskBatchResult,
+    TaskImportResult, TaskStats, TaskChanges,
+)
+from ..schemas.error import ErrorResponse, ErrorDetail
+from ..utils.error_format import validation_details
+from ..database import AnySession, run_db, user_db
+from ..models.task import DUE_KEY, PRIORITY_RANK, Task, TaskStatus, TaskPriority
+from ..models.task_change import TaskChangeOp
+from ..models.category import Category
+from ..models.task_counter import TaskCategoryCounter, TaskCounter
+from typing import List, Literal, Optional
 from fastapi.security import OAuth2PasswordBearer
 from jose import jwt, JWTError
-from ..core.config import settings
+from ..core.config import Settings, get_settings
+from ..utils.pagination import encode_cursor, decode_cursor
+from ..services.token_cache import token_cache
+from ..services.task_counters import (
+    adjust_category_counter, adjust_task_counter, count_tasks, move_category_counter, move_task_counter, task_stats,
+)
+from ..services.task_changes import change_notifier, read_task_changes, record_task_changes
+from ..services.task_import import iter_ndjson_lines, parse_task_line
+from ..services.task_serialization import TASK_COLUMNS, TaskProjection, dumps, task_etag, task_row_to_dict, task_to_dict
+from ..services.task_search import apply_search
+from ..services.task_versions import bump_task_version, get_task_version
+from ..utils.etag import etag_matches, make_etag
+from ..services.task_export import ExportEncoder, MEDIA_TYPES, export_statement, stream_export, stream_export_async
 
 router = APIRouter()
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/login")
 ALGORITHM = "HS256"
 
-def get_db():
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
-
-def get_current_user(token: str = Depends(oauth2_scheme)):
+async def get_current_user(token: str = Depends(oauth2_scheme), cfg: Settings = Depends(get_settings)):
+    user_id = token_cache.get(token)
+    if user_id is not None:
+        return user_id
     try:
-        payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[ALGORITHM])
+        payload = jwt.decode(token, cfg.SECRET_KEY, algorithms=[ALGORITHM])
         user_id: str = payload.get("sub")
-        if user_id is None:
+        # Refresh tokens are only good for POST /auth/refresh
+        if user_id is None or payload.get("type") == "refresh":
             raise HTTPException(status_code=401, detail="Invalid authentication")
+        token_cache.put(token, user_id, payload.get("exp"))
         return user_id
     except JWTError:
         raise HTTPException(status_code=401, detail="Invalid authentication")
 
+# Task data lives in the user's shard (the global database when DATABASE_SHARDS is 0)
+get_user_db = user_db(get_current_user)
+get_user_read_db = user_db(get_current_user, read=True)
+
+def _task_columns(data: dict) -> dict:
+    # Schemas carry category_id as a UUID; the column stores its string form
+    if data.get("category_id") is not None:
+        data["category_id"] = str(data["category_id"])
+    # SQLite drops the offset of a stored datetime, so due dates are written in UTC
+    if data.get("due_date") is not None:
+        data["due_date"] = _utc(data["due_date"])
+    return data
+
+def _null_fields(data: dict) -> dict:
+    # TaskUpdate fields may be omitted, but these columns are NOT NULL
+    return {key: ["Field cannot be null"] for key in ("title", "status", "priority") if key in data and data[key] is None}
+
+def _check_max_items(items: list, limit: int, field: str):
+    # TASK_BATCH_MAX_ITEMS is per app, so the cap is checked here instead of in the schema
+    if len(items) > limit:
+        raise RequestValidationError([{
+            "type": "too_long", "loc": ("body", field),
+            "msg": f"List should have at most {limit} items after validation, not {len(items)}",
+        }])
+
+# Columns a PUT writes; compared in the UPDATE to detect a concurrent change
+_WRITABLE_COLUMNS = (Task.title, Task.description, Task.status, Task.priority, Task.due_date, Task.category_id)
+
+def _get_owned_task(db: Session, id: str, user_id: str) -> Task:
+    task = db.query(Task).filter(Task.id == id, Task.user_id == user_id).first()
+    if not task:
+        raise HTTPException(status_code=404, detail="Task not found")
+    return task
+
+def _utc(value: Optional[datetime]) -> Optional[datetime]:
+    # Stored datetimes are UTC (see _task_columns); naive values are taken as UTC too
+    if value is None or value.tzinfo is None:
+        return value
+    return value.astimezone(timezone.utc)
+
+def _sort_keys(sort: Optional[str]) -> tuple:
+    # ORDER BY columns for each sort; all end in (created_at, id) so the order is
+    # total and matches the trailing columns of the Task indexes. Keys are
+    # compared as stored (strings on SQLite) so cursor values round-trip exactly.
+    created_key = type_coerce(Task.created_at, String)
+    if sort == "dueDate":
+        return type_coerce(DUE_KEY, String), created_key, Task.id
+    if sort == "priority":
+        return PRIORITY_RANK, created_key, Task.id
+    return created_key, Task.id
+
+# Equality filters (after user_id) that each sort's indexes start with, most specific first
+_SORT_INDEX_PREFIXES = {
+    None: (("status", "priority"), ("status",), ("priority",), ("category_id",), ()),
+    "dueDate": (("status",), ()),
+    "priority": (("status",), ()),
+}
+
+def _index_prefix(sort: Optional[str], filtered: set) -> set:
+    return next(set(prefix) for prefix in _SORT_INDEX_PREFIXES[sort] if filtered.issuperset(prefix))
+
+class _IndexUse:
+    """Keeps SQLite on the index that already returns rows in list order.
+
+    Filters on columns outside that index are written as ``+column`` (SQLite's
+    way to exclude a term from index selection), otherwise the planner may
+    range-scan a filter's index and add a temp B-tree sort for the ORDER BY.
+    """
+
+    def __init__(self, db: Session, indexed: set):
+        self.hint = db.get_bind().dialect.name == "sqlite"
+        self.indexed = indexed
+
+    def __call__(self, name: str, expr):
+        if not self.hint or name in self.indexed:
+            return expr
+        return UnaryExpression(expr, operator=operators.custom_op("+"), type_=expr.type)
+
+def _after_cursor(keys: tuple, values: list, descending: bool):
+    bound = tuple_(*(type_coerce(value, key.type) for key, value in zip(keys, values)))
+    lead = type_coerce(values[0], keys[0].type)
+    # The plain bound on the leading key lets SQLite seek into expression indexes,
+    # which it does not do for a row-value comparison
+    if descending:
+        return and_(keys[0] <= lead, tuple_(*keys) < bound)
+    return and_(keys[0] >= lead, tuple_(*keys) > bound)
+
+def _list_tasks(
+    db: Session, user_id: str, status, priority, limit: int, offset: int, cursor: Optional[str],
+    fast: bool = False, q: Optional[str] = None, sort: Optional[str] = None, descending: bool = False,
+    category_id: Optional[str] = None, due_before: Optional[datetime] = None, due_after: Optional[datetime] = None,
+    created_after: Optional[datetime] = None, projection: Optional[TaskProjection] = None,
+):
+    # fast: select plain columns and build TaskOut-shaped dicts instead of hydrating ORM objects;
+    # a projection (fields= / include=category) always takes the column path
+    if projection is not None:
+        query, as_task = projection.query(db), projection.row_to_dict
+    else:
+        query = db.query(*(TASK_COLUMNS if fast else (Task,)))
+        as_task = task_row_to_dict if fast else (lambda row: row[0])
+    query = query.filter(Task.user_id == user_id)
+    sort = None if sort == "createdAt" else sort
+    equal = {"status": status, "priority": priority, "category_id": str(category_id) if category_id else None}
+    indexed = _index_prefix(sort, {name for name, value in equal.items() if value is not None})
+    # Range filters on the sort key seek into its index; due-date bounds go through the
+    # indexed expression, where undated tasks sort last, so "after" excludes them explicitly
+    indexed |= {"dueDate": {"due"}, None: {"created_at"}}.get(sort, set())
+    use = _IndexUse(db, indexed)
+    for name, value in equal.items():
+        if value is not None:
+            query = query.filter(use(name, getattr(Task, name)) == value)
+    if due_before is not None:
+        query = query.filter(use("due", DUE_KEY) < _utc(due_before))
+    if due_after is not None:
+        query = query.filter(use("due", DUE_KEY) > _utc(due_after), Task.due_date.is_not(None))
+    if created_after is not None:
+        query = query.filter(use("created_at", Task.created_at) > _utc(created_after))
+    # Counters only cover status/priority; other filters are counted with an index range
+    counted = category_id is None and due_before is None and due_after is None and created_after is None
+    keys = _sort_keys(sort)
+    order = [key.desc() if descending else key for key in keys]
+    if q:
+        if cursor is not None:
+            raise HTTPException(status_code=400, detail="Cursor pagination is not supported with q")
+        query, rank = apply_search(query, db, q)
+        # Counters do not cover text matches
+        total = query.count()
+        if sort is None and rank is not None:
+            order = [rank, *order]
+        rows = query.add_columns(*keys).order_by(*order).offset(offset).limit(limit).all()
+        tasks = [as_task(row) for row in rows]
+        return {"tasks": tasks, "pagination": {"total": total, "limit": limit, "nextCursor": None, "offset": offset}}
+    # Counters cover every status/priority combination, so no COUNT(*) scan is needed
+    total = count_tasks(db, user_id, status, priority) if counted else query.count()
+    page = query.add_columns(*keys).order_by(*order)
+    if cursor is not None:
+        try:
+            values = decode_cursor(cursor, len(keys))
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+        page = page.filter(_after_cursor(keys, values, descending))
+    else:
+        page = page.offset(offset)
+    # Fetch one extra row to know whether another page exists
+    rows = page.limit(limit + 1).all()
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    next_cursor = encode_cursor(*rows[-1][-len(keys):]) if has_more else None
+    pagination = {"total": total, "limit": limit, "nextCursor": next_cursor}
+    if cursor is None:
+        pagination["offset"] = offset
+    tasks = [as_task(row) for row in rows]
+    return {"tasks": tasks, "pagination": pagination}
+
+def _projection(fields: Optional[str], include: Optional[str]) -> Optional[TaskProjection]:
+    # fields: comma-separated TaskOut keys; None keeps the full TaskOut shape
+    if fields is None and include is None:
+        return None
+    names = None if fields is None else [name.strip() for name in fields.split(",") if name.strip()]
+    try:
+        return TaskProjection(names, include_category=include == "category")
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+
+def _category_version(db: Session) -> tuple:
+    # Changes whenever a category is added, edited or removed; the table is small
+    return tuple(db.execute(
+        select(func.count(), func.max(Category.created_at), func.max(Category.updated_at))
+    ).one())
+
+def _list_tasks_if_modified(db: Session, user_id: str, query_key, if_none_match: Optional[str], *args, **kwargs):
+    # The version is read first, in the same transaction, so the ETag is never newer than the page
+    version = get_task_version(db, user_id)
+    projection = kwargs.get("projection")
+    # Embedded categories change without any task changing
+    categories = _category_version(db) if projection is not None and projection.include_category else ()
+    etag = make_etag("tasks", user_id, version, query_key, *categories)
+    if etag_matches(if_none_match, etag):
+        return etag, None
+    return etag, _list_tasks(db, user_id, *args, **kwargs)
+
 @router.get("/", response_model=PaginatedTasks, responses={401: {"model": ErrorResponse}})
-def list_tasks(
+async def list_tasks(
+    request: Request,
+    response: Response,
     status: Optional[TaskStatus] = None,
     priority: Optional[TaskPriority] = None,
     limit: int = Query(20, ge=1, le=100),
     offset: int = Query(0, ge=0),
-    db: Session = Depends(get_db),
+    cursor: Optional[str] = None,
+    q: Optional[str] = Query(None, min_length=1, max_length=200),
+    sort: Optional[Literal["createdAt", "dueDate", "priority"]] = None,
+    order: Literal["asc", "desc"] = "asc",
+    category_id: Optional[uuid.UUID] = Query(None, alias="categoryId"),
+    due_before: Optional[datetime] = Query(None, alias="dueBefore"),
+    due_after: Optional[datetime] = Query(None, alias="dueAfter"),
+    created_after: Optional[datetime] = Query(None, alias="createdAfter"),
+    fields: Optional[str] = None,
+    include: Optional[Literal["category"]] = None,
+    db: AnySession = Depends(get_user_read_db),
     user_id: str = Depends(get_current_user),
+    cfg: Settings = Depends(get_settings),
 ):
-    query = db.query(Task).filter(Task.user_id == user_id)
-    if status:
-        query = query.filter(Task.status == status)
-    if priority:
-        query = query.filter(Task.priority == priority)
-    total = query.count()
-    tasks = query.offset(offset).limit(limit).all()
-    return {"tasks": tasks, "pagination": {"total": total, "limit": limit, "offset": offset}}
+    fast = cfg.FAST_JSON_RESPONSES
+    projection = _projection(fields, include)
+    query_key = sorted(request.query_params.multi_items())
+    etag, payload = await run_db(
+        db, _list_tasks_if_modified, user_id, query_key, request.headers.get("if-none-match"),
+        status, priority, limit, offset, cursor, fast, q,
+        sort=sort, descending=order == "desc", category_id=category_id,
+        due_before=due_before, due_after=due_after, created_after=created_after, projection=projection,
+    )
+    if payload is None:
+        return Response(status_code=304, headers={"ETag": etag})
+    if fast or projection is not None:
+        return Response(dumps(payload), media_type="application/json", headers={"ETag": etag})
+    response.headers["ETag"] = etag
+    return payload
+
+def _supports_returning(db: Session, kind: str) -> bool:
+    # kind: "insert", "update" or "delete"; SQLite >= 3.35 and PostgreSQL have RETURNING
+    return getattr(db.get_bind().dialect, f"{kind}_returning", False)
+
+def _task_response(task: dict, response: Response, cfg: Settings, status_code: int = 200):
+    etag = task_etag(task)
+    if cfg.FAST_JSON_RESPONSES:
+        return Response(dumps(task), status_code=status_code, media_type="application/json", headers={"ETag": etag})
+    response.headers["ETag"] = etag
+    return task
+
+def _create_task(db: Session, task: TaskCreate, user_id: str) -> dict:
+    row = _new_task_row(task, user_id)
+    if _supports_returning(db, "insert"):
+        created = task_row_to_dict(db.execute(insert(Task).values(**row).returning(*TASK_COLUMNS)).one())
+    else:
+        db_task = Task(**row)
+        db.add(db_task)
+        db.flush()
+        created = None
+    adjust_task_counter(db, user_id, row["status"], row["priority"], 1)
+    adjust_category_counter(db, user_id, row["category_id"], 1)
+    record_task_changes(db, user_id, [row["id"]])
+    bump_task_version(db, user_id)
+    db.commit()
+    if created is None:
+        db.refresh(db_task)
+        created = task_to_dict(db_task)
+    return created
 
 @router.post("/", response_model=TaskOut, status_code=201, responses={400: {"model": ErrorResponse}})
-def create_task(task: TaskCreate, db: Session = Depends(get_db), user_id: str = Depends(get_current_user)):
-    data = task.model_dump(exclude_unset=True)
-    db_task = Task(**data, user_id=user_id)
-    db.add(db_task)
+async def create_task(
+    task: TaskCreate,
+    response: Response,
+    db: AnySession = Depends(get_user_db),
+    user_id: str = Depends(get_current_user),
+    cfg: Settings = Depends(get_settings),
+):
+    created = await run_db(db, _create_task, task, user_id)
+    change_notifier.notify(user_id)
+    return _task_response(created, response, cfg, status_code=201)
+
+@router.get("/export", responses={200: {"content": {"application/x-ndjson": {}, "text/csv": {}}}, 401: {"model": ErrorResponse}})
+async def export_tasks(
+    format: Literal["ndjson", "csv"] = "ndjson",
+    status: Optional[TaskStatus] = None,
+    priority: Optional[TaskPriority] = None,
+    gzip: bool = False,
+    user_id: str = Depends(get_current_user),
+    cfg: Settings = Depends(get_settings),
+):
+    stmt = export_statement(user_id, status, priority)
+    encoder = ExportEncoder(format, gzip=gzip)
+    if cfg.DB_MODE == "async":
+        body = stream_export_async(stmt, encoder, user_id)
+    else:
+        body = stream_export(stmt, encoder, user_id)
+    headers = {"Content-Disposition": f'attachment; filename="tasks.{format}"'}
+    if gzip:
+        headers["Content-Encoding"] = "gzip"
+    return StreamingResponse(body, media_type=MEDIA_TYPES[format], headers=headers)
+
+def _task_stats(db: Session, user_id: str, due_soon_hours: int) -> dict:
+    stats = task_stats(db, user_id, datetime.now(timezone.utc), timedelta(hours=due_soon_hours))
+    stats["dueSoonHours"] = due_soon_hours
+    return stats
+
+@router.get("/stats", response_model=TaskStats, responses={401: {"model": ErrorResponse}})
+async def get_task_stats(
+    db: AnySession = Depends(get_user_read_db),
+    user_id: str = Depends(get_current_user),
+    cfg: Settings = Depends(get_settings),
+):
+    """Task counts for dashboards, read from the per-user counters (no task scan)."""
+    stats = await run_db(db, _task_stats, user_id, cfg.TASK_DUE_SOON_HOURS)
+    if cfg.FAST_JSON_RESPONSES:
+        return Response(dumps(stats), media_type="application/json")
+    return stats
+
+async def _change_batches(user_id: str, since: int, limit: int, seconds: float):
+    """Read the change log after ``since``, then again whenever the user's tasks change, for ``seconds``.
+
+    Every read is yielded, including empty ones (at least one per poll interval).
+    """
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + seconds
+    # Subscribed before the first read, so a commit between a read and the wait is not missed
+    event = change_notifier.subscribe(user_id)
+    try:
+        while True:
+            event.clear()
+            batch = await read_task_changes(user_id, since, limit)
+            yield batch
+            since = batch["nextSince"]
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                return
+            if not batch["hasMore"]:
+                await change_notifier.wait(event, remaining)
+    finally:
+        change_notifier.unsubscribe(user_id, event)
+
+async def _change_events(first: dict, batches):
+    # Server-Sent Events: one event per change, a comment line as keep-alive for empty reads
+    try:
+        batch = first
+        while True:
+            events = [
+                b"id: %d\nevent: %s\ndata: %s\n\n" % (change["seq"], change["op"].encode(), dumps(change))
+                for change in batch["changes"]
+            ]
+            yield b"".join(events) or b": keep-alive\n\n"
+            batch = await batches.__anext__()
+    except StopAsyncIteration:
+        return
+    finally:
+        await batches.aclose()
+
+@router.get(
+    "/changes",
+    response_model=TaskChanges,
+    responses={200: {"content": {"text/event-stream": {}}}, 401: {"model": ErrorResponse}, 410: {"model": ErrorResponse}},
+)
+async def list_task_changes(
+    request: Request,
+    since: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=1000),
+    wait: int = Query(0, ge=0),
+    last_event_id: Optional[int] = Header(None),
+    user_id: str = Depends(get_current_user),
+    cfg: Settings = Depends(get_settings),
+):
+    """Task changes after sequence number ``since``, oldest first.
+
+    With ``wait`` the request is held until something changes or ``wait``
+    seconds pass (long-poll). With ``Accept: text/event-stream`` the changes
+    are streamed as Server-Sent Events for ``wait`` seconds (default
+    TASK_CHANGES_STREAM_SECONDS); EventSource resumes from Last-Event-ID.
+    ``wait`` is capped at TASK_CHANGES_MAX_WAIT_SECONDS.
+    """
+    if wait > cfg.TASK_CHANGES_MAX_WAIT_SECONDS:
+        limit_message = f"Input should be less than or equal to {cfg.TASK_CHANGES_MAX_WAIT_SECONDS}"
+        raise RequestValidationError([{"type": "less_than_equal", "loc": ("query", "wait"), "msg": limit_message}])
+    if "text/event-stream" in request.headers.get("accept", ""):
+        since = last_event_id if last_event_id is not None else since
+        batches = _change_batches(user_id, since, limit, wait or cfg.TASK_CHANGES_STREAM_SECONDS)
+        # The first read happens here, so a compacted ``since`` is still a 410 response
+        first = await batches.__anext__()
+        headers = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+        return StreamingResponse(_change_events(first, batches), media_type="text/event-stream", headers=headers)
+    batches = _change_batches(user_id, since, limit, wait)
+    try:
+        async for payload in batches:
+            if payload["nextSince"] > since:
+                break
+    finally:
+        await batches.aclose()
+    if cfg.FAST_JSON_RESPONSES:
+        return Response(dumps(payload), media_type="application/json")
+    return payload
+
+def _batch_error(index: int, status_code: int, code: str, message: str, details=None, id=None):
+    return TaskBatchItemResult(
+        index=index, id=id, status=status_code, error=ErrorDetail(code=code, message=message, details=details)
+    )
+
+def _apply_counter_deltas(db: Session, user_id: str, deltas: Counter, category_deltas: Counter):
+    for (task_status, task_priority), delta in deltas.items():
+        adjust_task_counter(db, user_id, task_status, task_priority, delta)
+    for category_id, delta in category_deltas.items():
+        adjust_category_counter(db, user_id, category_id, delta)
+
+def _new_task_row(task: TaskCreate, user_id: str) -> dict:
+    values = _task_columns(task.model_dump())
+    values["status"] = values["status"] or TaskStatus.pending
+    values["priority"] = values["priority"] or TaskPriority.medium
+    return {"id": str(uuid.uuid4()), "user_id": user_id, **values}
+
+def _insert_task_rows(db: Session, rows: list, user_id: str):
+    db.execute(insert(Task), rows)
+    _apply_counter_deltas(
+        db, user_id, Counter((row["status"], row["priority"]) for row in rows), Counter(row["category_id"] for row in rows)
+    )
+    record_task_changes(db, user_id, [row["id"] for row in rows])
+    bump_task_version(db, user_id)
+
+def _create_tasks_batch(db: Session, items: list, user_id: str):
+    results = [None] * len(items)
+    rows, indexes = [], []
+    for index, item in enumerate(items):
+        try:
+            task = TaskCreate.model_validate(item)
+        except ValidationError as exc:
+            results[index] = _batch_error(index, 422, "VALIDATION_ERROR", "Invalid request data", validation_details(exc.errors()))
+            continue
+        rows.append(_new_task_row(task, user_id))
+        indexes.append(index)
+    if rows:
+        # One executemany INSERT, one SELECT to read back server defaults
+        _insert_task_rows(db, rows, user_id)
+        created = {t.id: t for t in db.query(Task).filter(Task.id.in_([row["id"] for row in rows]))}
+        for index, row in zip(indexes, rows):
+            results[index] = TaskBatchItemResult(
+                index=index, id=row["id"], status=201, task=TaskOut.model_validate(created[row["id"]])
+            )
     db.commit()
-    db.refresh(db_task)
-    return db_task
+    return {"results": results}
 
-@router.get("/{id}", response_model=TaskOut, responses={404: {"model": ErrorResponse}})
-def get_task(id: str, db: Session = Depends(get_db), user_id: str = Depends(get_current_user)):
-    task = db.query(Task).filter(Task.id == id, Task.user_id == user_id).first()
-    if not task:
+@router.post("/batch", response_model=TaskBatchResult, responses={401: {"model": ErrorResponse}})
+async def create_tasks_batch(
+    batch: TaskBatchCreate,
+    db: AnySession = Depends(get_user_db),
+    user_id: str = Depends(get_current_user),
+    cfg: Settings = Depends(get_settings),
+):
+    _check_max_items(batch.tasks, cfg.TASK_BATCH_MAX_ITEMS, "tasks")
+    result = await run_db(db, _create_tasks_batch, batch.tasks, user_id)
+    change_notifier.notify(user_id)
+    return result
+
+def _import_task_rows(db: Session, rows: list, user_id: str):
+    _insert_task_rows(db, rows, user_id)
+    db.commit()
+
+@router.post("/import", response_model=TaskImportResult, responses={401: {"model": ErrorResponse}})
+async def import_tasks(
+    request: Request,
+    db: AnySession = Depends(get_user_db),
+    user_id: str = Depends(get_current_user),
+    cfg: Settings = Depends(get_settings),
+):
+    """Import tasks from an NDJSON body (one TaskCreate object per line).
+
+    The body is parsed as it arrives and valid rows are inserted and committed
+    every TASK_IMPORT_CHUNK_ROWS rows, so memory does not grow with the upload.
+    """
+    result = {"inserted": 0, "rejected": 0, "errors": []}
+    rows = []
+    async for line_no, line in iter_ndjson_lines(request.stream(), cfg.TASK_IMPORT_MAX_LINE_BYTES):
+        if line is not None and not line.strip():
+            continue
+        task, details = parse_task_line(line)
+        if task is None:
+            result["rejected"] += 1
+            if len(result["errors"]) < cfg.TASK_IMPORT_MAX_ERRORS:
+                error = ErrorDetail(code="VALIDATION_ERROR", message="Invalid request data", details=details)
+                result["errors"].append({"line": line_no, "error": error})
+            continue
+        rows.append(_new_task_row(task, user_id))
+        if len(rows) >= cfg.TASK_IMPORT_CHUNK_ROWS:
+            await run_db(db, _import_task_rows, rows, user_id)
+            change_notifier.notify(user_id)
+            result["inserted"] += len(rows)
+            rows = []
+    if rows:
+        await run_db(db, _import_task_rows, rows, user_id)
+        change_notifier.notify(user_id)
+        result["inserted"] += len(rows)
+    return result
+
+def _update_tasks_batch(db: Session, items: list, user_id: str):
+    results = [None] * len(items)
+    updates = []
+    seen = set()
+    for index, item in enumerate(items):
+        try:
+            parsed = TaskBatchUpdateItem.model_validate(item)
+        except ValidationError as exc:
+            results[index] = _batch_error(index, 422, "VALIDATION_ERROR", "Invalid request data", validation_details(exc.errors()))
+            continue
+        task_id = str(parsed.id)
+        data = _task_columns(parsed.model_dump(exclude_unset=True, exclude={"id"}))
+        nulls = _null_fields(data)
+        if nulls:
+            results[index] = _batch_error(index, 422, "VALIDATION_ERROR", "Invalid request data", nulls, id=task_id)
+            continue
+        if task_id in seen:
+            results[index] = _batch_error(index, 409, "HTTP_ERROR", "Task appears more than once in this batch", id=task_id)
+            continue
+        seen.add(task_id)
+        updates.append((index, task_id, data))
+
+    owned = {t.id: t for t in db.query(Task).filter(Task.user_id == user_id, Task.id.in_(seen))} if seen else {}
+    params, deltas, category_deltas = [], Counter(), Counter()
+    for index, task_id, data in updates:
+        task = owned.get(task_id)
+        if task is None:
+            results[index] = _batch_error(index, 404, "HTTP_ERROR", "Task not found", id=task_id)
+            continue
+        deltas[(task.status, task.priority)] -= 1
+        deltas[(data.get("status", task.status), data.get("priority", task.priority))] += 1
+        category_deltas[task.category_id] -= 1
+        category_deltas[data.get("category_id", task.category_id)] += 1
+        if data:
+            params.append({"id": task_id, **data})
+    if params:
+        # ORM bulk UPDATE by primary key: executemany, grouped by the set of columns changed
+        db.execute(update(Task), params)
+    _apply_counter_deltas(db, user_id, deltas, category_deltas)
+    if params:
+        record_task_changes(db, user_id, [item["id"] for item in params])
+        bump_task_version(db, user_id)
+    updated_ids = [task_id for index, task_id, data in updates if task_id in owned]
+    if updated_ids:
+        fresh = {t.id: t for t in db.query(Task).populate_existing().filter(Task.id.in_(updated_ids))}
+        for index, task_id, data in updates:
+            if task_id in fresh:
+                results[index] = TaskBatchItemResult(index=index, id=task_id, status=200, task=TaskOut.model_validate(fresh[task_id]))
+    db.commit()
+    return {"results": results}
+
+@router.patch("/batch", response_model=TaskBatchResult, responses={401: {"model": ErrorResponse}})
+async def update_tasks_batch(
+    batch: TaskBatchUpdate,
+    db: AnySession = Depends(get_user_db),
+    user_id: str = Depends(get_current_user),
+    cfg: Settings = Depends(get_settings),
+):
+    _check_max_items(batch.tasks, cfg.TASK_BATCH_MAX_ITEMS, "tasks")
+    result = await run_db(db, _update_tasks_batch, batch.tasks, user_id)
+    change_notifier.notify(user_id)
+    return result
+
+def _delete_tasks_batch(db: Session, ids: list, user_id: str):
+    ids = [str(task_id) for task_id in ids]
+    owned = {
+        row.id: row
+        for row in db.query(Task.id, Task.status, Task.priority, Task.category_id).filter(Task.user_id == user_id, Task.id.in_(set(ids)))
+    }
+    if owned:
+        db.execute(delete(Task).where(Task.user_id == user_id, Task.id.in_(owned.keys())))
+        deltas, category_deltas = Counter(), Counter()
+        for row in owned.values():
+            deltas[(row.status, row.priority)] -= 1
+            category_deltas[row.category_id] -= 1
+        _apply_counter_deltas(db, user_id, deltas, category_deltas)
+        record_task_changes(db, user_id, owned.keys(), TaskChangeOp.delete)
+        bump_task_version(db, user_id)
+    db.commit()
+    results, deleted = [], set()
+    for index, task_id in enumerate(ids):
+        if task_id in owned and task_id not in deleted:
+            deleted.add(task_id)
+            results.append(TaskBatchItemResult(index=index, id=task_id, status=204))
+        else:
+            results.append(_batch_error(index, 404, "HTTP_ERROR", "Task not found", id=task_id))
+    return {"results": results}
+
+@router.delete("/batch", response_model=TaskBatchResult, responses={401: {"model": ErrorResponse}})
+async def delete_tasks_batch(
+    batch: TaskBatchDelete,
+    db: AnySession = Depends(get_user_db),
+    user_id: str = Depends(get_current_user),
+    cfg: Settings = Depends(get_settings),
+):
+    _check_max_items(batch.ids, cfg.TASK_BATCH_MAX_ITEMS, "ids")
+    result = await run_db(db, _delete_tasks_batch, batch.ids, user_id)
+    change_notifier.notify(user_id)
+    return result
+
+def _get_task_dict(db: Session, id: str, user_id: str, projection: Optional[TaskProjection] = None) -> dict:
+    query = projection.query(db) if projection is not None else db.query(*TASK_COLUMNS)
+    row = query.filter(Task.id == id, Task.user_id == user_id).first()
+    if row is None:
         raise HTTPException(status_code=404, detail="Task not found")
+    return projection.row_to_dict(row) if projection is not None else task_row_to_dict(row)
+
+@router.get("/{id}", response_model=TaskOut, responses={304: {"description": "Not modified"}, 404: {"model": ErrorResponse}})
+async def get_task(
+    id: str,
+    request: Request,
+    response: Response,
+    fields: Optional[str] = None,
+    include: Optional[Literal["category"]] = None,
+    db: AnySession = Depends(get_user_read_db),
+    user_id: str = Depends(get_current_user),
+    cfg: Settings = Depends(get_settings),
+):
+    projection = _projection(fields, include)
+    task = await run_db(db, _get_task_dict, id, user_id, projection)
+    # Content-based, so it covers the embedded category and differs per projection
+    etag = task_etag(task)
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers={"ETag": etag})
+    if cfg.FAST_JSON_RESPONSES or projection is not None:
+        return Response(dumps(task), media_type="application/json", headers={"ETag": etag})
+    response.headers["ETag"] = etag
     return task
 
-@router.put("/{id}", response_model=TaskOut, responses={400: {"model": ErrorResponse}})
-def update_task(id: str, task_update: TaskUpdate, db: Session = Depends(get_db), user_id: str = Depends(get_current_user)):
-    task = db.query(Task).filter(Task.id == id, Task.user_id == user_id).first()
-    if not task:
-        raise HTTPException(status_code=404, detail="Task not found")
-    data = task_update.model_dump(exclude_unset=True)
-    for key, value in data.items():
-        setattr(task, key, value)
+def _update_task(db: Session, id: str, task_update: TaskUpdate, user_id: str, if_match: Optional[str] = None) -> dict:
+    data = _task_columns(task_update.model_dump(exclude_unset=True))
+    nulls = _null_fields(data)
+    if nulls:
+        raise RequestValidationError(
+            [{"type": "value_error", "loc": ("body", key), "msg": messages[0]} for key, messages in nulls.items()]
+        )
+    # If-Match has to compare against the stored row, so it keeps the read-modify-write path
+    if if_match is None and data and _supports_returning(db, "update"):
+        moves = "status" in data or "priority" in data
+        if moves:
+            # Take the task out of its current counter before the row changes; written
+            # as one statement so the old status/priority never round-trip through Python
+            db.execute(
+                update(TaskCounter)
+                .where(
+                    TaskCounter.user_id == user_id,
+                    tuple_(TaskCounter.status, TaskCounter.priority).in_(
+                        select(Task.status, Task.priority).where(Task.id == id, Task.user_id == user_id)
+                    ),
+                )
+                .values(count=TaskCounter.count - 1)
+            )
+        if "category_id" in data:
+            db.execute(
+                update(TaskCategoryCounter)
+                .where(
+                    TaskCategoryCounter.user_id == user_id,
+                    TaskCategoryCounter.category_id.in_(
+                        select(Task.category_id).where(Task.id == id, Task.user_id == user_id)
+                    ),
+                )
+                .values(count=TaskCategoryCounter.count - 1)
+            )
+        row = db.execute(
+            update(Task).where(Task.id == id, Task.user_id == user_id).values(**data).returning(*TASK_COLUMNS)
+        ).first()
+        if row is None:
+            db.rollback()
+            raise HTTPException(status_code=404, detail="Task not found")
+        updated = task_row_to_dict(row)
+        if moves:
+            adjust_task_counter(db, user_id, updated["status"], updated["priority"], 1)
+        if "category_id" in data:
+            adjust_category_counter(db, user_id, updated["categoryId"], 1)
+        record_task_changes(db, user_id, [id])
+        bump_task_version(db, user_id)
+        db.commit()
+        return updated
+    while True:
+        task = _get_owned_task(db, id, user_id)
+        # Optimistic concurrency: the client must hold the current representation
+        if if_match is not None and not etag_matches(if_match, task_etag(task_to_dict(task)), weak=False):
+            raise HTTPException(status_code=412, detail="Task has been modified")
+        if not data:
+            # Nothing to change: no change-log entry, and list ETags stay valid
+            return task_to_dict(task)
+        old = {column.key: getattr(task, column.key) for column in _WRITABLE_COLUMNS}
+        # Compare-and-set: the UPDATE only matches while the row still holds what was
+        # read, so If-Match and the counter moves below cannot act on a stale row
+        matched = db.execute(
+            update(Task)
+            .where(Task.id == id, Task.user_id == user_id, *(column == old[column.key] for column in _WRITABLE_COLUMNS))
+            .values(**data)
+            .execution_options(synchronize_session=False)
+        ).rowcount
+        if matched:
+            break
+        # Changed since it was read: read it again (a held If-Match now fails)
+        db.rollback()
+    new = {**old, **data}
+    move_task_counter(db, user_id, old["status"], old["priority"], new["status"], new["priority"])
+    move_category_counter(db, user_id, old["category_id"], new["category_id"])
+    record_task_changes(db, user_id, [task.id])
+    bump_task_version(db, user_id)
     db.commit()
     db.refresh(task)
-    return task
+    return task_to_dict(task)
 
-@router.delete("/{id}", status_code=204, responses={404: {"model": ErrorResponse}})
-def delete_task(id: str, db: Session = Depends(get_db), user_id: str = Depends(get_current_user)):
-    task = db.query(Task).filter(Task.id == id, Task.user_id == user_id).first()
-    if not task:
-        raise HTTPException(status_code=404, detail="Task not found")
-    db.delete(task)
+@router.put("/{id}", response_model=TaskOut, responses={400: {"model": ErrorResponse}, 412: {"model": ErrorResponse}})
+async def update_task(
+    id: str,
+    task_update: TaskUpdate,
+    response: Response,
+    if_match: Optional[str] = Header(None),
+    db: AnySession = Depends(get_user_db),
+    user_id: str = Depends(get_current_user),
+    cfg: Settings = Depends(get_settings),
+):
+    task = await run_db(db, _update_task, id, task_update, user_id, if_match)
+    change_notifier.notify(user_id)
+    return _task_response(task, response, cfg)
+
+def _delete_task(db: Session, id: str, user_id: str):
+    if _supports_returning(db, "delete"):
+        row = db.execute(
+            delete(Task).where(Task.id == id, Task.user_id == user_id).returning(Task.status, Task.priority, Task.category_id)
+        ).first()
+        if row is None:
+            raise HTTPException(status_code=404, detail="Task not found")
+        task_status, task_priority, category_id = row
+    else:
+        task = _get_owned_task(db, id, user_id)
+        db.delete(task)
+        task_status, task_priority, category_id = task.status, task.priority, task.category_id
+    adjust_task_counter(db, user_id, task_status, task_priority, -1)
+    adjust_category_counter(db, user_id, category_id, -1)
+    record_task_changes(db, user_id, [id], TaskChangeOp.delete)
+    bump_task_version(db, user_id)
     db.commit()
+
+@router.delete("/{id}", status_code=204, responses={404: {"model": ErrorResponse}})
+async def delete_task(id: str, db: AnySession = Depends(get_user_db), user_id: str = Depends(get_current_user)):
+    await run_db(db, _delete_task, id, user_id)
+    change_notifier.notify(user_id)
     return
 
-@router.patch("/{id}/complete", response_model=TaskOut, responses={404: {"model": ErrorResponse}})
-def complete_task(id: str, db: Session = Depends(get_db), user_id: str = Depends(get_current_user)):
-    task = db.query(Task).filter(Task.id == id, Task.user_id == user_id).first()
-    if not task:
-        raise HTTPException(status_code=404, detail="Task not found")
+def _complete_task(db: Session, id: str, user_id: str) -> dict:
+    if _supports_returning(db, "update"):
+        # Only pending tasks change, so a returned row was pending before this statement
+        row = db.execute(
+            update(Task)
+            .where(Task.id == id, Task.user_id == user_id, Task.status != TaskStatus.completed)
+            .values(status=TaskStatus.completed)
+            .returning(*TASK_COLUMNS)
+        ).first()
+        if row is not None:
+            completed = task_row_to_dict(row)
+            move_task_counter(db, user_id, TaskStatus.pending, completed["priority"], TaskStatus.completed, completed["priority"])
+            record_task_changes(db, user_id, [id])
+            bump_task_version(db, user_id)
+            db.commit()
+            return completed
+        # Missing (404) or already completed (returned unchanged)
+        return _get_task_dict(db, id, user_id)
+    task = _get_owned_task(db, id, user_id)
+    if task.status == TaskStatus.completed:
+        # Already completed: no change-log entry, and list ETags stay valid
+        return task_to_dict(task)
+    move_task_counter(db, user_id, task.status, task.priority, TaskStatus.completed, task.priority)
     task.status = TaskStatus.completed
+    record_task_changes(db, user_id, [task.id])
+    bump_task_version(db, user_id)
     db.commit()
     db.refresh(task)
-    return task
+    return task_to_dict(task)
+
+@router.patch("/{id}/complete", response_model=TaskOut, responses={404: {"model": ErrorResponse}})
+async def complete_task(
+    id: str,
+    response: Response,
+    db: AnySession = Depends(get_user_db),
+    user_id: str = Depends(get_current_user),
+    cfg: Settings = Depends(get_settings),
+):
+    task = await run_db(db, _complete_task, id, user_id)
+    change_notifier.notify(user_id)
+    return _task_response(task, response, cfg)
@@ -1,56 +1,83 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
-from ..schemas.user import UserCreate, UserOut, UserLogin
+from ..schemas.user import UserCreate, UserOut, UserLogin, TokenRefresh
 from ..schemas.error import ErrorResponse
-from ..database import SessionLocal
+from ..database import AnySession, get_db, run_db
 from ..models.user import User
-from passlib.context import CryptContext
-from jose import jwt
+from jose import jwt, JWTError
 import uuid
 from datetime import datetime, timedelta, timezone
 from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
-from ..core.config import settings
+from ..core.config import Settings, get_settings, settings
+from ..services.passwords import password_hasher, PasswordHasherBusy
+from ..services.token_revocation import revoked_tokens
 
 router = APIRouter()
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 ALGORITHM = "HS256"
 
-def get_db():
-    db = SessionLocal()
+# bcrypt runs in the password hasher's process pool; a full queue becomes a 503
+async def verify_password(plain_password, hashed_password):
     try:
-        yield db
-    finally:
-        db.close()
+        return await password_hasher.verify(plain_password, hashed_password)
+    except PasswordHasherBusy as exc:
+        raise HTTPException(status_code=503, detail="Server busy, retry later", headers={"Retry-After": str(exc.retry_after)})
 
-def verify_password(plain_password, hashed_password):
-    return pwd_context.verify(plain_password, hashed_password)
-
-def get_password_hash(password):
-    return pwd_context.hash(password)
+async def get_password_hash(password):
+    try:
+        return await password_hasher.hash(password)
+    except PasswordHasherBusy as exc:
+        raise HTTPException(status_code=503, detail="Server busy, retry later", headers={"Retry-After": str(exc.retry_after)})
 
-def create_access_token(data: dict, expires_delta: timedelta = None):
+def create_access_token(data: dict, expires_delta: timedelta = None, cfg: Settings = settings):
     to_encode = data.copy()
     expire = datetime.now(timezone.utc) + (
-        expires_delta or timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
+        expires_delta or timedelta(minutes=cfg.ACCESS_TOKEN_EXPIRE_MINUTES)
     )
     to_encode.update({"exp": expire})
-    return jwt.encode(to_encode, settings.SECRET_KEY, algorithm=ALGORITHM)
+    return jwt.encode(to_encode, cfg.SECRET_KEY, algorithm=ALGORITHM)
+
+def create_refresh_token(user_id: str, cfg: Settings = settings):
+    # jti makes each refresh token unique, so a rotated-out one can be revoked on its own
+    return create_access_token(
+        data={"sub": user_id, "type": "refresh", "jti": uuid.uuid4().hex},
+        expires_delta=timedelta(days=cfg.REFRESH_TOKEN_EXPIRE_DAYS),
+        cfg=cfg,
+    )
+
+def _token_response(user_id: str, cfg: Settings, refresh_token: str = None):
+    return {
+        "accessToken": create_access_token(data={"sub": user_id}, cfg=cfg),
+        "refreshToken": refresh_token or create_refresh_token(user_id, cfg),
+        "expiresIn": cfg.ACCESS_TOKEN_EXPIRE_MINUTES * 60,
+    }
 
 from fastapi import Response
 
 
-@router.post("/register", response_model=UserOut, status_code=201, responses={400: {"model": ErrorResponse}})
-def register(user: UserCreate, db: Session = Depends(get_db), response: Response = None):
-    if db.query(User).filter(User.email == user.email).first():
-        raise HTTPException(status_code=400, detail="Email already registered")
+def _get_user_by_email(db: Session, email: str):
+    return db.query(User).filter(User.email == email).first()
+
+def _create_user(db: Session, user: UserCreate, hashed_password: str):
     db_user = User(
         email=user.email,
         username=user.username,
-        hashed_password=get_password_hash(user.password)
+        hashed_password=hashed_password
     )
     db.add(db_user)
     db.commit()
     db.refresh(db_user)
+    return db_user
+
+def _set_password_hash(db: Session, user_id: str, hashed_password: str):
+    db.query(User).filter(User.id == user_id).update({User.hashed_password: hashed_password})
+    db.commit()
+
+@router.post("/register", response_model=UserOut, status_code=201, responses={400: {"model": ErrorResponse}})
+async def register(user: UserCreate, db: AnySession = Depends(get_db), response: Response = None):
+    if await run_db(db, _get_user_by_email, user.email):
+        raise HTTPException(status_code=400, detail="Email already registered")
+    hashed_password = await get_password_hash(user.password)
+    db_user = await run_db(db, _create_user, user, hashed_password)
     try:
         # Provide a Location header for the created resource (informational)
         if response is not None:
@@ -60,14 +87,41 @@ def register(user: UserCreate, db: Session = Depends(get_db), response: Response
     return db_user
 
 @router.post("/login", responses={200: {"description": "Authentication successful"}, 401: {"model": ErrorResponse}})
-def login(form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depends(get_db)):
-    user = db.query(User).filter(User.email == form_data.username).first()
-    if not user or not verify_password(form_data.password, user.hashed_password):
+async def login(
+    form_data: OAuth2PasswordRequestForm = Depends(),
+    db: AnySession = Depends(get_db),
+    cfg: Settings = Depends(get_settings),
+):
+    user = await run_db(db, _get_user_by_email, form_data.username)
+    if not user or not await verify_password(form_data.password, user.hashed_password):
         raise HTTPException(status_code=401, detail="Invalid credentials")
-    access_token = create_access_token(data={"sub": user.id})
-    refresh_token = create_access_token(data={"sub": user.id, "type": "refresh"}, expires_delta=timedelta(days=7))
-    return {
-        "accessToken": access_token,
-        "refreshToken": refresh_token,
-        "expiresIn": settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60,
-    }
+    if password_hasher.needs_rehash(user.hashed_password):
+        # BCRYPT_ROUNDS changed since this hash was stored; upgrade it while we have the password
+        await run_db(db, _set_password_hash, user.id, await get_password_hash(form_data.password))
+    return _token_response(user.id, cfg)
+
+@router.post("/refresh", responses={200: {"description": "New access token"}, 401: {"model": ErrorResponse}})
+async def refresh(body: TokenRefresh, cfg: Settings = Depends(get_settings)):
+    """New access token for a refresh token from /auth/login or a previous refresh.
+
+    Only the signature, expiry and type are checked: no bcrypt and no database.
+    With REFRESH_TOKEN_ROTATION the presented token is revoked and a new one
+    returned; presenting it again is rejected.
+    """
+    try:
+        payload = jwt.decode(body.refreshToken, cfg.SECRET_KEY, algorithms=[ALGORITHM])
+    except JWTError:
+        raise HTTPException(status_code=401, detail="Invalid refresh token")
+    user_id, jti = payload.get("sub"), payload.get("jti")
+    if payload.get("type") != "refresh" or not user_id or not isinstance(jti, str):
+        raise HTTPException(status_code=401, detail="Invalid refresh token")
+    rotate = cfg.REFRESH_TOKEN_ROTATION
+    try:
+        # Check and revoke in one step, so two concurrent refreshes cannot both rotate the same token
+        rejected = not revoked_tokens.revoke(jti, payload["exp"]) if rotate else revoked_tokens.is_revoked(jti)
+    except ValueError:
+        # jti is not the hex id this service puts in its tokens
+        rejected = True
+    if rejected:
+        raise HTTPException(status_code=401, detail="Invalid refresh token")
+    return _token_response(user_id, cfg, None if rotate else body.refreshToken)
@@ -1,8 +1,9 @@
 from pydantic import BaseModel, Field, ConfigDict
-from typing import Optional
+from typing import Any, Dict, List, Literal, Optional
 import uuid
 from datetime import datetime
 from ..models.task import TaskStatus, TaskPriority
+from .error import ErrorDetail
 
 
 class TaskBase(BaseModel):
@@ -46,3 +47,74 @@ class TaskOut(TaskBase):
 class PaginatedTasks(BaseModel):
     tasks: list[TaskOut]
     pagination: dict
+
+
+class TaskStats(BaseModel):
+    total: int
+    byStatus: Dict[str, int]
+    byPriority: Dict[str, int]
+    # categoryId -> count; tasks without a category are counted in uncategorized
+    byCategory: Dict[str, int]
+    uncategorized: int
+    # Pending tasks past their due date / due within the next dueSoonHours
+    overdue: int
+    dueSoon: int
+    dueSoonHours: int
+
+
+class TaskChangeOut(BaseModel):
+    seq: int
+    op: Literal["upsert", "delete"]
+    id: uuid.UUID
+    # Current task for upserts, null for deletes (tombstones)
+    task: Optional[TaskOut] = None
+
+
+class TaskChanges(BaseModel):
+    changes: List[TaskChangeOut]
+    # Pass as ?since= on the next request
+    nextSince: int
+    hasMore: bool
+
+
+class TaskBatchUpdateItem(TaskUpdate):
+    id: uuid.UUID
+
+
+# Batch items are validated one by one (TaskCreate / TaskBatchUpdateItem) so a
+# bad item is reported in its result instead of failing the whole request.
+# The routes cap the item count at the app's TASK_BATCH_MAX_ITEMS.
+class TaskBatchCreate(BaseModel):
+    tasks: List[Dict[str, Any]] = Field(..., min_length=1)
+
+
+class TaskBatchUpdate(BaseModel):
+    tasks: List[Dict[str, Any]] = Field(..., min_length=1)
+
+
+class TaskBatchDelete(BaseModel):
+    ids: List[uuid.UUID] = Field(..., min_length=1)
+
+
+class TaskBatchItemResult(BaseModel):
+    index: int
+    id: Optional[uuid.UUID] = None
+    status: int
+    task: Optional[TaskOut] = None
+    error: Optional[ErrorDetail] = None
+
+
+class TaskBatchResult(BaseModel):
+    results: List[TaskBatchItemResult]
+
+
+class TaskImportError(BaseModel):
+    line: int
+    error: ErrorDetail
+
+
+class TaskImportResult(BaseModel):
+    inserted: int
+    rejected: int
+    # Capped at TASK_IMPORT_MAX_ERRORS; ``rejected`` always has the full count
+    errors: List[TaskImportError]
@@ -16,3 +16,6 @@ class UserOut(UserBase):
 class UserLogin(BaseModel):
     email: EmailStr
     password: str
+
+class TokenRefresh(BaseModel):
+    refreshToken: str
@@ -0,0 +1,107 @@
+"""Read-through cache for GET /categories.
+
+Each worker keeps the encoded category list (bytes + ETag) in process, tagged
+with a generation number. The generation lives in a backend: process-local by
+default, or a shared store (e.g. Redis) so that a write in one worker
+invalidates the copies held by every other worker. Backend calls are
+awaited, so a Redis round trip never blocks the event loop.
+"""
+import threading
+import time
+from typing import Callable, Optional, Tuple
+from ..core.config import settings
+from ..utils.etag import make_etag
+
+GENERATION_KEY = "categories:generation"
+
+
+class MemoryBackend:
+    """Process-local generation store (single worker, tests)."""
+
+    def __init__(self):
+        self._values = {}
+        self._lock = threading.Lock()
+
+    async def get(self, key: str) -> int:
+        return self._values.get(key, 0)
+
+    async def incr(self, key: str) -> int:
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + 1
+            return self._values[key]
+
+
+class RedisBackend:
+    """Shared generation store; needs the optional ``redis`` package (asyncio client)."""
+
+    def __init__(self, url: str):
+        import redis.asyncio
+
+        self._client = redis.asyncio.Redis.from_url(url)
+
+    async def get(self, key: str) -> int:
+        return int(await self._client.get(key) or 0)
+
+    async def incr(self, key: str) -> int:
+        return int(await self._client.incr(key))
+
+
+class CategoryCache:
+    def __init__(self, backend):
+        self.backend = backend
+        self._entry: Optional[Tuple[int, bytes, str]] = None
+        self.hits = 0
+        self.misses = 0
+        self.rebuilds = 0
+        self.rebuild_seconds = 0.0
+        self.last_rebuild_seconds = 0.0
+
+    async def lookup(self) -> Tuple[int, Optional[Tuple[bytes, str]]]:
+        """Current generation and the cached (body, etag) if it is still valid."""
+        generation = await self.backend.get(GENERATION_KEY)
+        entry = self._entry
+        if entry is not None and entry[0] == generation:
+            self.hits += 1
+            return generation, entry[1:]
+        self.misses += 1
+        return generation, None
+
+    def rebuild(self, generation: int, build: Callable[[], bytes]) -> Tuple[bytes, str]:
+        # ``generation`` must be read before ``build`` queries the database, so a
+        # concurrent invalidation can only make this entry stale, never hide a write
+        started = time.perf_counter()
+        body = build()
+        etag = make_etag(body)
+        self._entry = (generation, body, etag)
+        took = time.perf_counter() - started
+        self.rebuilds += 1
+        self.rebuild_seconds += took
+        self.last_rebuild_seconds = took
+        return body, etag
+
+    async def invalidate(self) -> None:
+        await self.backend.incr(GENERATION_KEY)
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+            "rebuilds": self.rebuilds,
+            "rebuild_seconds": self.rebuild_seconds,
+            "last_rebuild_seconds": self.last_rebuild_seconds,
+        }
+
+
+def cache_from_url(url: str) -> Optional[CategoryCache]:
+    if not url or url == "none":
+        return None
+    if url.startswith("memory:"):
+        return CategoryCache(MemoryBackend())
+    if url.startswith(("redis:", "rediss:")):
+        return CategoryCache(RedisBackend(url))
+    raise ValueError(f"Unsupported CATEGORY_CACHE_URL: {url}")
+
+
+category_cache = cache_from_url(settings.CATEGORY_CACHE_URL)
@@ -0,0 +1,240 @@
+"""In-process metrics in Prometheus text format (exposition format 0.0.4).
+
+Histograms and counters are plain dicts behind a lock; gauges that mirror
+other components (password hasher, token cache) are read when /metrics is
+scraped. Per-request accounting (SQL statements, DB time, pool wait, bcrypt
+time) lives in a context variable set by MetricsMiddleware, so the SQLAlchemy
+event hooks and the password hasher can add to the current request without
+being passed anything.
+"""
+import bisect
+import logging
+import threading
+import time
+from contextvars import ContextVar
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger("python_api.slow_query")
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+COUNT_BUCKETS = (1, 2, 3, 5, 8, 13, 21, 34, 55, 100)
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names: Tuple[str, ...], values: Tuple, extra: str = "") -> str:
+    parts = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _number(value: float) -> str:
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Histogram:
+    def __init__(self, name: str, help: str, labelnames: Tuple[str, ...] = (), buckets=LATENCY_BUCKETS):
+        self.name, self.help, self.labelnames = name, help, labelnames
+        self.buckets = tuple(buckets)
+        self._series: Dict[Tuple, list] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *labels):
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                # per-bucket counts (+Inf last), sum, count
+                series = self._series[labels] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            snapshot = [(labels, list(s[0]), s[1], s[2]) for labels, s in sorted(self._series.items())]
+        for labels, counts, total, count in snapshot:
+            cumulative = 0
+            for bound, n in zip(self.buckets + (float("inf"),), counts):
+                cumulative += n
+                le = 'le="+Inf"' if bound == float("inf") else f'le="{_number(bound)}"'
+                lines.append(f"{self.name}_bucket{_labels(self.labelnames, labels, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_labels(self.labelnames, labels)} {_number(total)}")
+            lines.append(f"{self.name}_count{_labels(self.labelnames, labels)} {count}")
+        return lines
+
+
+class Counter:
+    def __init__(self, name: str, help: str, labelnames: Tuple[str, ...] = ()):
+        self.name, self.help, self.labelnames = name, help, labelnames
+        self._values: Dict[Tuple, float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1, *labels):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            snapshot = sorted(self._values.items())
+        lines.extend(f"{self.name}{_labels(self.labelnames, labels)} {_number(value)}" for labels, value in snapshot)
+        return lines
+
+
+class Callback:
+    """Counter or gauge whose value is read from another component at scrape time."""
+
+    def __init__(self, name: str, help: str, kind: str, read: Callable[[], float]):
+        self.name, self.help, self.kind, self.read = name, help, kind, read
+
+    def render(self) -> List[str]:
+        return [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}", f"{self.name} {_number(self.read())}"]
+
+
+class Registry:
+    def __init__(self):
+        self._metrics = []
+
+    def register(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+registry = Registry()
+http_request_duration = registry.register(Histogram(
+    "http_request_duration_seconds", "Request latency by route template and status", ("method", "route", "status")
+))
+request_db_statements = registry.register(Histogram(
+    "http_request_db_statements", "SQL statements executed per request", ("route",), COUNT_BUCKETS
+))
+request_db_duration = registry.register(Histogram(
+    "http_request_db_seconds", "Time spent executing SQL per request", ("route",)
+))
+db_statement_duration = registry.register(Histogram(
+    "db_statement_duration_seconds", "Duration of individual SQL statements"
+))
+db_slow_statements = registry.register(Counter(
+    "db_slow_statements_total", "SQL statements slower than SLOW_QUERY_MS"
+))
+db_pool_checkout = registry.register(Histogram(
+    "db_pool_checkout_seconds", "Time waiting for a pooled connection", ("pool",)
+))
+password_hash_duration = registry.register(Histogram(
+    "password_hash_seconds", "bcrypt time per hash/verify, excluding queue wait", ("operation",)
+))
+password_hash_queue_wait = registry.register(Histogram(
+    "password_hash_queue_wait_seconds", "Time a hash/verify job waited for a pool worker"
+))
+
+
+class RequestStats:
+    __slots__ = ("statements", "db_seconds", "pool_wait_seconds", "bcrypt_seconds")
+
+    def __init__(self):
+        self.statements = 0
+        self.db_seconds = 0.0
+        self.pool_wait_seconds = 0.0
+        self.bcrypt_seconds = 0.0
+
+    def server_timing(self, total_seconds: float) -> str:
+        return ", ".join((
+            f"app;dur={total_seconds * 1000:.2f}",
+            f'db;dur={self.db_seconds * 1000:.2f};desc="{self.statements} queries"',
+            f"pool;dur={self.pool_wait_seconds * 1000:.2f}",
+            f"bcrypt;dur={self.bcrypt_seconds * 1000:.2f}",
+        ))
+
+
+_current: ContextVar[Optional[RequestStats]] = ContextVar("request_stats", default=None)
+
+
+def current_request() -> Optional[RequestStats]:
+    return _current.get()
+
+
+def record_statement(seconds: float, statement: str, slow_query_seconds: Optional[float]):
+    db_statement_duration.observe(seconds)
+    stats = _current.get()
+    if stats is not None:
+        stats.statements += 1
+        stats.db_seconds += seconds
+    if slow_query_seconds is not None and seconds >= slow_query_seconds:
+        db_slow_statements.inc()
+        logger.warning("Slow query (%.1f ms): %s", seconds * 1000, " ".join(statement.split())[:1000])
+
+
+def record_pool_checkout(pool: str, seconds: float):
+    db_pool_checkout.observe(seconds, pool)
+    stats = _current.get()
+    if stats is not None:
+        stats.pool_wait_seconds += seconds
+
+
+def record_password_hash(operation: str, queue_wait: float, seconds: float):
+    password_hash_duration.observe(seconds, operation)
+    password_hash_queue_wait.observe(queue_wait)
+    stats = _current.get()
+    if stats is not None:
+        stats.bcrypt_seconds += seconds
+
+
+def register_callbacks(callbacks: Iterable[Tuple[str, str, str, Callable[[], float]]]):
+    for name, help, kind, read in callbacks:
+        registry.register(Callback(name, help, kind, read))
+
+
+def _route_template(scope) -> str:
+    # Routes from include_router keep their own path; FastAPI records the prefixed one
+    context = scope.get("fastapi", {}).get("effective_route_context")
+    path = getattr(context, "path", None) or getattr(scope.get("route"), "path", None)
+    # Unmatched paths share one label so scanners cannot blow up cardinality
+    return path or "unmatched"
+
+
+class MetricsMiddleware:
+    """Pure ASGI middleware: latency per route template and status, plus per-request SQL accounting."""
+
+    def __init__(self, app, server_timing: bool = False, exclude_paths: Tuple[str, ...] = ("/metrics",)):
+        self.app = app
+        self.server_timing = server_timing
+        self.exclude_paths = exclude_paths
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"] in self.exclude_paths:
+            await self.app(scope, receive, send)
+            return
+        stats = RequestStats()
+        token = _current.set(stats)
+        started = time.perf_counter()
+        status_code = 500
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                if self.server_timing:
+                    headers = list(message.get("headers", []))
+                    headers.append((b"server-timing", stats.server_timing(time.perf_counter() - started).encode()))
+                    message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _current.reset(token)
+            template = _route_template(scope)
+            http_request_duration.observe(time.perf_counter() - started, scope["method"], template, str(status_code))
+            request_db_statements.observe(stats.statements, template)
+            request_db_duration.observe(stats.db_seconds, template)
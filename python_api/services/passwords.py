@@ -0,0 +1,148 @@
+import asyncio
+import math
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Optional
+from ..core.config import settings
+from . import metrics
+
+_contexts = {}
+
+
+def _context(rounds: int):
+    ctx = _contexts.get(rounds)
+    if ctx is None:
+        # Deferred: only the pool workers (or the thread fallback) ever hash
+        from passlib.context import CryptContext
+
+        ctx = _contexts[rounds] = CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=rounds)
+    return ctx
+
+
+# Worker entry points (run in the pool processes). They return the time the
+# work started so the caller can split queue wait from hashing time.
+def _hash_job(password: str, rounds: int):
+    started = time.monotonic()
+    hashed = _context(rounds).hash(password)
+    return hashed, started, time.monotonic() - started
+
+
+def _verify_job(password: str, hashed: str, rounds: int):
+    started = time.monotonic()
+    ok = _context(rounds).verify(password, hashed)
+    return ok, started, time.monotonic() - started
+
+
+def bcrypt_rounds(hashed: str) -> Optional[int]:
+    # "$2b$12$<salt+hash>" -> 12
+    try:
+        return int(hashed.split("$")[2])
+    except (IndexError, ValueError):
+        return None
+
+
+class PasswordHasherBusy(Exception):
+    def __init__(self, retry_after: int):
+        super().__init__("Password hashing queue is full")
+        self.retry_after = retry_after
+
+
+class PasswordHasher:
+    """Runs bcrypt in a dedicated process pool with a bounded queue.
+
+    ``workers=0`` runs jobs in the default thread executor instead (useful for
+    constrained environments); the queue limit and metrics apply either way.
+    """
+
+    def __init__(self, rounds: int, workers: int, max_pending: int):
+        self.rounds = rounds
+        self.workers = workers
+        self.max_pending = max_pending
+        self._executor = None
+        self._pending = 0
+        self.jobs = 0
+        self.rejected = 0
+        self.queue_wait_seconds = 0.0
+        self.hash_seconds = 0.0
+
+    def _get_executor(self):
+        if self._executor is None and self.workers > 0:
+            # spawn: forking a process that already runs threads is unsafe
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers, mp_context=multiprocessing.get_context("spawn")
+            )
+        return self._executor
+
+    def _discard_executor(self, executor):
+        # Only the pool that broke: a concurrent job may already have replaced it
+        if executor is not None and self._executor is executor:
+            self._executor = None
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    async def _run(self, fn, *args):
+        loop = asyncio.get_running_loop()
+        executor = self._get_executor()
+        try:
+            return await loop.run_in_executor(executor, fn, *args)
+        except BrokenProcessPool:
+            # A worker died (e.g. OOM-killed), which breaks the whole pool for
+            # good: start a new one and run the job once more
+            self._discard_executor(executor)
+            return await loop.run_in_executor(self._get_executor(), fn, *args)
+
+    def _retry_after(self) -> int:
+        avg = self.hash_seconds / self.jobs if self.jobs else 0.25
+        return max(1, math.ceil(self._pending * avg / max(self.workers, 1)))
+
+    async def _submit(self, operation: str, fn, *args):
+        if self._pending >= self.max_pending:
+            self.rejected += 1
+            raise PasswordHasherBusy(self._retry_after())
+        self._pending += 1
+        submitted = time.monotonic()
+        try:
+            result, started, took = await self._run(fn, *args)
+        finally:
+            self._pending -= 1
+        self.jobs += 1
+        queue_wait = max(0.0, started - submitted)
+        self.queue_wait_seconds += queue_wait
+        self.hash_seconds += took
+        metrics.record_password_hash(operation, queue_wait, took)
+        return result
+
+    async def hash(self, password: str) -> str:
+        return await self._submit("hash", _hash_job, password, self.rounds)
+
+    async def verify(self, password: str, hashed: str) -> bool:
+        return await self._submit("verify", _verify_job, password, hashed, self.rounds)
+
+    def needs_rehash(self, hashed: str) -> bool:
+        """True when the stored hash was made with a different cost than configured."""
+        return bcrypt_rounds(hashed) != self.rounds
+
+    def stats(self) -> dict:
+        return {
+            "workers": self.workers,
+            "pending": self._pending,
+            "jobs": self.jobs,
+            "rejected": self.rejected,
+            "queue_wait_seconds": self.queue_wait_seconds,
+            "hash_seconds": self.hash_seconds,
+        }
+
+    def shutdown(self):
+        if self._executor is not None:
+            # Wait for the pool processes: a multiprocessing worker leaves with
+            # os._exit, skipping the atexit hook that would otherwise reap them
+            self._executor.shutdown(wait=True, cancel_futures=True)
+            self._executor = None
+
+
+password_hasher = PasswordHasher(
+    rounds=settings.BCRYPT_ROUNDS,
+    workers=settings.PASSWORD_HASH_WORKERS,
+    max_pending=settings.PASSWORD_HASH_MAX_PENDING,
+)
@@ -0,0 +1,141 @@
+"""Per-client rate limiting (token buckets) and global load shedding.
+
+Buckets live in a fixed number of shards, each a dict behind its own lock, so
+concurrent requests for different clients rarely contend. A bucket that has
+been idle long enough to refill completely carries no state worth keeping;
+each shard drops those on a periodic sweep, so one-off clients (scanners,
+rotating IPs) do not grow memory without bound.
+"""
+import math
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Callable, Dict, List, Tuple
+
+from fastapi import Depends, HTTPException, Request
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+from ..schemas.error import ErrorDetail, ErrorResponse
+from .metrics import Counter, registry
+
+SHARDS = 16
+# Operations on a shard between two sweeps of its idle buckets
+SWEEP_EVERY = 1024
+
+rate_limited = registry.register(Counter(
+    "http_rate_limited_total", "Requests rejected with 429 by a rate limit", ("limit",)
+))
+load_shed = registry.register(Counter(
+    "http_load_shed_total", "Requests rejected with 503 because too many were in flight"
+))
+
+
+class RateLimiter:
+    """Token bucket per key: ``burst`` requests at once, refilled at ``per_minute``."""
+
+    def __init__(self, name: str, per_minute: int, burst: int, shards: int = SHARDS, clock: Callable[[], float] = time.monotonic):
+        self.name = name
+        self.rate = per_minute / 60.0
+        self.burst = float(max(1, burst))
+        self.clock = clock
+        # After this long without requests a bucket is full again, i.e. indistinguishable from a new one
+        self.idle_seconds = self.burst / self.rate
+        self._shards: List[Tuple[threading.Lock, Dict[str, list], list]] = [
+            (threading.Lock(), {}, [0]) for _ in range(shards)
+        ]
+
+    def acquire(self, key: str) -> float:
+        """Take one token for ``key``; returns 0 if allowed, else seconds until a token is available."""
+        lock, buckets, ops = self._shards[hash(key) % len(self._shards)]
+        now = self.clock()
+        with lock:
+            bucket = buckets.get(key)
+            if bucket is None:
+                tokens = self.burst
+                bucket = buckets[key] = [tokens, now]
+            else:
+                tokens = min(self.burst, bucket[0] + (now - bucket[1]) * self.rate)
+            bucket[1] = now
+            ops[0] += 1
+            if ops[0] >= SWEEP_EVERY:
+                ops[0] = 0
+                self._sweep(buckets, now)
+            if tokens >= 1:
+                bucket[0] = tokens - 1
+                return 0.0
+            bucket[0] = tokens
+            return (1 - tokens) / self.rate
+
+    def _sweep(self, buckets: Dict[str, list], now: float) -> None:
+        idle = [key for key, (_, last) in buckets.items() if now - last >= self.idle_seconds]
+        for key in idle:
+            del buckets[key]
+
+    def check(self, key: str) -> None:
+        retry_after = self.acquire(key)
+        if retry_after:
+            rate_limited.inc(1, self.name)
+            raise HTTPException(
+                status_code=429, detail="Too many requests", headers={"Retry-After": str(math.ceil(retry_after))}
+            )
+
+    def __len__(self) -> int:
+        return sum(len(buckets) for _, buckets, _ in self._shards)
+
+
+def client_ip(request: Request) -> str:
+    return request.client.host if request.client else "unknown"
+
+
+def limit_by_ip(limiter: RateLimiter):
+    """Router dependency: one bucket per client address (unauthenticated routes)."""
+    async def rate_limit(request: Request):
+        limiter.check(client_ip(request))
+    return rate_limit
+
+
+def limit_by_user(limiter: RateLimiter, current_user):
+    """Router dependency: one bucket per JWT ``sub``; reuses the route's own ``current_user`` result."""
+    async def rate_limit(user_id: str = Depends(current_user)):
+        limiter.check(user_id)
+    return rate_limit
+
+
+class LoadSheddingMiddleware:
+    """Pure ASGI middleware: 503 + Retry-After once ``max_in_flight`` requests are being served.
+
+    The counter is only touched from the event loop, so it needs no lock.
+    """
+
+    def __init__(self, app, max_in_flight: int, retry_after: int = 1, exclude_paths: Tuple[str, ...] = ("/metrics",)):
+        self.app = app
+        self.max_in_flight = max_in_flight
+        self.retry_after = retry_after
+        self.exclude_paths = exclude_paths
+        self.in_flight = 0
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"] in self.exclude_paths:
+            await self.app(scope, receive, send)
+            return
+        if self.in_flight >= self.max_in_flight:
+            load_shed.inc()
+            await self._reject(scope, send)
+            return
+        self.in_flight += 1
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self.in_flight -= 1
+
+    async def _reject(self, scope, send):
+        err = ErrorResponse(
+            error=ErrorDetail(code="HTTP_ERROR", message="Server busy, retry later", details=None),
+            timestamp=datetime.now(timezone.utc),
+            path=scope["path"],
+        )
+        response = JSONResponse(
+            status_code=503, content=jsonable_encoder(err), headers={"Retry-After": str(self.retry_after)}
+        )
+        await response(scope, None, send)
@@ -0,0 +1,150 @@
+"""Incremental sync: the task change log, its reader and compaction.
+
+Every task mutation appends one row per affected task to ``task_changes`` in
+the same transaction (tombstones for deletes). Readers join the log to the
+tasks table, so an ``upsert`` carries the task as it is now rather than a
+copy taken at write time; that keeps the log small and lets compaction drop
+every entry but the newest for each task.
+
+Waiting clients (long-poll, SSE) are woken by an in-process notifier. With
+several workers a change made in another process is only seen on the next
+poll, so waits are sliced into TASK_CHANGES_POLL_SECONDS intervals.
+"""
+import asyncio
+from datetime import datetime
+from typing import Dict, Iterable, Optional, Set
+from fastapi import HTTPException
+from sqlalchemy import delete, exists, func, insert, literal, select
+from sqlalchemy.orm import Session, aliased
+from starlette.concurrency import run_in_threadpool
+from .. import database
+from ..core.config import settings
+from ..models.task import Task
+from ..models.task_change import TaskChange, TaskChangeFloor, TaskChangeOp
+from .task_serialization import TASK_COLUMNS, task_row_to_dict
+
+
+def record_task_changes(db: Session, user_id: str, task_ids: Iterable[str], op: TaskChangeOp = TaskChangeOp.upsert):
+    """Log ``op`` for each task; call inside the mutating transaction (one INSERT)."""
+    rows = [{"user_id": user_id, "task_id": task_id, "op": op} for task_id in task_ids]
+    if user_id and rows:
+        db.execute(insert(TaskChange), rows)
+
+
+def changes_since(db: Session, user_id: str, since: int, limit: int) -> dict:
+    """Up to ``limit`` log entries after ``since``, oldest first (410 if compaction passed ``since``)."""
+    floor = db.execute(select(TaskChangeFloor.seq).where(TaskChangeFloor.user_id == user_id)).scalar() or 0
+    if since < floor:
+        raise HTTPException(status_code=410, detail="Changes since this point were compacted; resync from GET /tasks")
+    rows = db.execute(
+        select(*TASK_COLUMNS, TaskChange.seq, TaskChange.op, TaskChange.task_id)
+        .select_from(TaskChange)
+        .outerjoin(Task, Task.id == TaskChange.task_id)
+        .where(TaskChange.user_id == user_id, TaskChange.seq > since)
+        .order_by(TaskChange.seq)
+        .limit(limit + 1)
+    ).all()
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    # Only the last entry per task matters: every upsert carries the current row
+    last = {row.task_id: row.seq for row in rows}
+    changes = []
+    for row in rows:
+        if last[row.task_id] != row.seq:
+            continue
+        if row.op == TaskChangeOp.upsert:
+            if row.id is None:
+                # Deleted later; its tombstone comes in this batch or a later one
+                continue
+            changes.append({"seq": row.seq, "op": row.op.value, "id": row.task_id, "task": task_row_to_dict(row)})
+        else:
+            changes.append({"seq": row.seq, "op": row.op.value, "id": row.task_id, "task": None})
+    return {"changes": changes, "nextSince": rows[-1].seq if rows else since, "hasMore": has_more}
+
+
+async def read_task_changes(user_id: str, since: int, limit: int) -> dict:
+    """``changes_since`` on a session of its own, for readers that outlive the request's dependencies."""
+    sessionmaker = database.user_sessionmaker(user_id, read=True)
+    if settings.DB_MODE == "async":
+        async with sessionmaker() as db:
+            return await db.run_sync(changes_since, user_id, since, limit)
+    db = sessionmaker()
+    try:
+        return await run_in_threadpool(changes_since, db, user_id, since, limit)
+    finally:
+        db.close()
+
+
+def compact_task_changes(db: Session, before: datetime, user_id: Optional[str] = None) -> dict:
+    """Shrink the log to one entry per live task plus tombstones newer than ``before``.
+
+    Also logs tasks that have no entry at all (rows loaded before the log
+    existed or written by hand), so ``since=0`` returns every task.
+    """
+    newer = aliased(TaskChange)
+    superseded = delete(TaskChange).where(
+        exists().where(newer.task_id == TaskChange.task_id, newer.seq > TaskChange.seq)
+    )
+    expired = select(TaskChange.user_id, func.max(TaskChange.seq)).where(
+        TaskChange.op == TaskChangeOp.delete, TaskChange.changed_at < before
+    ).group_by(TaskChange.user_id)
+    untracked = select(Task.user_id, Task.id, literal(TaskChangeOp.upsert, TaskChange.op.type)).where(
+        Task.user_id.is_not(None), ~exists().where(TaskChange.task_id == Task.id)
+    )
+    if user_id is not None:
+        superseded = superseded.where(TaskChange.user_id == user_id)
+        expired = expired.where(TaskChange.user_id == user_id)
+        untracked = untracked.where(Task.user_id == user_id)
+
+    removed = db.execute(superseded).rowcount
+    floors = db.execute(expired).all()
+    # Clients behind a dropped tombstone can no longer sync incrementally
+    for floor_user_id, seq in floors:
+        db.merge(TaskChangeFloor(user_id=floor_user_id, seq=seq))
+    tombstones = 0
+    if floors:
+        tombstones = db.execute(
+            delete(TaskChange).where(
+                TaskChange.op == TaskChangeOp.delete,
+                TaskChange.changed_at < before,
+                TaskChange.user_id.in_([floor_user_id for floor_user_id, _ in floors]),
+            )
+        ).rowcount
+    logged = db.execute(
+        insert(TaskChange).from_select(["user_id", "task_id", "op"], untracked)
+    ).rowcount
+    return {"superseded": removed, "tombstones": tombstones, "logged": logged}
+
+
+class ChangeNotifier:
+    """Wakes requests waiting for a user's changes; used from the event loop only, so no lock."""
+
+    def __init__(self):
+        self._waiters: Dict[str, Set[asyncio.Event]] = {}
+
+    def subscribe(self, user_id: str) -> asyncio.Event:
+        event = asyncio.Event()
+        self._waiters.setdefault(user_id, set()).add(event)
+        return event
+
+    def unsubscribe(self, user_id: str, event: asyncio.Event) -> None:
+        waiters = self._waiters.get(user_id)
+        if waiters is not None:
+            waiters.discard(event)
+            if not waiters:
+                del self._waiters[user_id]
+
+    def notify(self, user_id: str) -> None:
+        for event in self._waiters.get(user_id, ()):
+            event.set()
+
+    async def wait(self, event: asyncio.Event, timeout: float) -> bool:
+        """Wait up to ``timeout`` seconds (at most one poll interval) for ``event``; True if it fired."""
+        try:
+            await asyncio.wait_for(event.wait(), min(timeout, settings.TASK_CHANGES_POLL_SECONDS))
+        except asyncio.TimeoutError:
+            return False
+        return True
+
+
+change_notifier = ChangeNotifier()
@@ -0,0 +1,124 @@
+from datetime import datetime, timedelta
+from typing import Optional
+from sqlalchemy import case, delete, func, insert, select, union
+from sqlalchemy.orm import Session
+from ..models.task import DUE_KEY, Task, TaskStatus, TaskPriority
+from ..models.task_counter import TaskCategoryCounter, TaskCounter
+from ..utils.sql import upsert_increment
+from .task_versions import bump_task_version
+
+
+def adjust_task_counter(db: Session, user_id: str, status: TaskStatus, priority: TaskPriority, delta: int):
+    """Add ``delta`` to the user's counter for (status, priority) in the current transaction."""
+    if not user_id or not delta:
+        return
+    upsert_increment(db, TaskCounter, {"user_id": user_id, "status": status, "priority": priority}, "count", delta)
+
+
+def move_task_counter(db: Session, user_id: str, old_status, old_priority, new_status, new_priority):
+    """Move one task between counters after its status and/or priority changed."""
+    if (old_status, old_priority) == (new_status, new_priority):
+        return
+    adjust_task_counter(db, user_id, old_status, old_priority, -1)
+    adjust_task_counter(db, user_id, new_status, new_priority, 1)
+
+
+def adjust_category_counter(db: Session, user_id: str, category_id: Optional[str], delta: int):
+    """Add ``delta`` to the user's counter for ``category_id`` (no-op for uncategorized tasks)."""
+    if not user_id or not category_id or not delta:
+        return
+    upsert_increment(db, TaskCategoryCounter, {"user_id": user_id, "category_id": str(category_id)}, "count", delta)
+
+
+def move_category_counter(db: Session, user_id: str, old_category_id, new_category_id):
+    """Move one task between category counters after its category changed."""
+    if old_category_id == new_category_id:
+        return
+    adjust_category_counter(db, user_id, old_category_id, -1)
+    adjust_category_counter(db, user_id, new_category_id, 1)
+
+
+def count_tasks(db: Session, user_id: str, status: Optional[TaskStatus] = None, priority: Optional[TaskPriority] = None) -> int:
+    """Total tasks for the user matching the optional status/priority filters."""
+    stmt = select(func.coalesce(func.sum(TaskCounter.count), 0)).where(TaskCounter.user_id == user_id)
+    if status:
+        stmt = stmt.where(TaskCounter.status == status)
+    if priority:
+        stmt = stmt.where(TaskCounter.priority == priority)
+    return db.execute(stmt).scalar_one()
+
+
+def task_stats(db: Session, user_id: str, now: datetime, due_soon: timedelta) -> dict:
+    """Counts by status, priority and category plus overdue/due-soon pending tasks.
+
+    Status, priority and category come from the counters; overdue and due soon
+    are one range scan of ix_tasks_user_status_due_created over pending tasks
+    due before ``now + due_soon`` (undated tasks sort after every date).
+    """
+    by_status = {s.value: 0 for s in TaskStatus}
+    by_priority = {p.value: 0 for p in TaskPriority}
+    for task_status, task_priority, count in db.execute(
+        select(TaskCounter.status, TaskCounter.priority, TaskCounter.count).where(TaskCounter.user_id == user_id)
+    ):
+        by_status[task_status.value] += count
+        by_priority[task_priority.value] += count
+    by_category = dict(db.execute(
+        select(TaskCategoryCounter.category_id, TaskCategoryCounter.count)
+        .where(TaskCategoryCounter.user_id == user_id, TaskCategoryCounter.count > 0)
+    ).all())
+    overdue, soon = db.execute(
+        select(
+            func.count(case((DUE_KEY < now, 1))),
+            func.count(case((DUE_KEY >= now, 1))),
+        ).where(
+            Task.user_id == user_id,
+            Task.status == TaskStatus.pending,
+            DUE_KEY < now + due_soon,
+        )
+    ).one()
+    total = sum(by_status.values())
+    return {
+        "total": total,
+        "byStatus": by_status,
+        "byPriority": by_priority,
+        "byCategory": by_category,
+        "uncategorized": total - sum(by_category.values()),
+        "overdue": overdue,
+        "dueSoon": soon,
+    }
+
+
+def rebuild_task_counters(db: Session, user_id: Optional[str] = None) -> int:
+    """Recompute counters from the tasks table (all users, or just ``user_id``).
+
+    Returns the number of counter rows written. The caller commits. Every
+    rewritten user's version is bumped, so list ETags with the old total go stale.
+    """
+    users = union(*(
+        select(model.user_id).where(model.user_id.is_not(None), *([model.user_id == user_id] if user_id else []))
+        for model in (Task, TaskCounter, TaskCategoryCounter)
+    ))
+    affected = list(db.execute(users).scalars())
+    written = 0
+    for model, columns in (
+        (TaskCounter, ("status", "priority")),
+        (TaskCategoryCounter, ("category_id",)),
+    ):
+        keys = [getattr(Task, name) for name in columns]
+        clear = delete(model)
+        source = (
+            select(Task.user_id, *keys, func.count())
+            .where(Task.user_id.is_not(None), *(key.is_not(None) for key in keys))
+            .group_by(Task.user_id, *keys)
+        )
+        if user_id:
+            clear = clear.where(model.user_id == user_id)
+            source = source.where(Task.user_id == user_id)
+        db.execute(clear)
+        result = db.execute(
+            insert(model).from_select([model.user_id, *(getattr(model, name) for name in columns), model.count], source)
+        )
+        written += result.rowcount
+    for affected_user in affected:
+        bump_task_version(db, affected_user)
+    return written
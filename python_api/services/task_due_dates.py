@@ -0,0 +1,34 @@
+"""Repairing due dates stored before they were converted to UTC on write.
+
+SQLite keeps a datetime without its offset, so a ``dueDate`` sent as
+``10:00+05:00`` used to be stored as 10:00 instead of 05:00 UTC. The offset
+itself is gone: the operator supplies the one their clients used, and every
+stored due date is shifted back by it. Run it once, with the API stopped.
+"""
+from collections import defaultdict
+from datetime import timedelta
+from typing import Optional
+from sqlalchemy import select, update
+from sqlalchemy.orm import Session
+from ..models.task import Task
+from .task_changes import record_task_changes
+from .task_versions import bump_task_version
+
+
+def shift_due_dates(db: Session, utc_offset: timedelta, user_id: Optional[str] = None) -> int:
+    """Subtract ``utc_offset`` from every stored due date (only ``user_id``'s, if given); tasks changed."""
+    query = select(Task.id, Task.user_id, Task.due_date).where(Task.due_date.is_not(None))
+    if user_id is not None:
+        query = query.where(Task.user_id == user_id)
+    rows = db.execute(query).all()
+    if not rows or not utc_offset:
+        return 0
+    db.execute(update(Task), [{"id": task_id, "due_date": due_date - utc_offset} for task_id, _, due_date in rows])
+    # The tasks' representations changed: feed entries, and list ETags move on
+    by_user = defaultdict(list)
+    for task_id, owner, _ in rows:
+        by_user[owner].append(task_id)
+    for owner, task_ids in by_user.items():
+        record_task_changes(db, owner, task_ids)
+        bump_task_version(db, owner)
+    return len(rows)
@@ -0,0 +1,94 @@
+import csv
+import io
+import zlib
+from datetime import datetime
+from typing import AsyncIterator, Iterator, Optional
+from sqlalchemy import select
+from .. import database
+from ..models.task import Task, TaskStatus, TaskPriority
+from .task_serialization import TASK_COLUMNS, dumps, format_datetime, task_row_to_dict
+
+# Rows fetched per round trip; also the unit that is encoded and flushed
+EXPORT_CHUNK_ROWS = 500
+
+CSV_HEADER = ["id", "title", "description", "status", "priority", "dueDate", "categoryId", "created_at", "updated_at"]
+
+MEDIA_TYPES = {"ndjson": "application/x-ndjson", "csv": "text/csv; charset=utf-8"}
+
+
+def export_statement(user_id: str, status: Optional[TaskStatus] = None, priority: Optional[TaskPriority] = None):
+    stmt = select(*TASK_COLUMNS).where(Task.user_id == user_id)
+    if status:
+        stmt = stmt.where(Task.status == status)
+    if priority:
+        stmt = stmt.where(Task.priority == priority)
+    # yield_per streams from a server-side cursor instead of buffering the result
+    return stmt.order_by(Task.created_at, Task.id).execution_options(yield_per=EXPORT_CHUNK_ROWS)
+
+
+def _csv_value(value):
+    if value is None:
+        return ""
+    if isinstance(value, datetime):
+        return format_datetime(value)
+    return getattr(value, "value", value)
+
+
+class ExportEncoder:
+    """Encodes row chunks as NDJSON or CSV, optionally through a streaming gzip compressor."""
+
+    def __init__(self, format: str, gzip: bool = False):
+        self.format = format
+        self._header_sent = False
+        self._gzip = zlib.compressobj(wbits=31) if gzip else None
+
+    def _encode(self, rows) -> bytes:
+        # Same representation as the TaskOut responses of GET /tasks
+        payloads = [task_row_to_dict(row) for row in rows]
+        if self.format == "csv":
+            buffer = io.StringIO()
+            writer = csv.writer(buffer)
+            if not self._header_sent:
+                writer.writerow(CSV_HEADER)
+                self._header_sent = True
+            for item in payloads:
+                writer.writerow([_csv_value(item[key]) for key in CSV_HEADER])
+            return buffer.getvalue().encode()
+        return b"".join(dumps(item) + b"\n" for item in payloads)
+
+    def chunk(self, rows) -> bytes:
+        data = self._encode(rows)
+        return self._gzip.compress(data) if self._gzip else data
+
+    def finish(self) -> bytes:
+        tail = b""
+        if self.format == "csv" and not self._header_sent:
+            tail = self._encode([])
+            if self._gzip:
+                tail = self._gzip.compress(tail)
+        if self._gzip:
+            tail += self._gzip.flush()
+        return tail
+
+
+def stream_export(stmt, encoder: ExportEncoder, user_id: str) -> Iterator[bytes]:
+    # Own session (on the user's shard): the export outlives the request's dependency scope
+    db = database.user_sessionmaker(user_id, read=True)()
+    try:
+        for rows in db.execute(stmt).partitions():
+            yield encoder.chunk(rows)
+        tail = encoder.finish()
+        if tail:
+            yield tail
+    finally:
+        db.close()
+
+
+async def stream_export_async(stmt, encoder: ExportEncoder, user_id: str) -> AsyncIterator[bytes]:
+    async with database.user_sessionmaker(user_id, read=True)() as db:
+        result = await db.stream(stmt)
+        async for rows in result.partitions():
+            yield encoder.chunk(rows)
+    tail = encoder.finish()
+    if tail:
+        yield tail
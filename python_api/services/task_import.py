@@ -0,0 +1,51 @@
+import json
+from typing import AsyncIterator, Optional, Tuple
+from pydantic import ValidationError
+from ..schemas.task import TaskCreate
+from ..utils.error_format import validation_details
+
+
+async def iter_ndjson_lines(chunks: AsyncIterator[bytes], max_line_bytes: int) -> AsyncIterator[Tuple[int, Optional[bytes]]]:
+    """Split a byte stream into numbered lines without buffering the whole body.
+
+    Lines longer than ``max_line_bytes`` are discarded as they arrive and
+    yielded as ``None`` so memory stays bounded by one line.
+    """
+    buffer = bytearray()
+    line_no = 0
+    oversized = False
+    async for chunk in chunks:
+        start = 0
+        while True:
+            end = chunk.find(b"\n", start)
+            if end < 0:
+                if not oversized:
+                    buffer += chunk[start:]
+                    if len(buffer) > max_line_bytes:
+                        oversized = True
+                        buffer.clear()
+                break
+            line_no += 1
+            if not oversized:
+                buffer += chunk[start:end]
+                oversized = len(buffer) > max_line_bytes
+            yield line_no, None if oversized else bytes(buffer)
+            buffer.clear()
+            oversized = False
+            start = end + 1
+    if buffer or oversized:
+        yield line_no + 1, None if oversized else bytes(buffer)
+
+
+def parse_task_line(line: Optional[bytes]) -> Tuple[Optional[TaskCreate], Optional[dict]]:
+    """Validate one NDJSON line as a TaskCreate; returns (task, None) or (None, {field: [messages]})."""
+    if line is None:
+        return None, {"__root__": ["Line too long"]}
+    try:
+        data = json.loads(line)
+    except ValueError:
+        return None, {"__root__": ["Invalid JSON"]}
+    try:
+        return TaskCreate.model_validate(data), None
+    except ValidationError as exc:
+        return None, validation_details(exc.errors())
@@ -0,0 +1,123 @@
+"""Full-text search over task title/description.
+
+SQLite: an external-content FTS5 table (``tasks_fts``) kept in sync by
+triggers on ``tasks`` and ranked with bm25. PostgreSQL: a GIN expression index
+over ``to_tsvector`` ranked with ts_rank. Other backends fall back to LIKE.
+"""
+import re
+from sqlalchemy import bindparam, column, func, literal_column, or_, select, table, text
+from sqlalchemy.exc import OperationalError
+from ..models.task import Task
+
+FTS_TABLE = "tasks_fts"
+# bm25 column weights: title, description
+BM25_WEIGHTS = (10.0, 5.0)
+PG_DOCUMENT = "coalesce(title, '') || ' ' || coalesce(description, '')"
+
+_SQLITE_DDL = [
+    f"""CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5(
+        title, description, content='tasks', content_rowid='rowid'
+    )""",
+    f"""CREATE TRIGGER IF NOT EXISTS tasks_fts_ai AFTER INSERT ON tasks BEGIN
+        INSERT INTO {FTS_TABLE}(rowid, title, description)
+        VALUES (new.rowid, new.title, new.description);
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS tasks_fts_ad AFTER DELETE ON tasks BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, title, description)
+        VALUES ('delete', old.rowid, old.title, old.description);
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS tasks_fts_au AFTER UPDATE OF title, description ON tasks BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, title, description)
+        VALUES ('delete', old.rowid, old.title, old.description);
+        INSERT INTO {FTS_TABLE}(rowid, title, description)
+        VALUES (new.rowid, new.title, new.description);
+    END""",
+]
+
+_fts = table(FTS_TABLE, column("rowid"))
+_WORD = re.compile(r"\w+", re.UNICODE)
+
+# Set by ensure_search_index, or detected on the first search; None means "not checked yet"
+fts_available = None
+
+
+def ensure_search_index(engine) -> None:
+    """Create the search index and its triggers if missing (indexing existing rows once)."""
+    global fts_available
+    dialect = engine.dialect.name
+    with engine.begin() as conn:
+        if dialect == "sqlite":
+            exists = conn.execute(
+                text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :name"), {"name": FTS_TABLE}
+            ).first()
+            try:
+                for ddl in _SQLITE_DDL:
+                    conn.execute(text(ddl))
+            except OperationalError:
+                # SQLite built without FTS5: search degrades to LIKE
+                fts_available = False
+                return
+            if not exists:
+                conn.execute(text(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')"))
+            fts_available = True
+        elif dialect == "postgresql":
+            conn.execute(text(
+                f"CREATE INDEX IF NOT EXISTS ix_tasks_search ON tasks USING GIN (to_tsvector('simple', {PG_DOCUMENT}))"
+            ))
+            fts_available = True
+        else:
+            fts_available = False
+
+
+def rebuild_search_index(db) -> None:
+    """Re-index every task (e.g. after VACUUM, which may renumber SQLite rowids)."""
+    if db.get_bind().dialect.name == "sqlite":
+        db.execute(text(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')"))
+
+
+def _detect_index(db) -> bool:
+    dialect = db.get_bind().dialect.name
+    if dialect == "sqlite":
+        return db.execute(
+            text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :name"), {"name": FTS_TABLE}
+        ).first() is not None
+    # to_tsvector works without the GIN index, just slower
+    return dialect == "postgresql"
+
+
+def _fts5_query(q: str):
+    words = _WORD.findall(q)
+    if not words:
+        return None
+    # Quote every word so user input can never be read as FTS5 syntax; prefix-match the last one
+    return " AND ".join([f'"{w}"' for w in words[:-1]] + [f'"{words[-1]}"*'])
+
+
+def apply_search(query, db, q: str):
+    """Restrict ``query`` (over Task) to tasks matching ``q``; returns (query, rank) with rank ascending = best.
+
+    ``query`` must already be scoped to the user; the FTS index itself covers every user.
+    """
+    global fts_available
+    if fts_available is None:
+        fts_available = _detect_index(db)
+    dialect = db.get_bind().dialect.name
+    if dialect == "sqlite" and fts_available:
+        match = _fts5_query(q)
+        if match is None:
+            return query.filter(literal_column("0") == 1), None
+        # Materialize the matches first: as a plain join the planner drives from the
+        # user_id index and re-runs the MATCH once per task row
+        matches = (
+            select(_fts.c.rowid, func.bm25(literal_column(FTS_TABLE), *BM25_WEIGHTS).label("rank"))
+            .where(literal_column(FTS_TABLE).op("MATCH")(bindparam("fts_query", match)))
+            .cte("fts_matches")
+            .prefix_with("MATERIALIZED")
+        )
+        query = query.join(matches, matches.c.rowid == literal_column("tasks.rowid"))
+        return query, matches.c.rank
+    if dialect == "postgresql" and fts_available:
+        document = func.to_tsvector("simple", func.coalesce(Task.title, "") + " " + func.coalesce(Task.description, ""))
+        tsquery = func.plainto_tsquery("simple", q)
+        return query.filter(document.op("@@")(tsquery)), -func.ts_rank(document, tsquery)
+    return query.filter(or_(Task.title.icontains(q, autoescape=True), Task.description.icontains(q, autoescape=True))), None
@@ -0,0 +1,95 @@
+"""Moving users' task data to the shard ``database.shard_for`` picks for them.
+
+Needed after DATABASE_SHARDS changes (including 0 -> N for an existing single
+database, and back). Rendezvous hashing keeps the move small: going from N to
+N+1 shards relocates about 1/(N+1) of the users. Run it with the API stopped;
+requests served meanwhile would read and write wherever the router points.
+
+Each user moves in two transactions: copy into the target (replacing any
+earlier partial copy), then delete from the source. A run interrupted between
+them leaves the source authoritative, and running again finishes the move.
+"""
+from typing import Dict, List, Optional
+from sqlalchemy import delete, func, insert, inspect, select, text, union
+from sqlalchemy.orm import Session
+from .. import database
+from ..models import USER_TABLES
+from ..models.task_change import TaskChange
+
+
+def _sessionmaker(location: Optional[int]):
+    # None is the global database
+    return database.SessionLocal if location is None else database.shard(location, "SessionLocal")
+
+
+def _locations() -> List[Optional[int]]:
+    """The global database (if it has task tables) and every shard file on disk."""
+    legacy = inspect(database.engine).has_table(TaskChange.__tablename__)
+    return ([None] if legacy else []) + database.existing_shards()
+
+
+def _user_ids(db: Session) -> List[str]:
+    query = union(*(select(table.c.user_id).where(table.c.user_id.is_not(None)) for table in USER_TABLES))
+    return list(db.execute(query).scalars())
+
+
+def _last_seq(db: Session) -> int:
+    """Highest change log seq ``db`` has handed out, counting deleted entries where SQLite records them."""
+    last = db.execute(select(func.coalesce(func.max(TaskChange.seq), 0))).scalar()
+    if db.get_bind().dialect.name == "sqlite":
+        issued = db.execute(text("SELECT seq FROM sqlite_sequence WHERE name = 'task_changes'")).scalar()
+        last = max(last, issued or 0)
+    return last
+
+
+def move_user(user_id: str, source: Session, target: Session) -> int:
+    """Copy ``user_id``'s rows from ``source`` to ``target``, then delete them from ``source``; rows moved."""
+    rows = {
+        table: [dict(row) for row in source.execute(select(table).where(table.c.user_id == user_id)).mappings()]
+        for table in USER_TABLES
+    }
+    for table in reversed(USER_TABLES):
+        target.execute(delete(table).where(table.c.user_id == user_id))
+    # Change log entries get new seqs above every seq either side has handed out,
+    # so a client's `since` from the source still returns (at least) its pending changes
+    changes = sorted(rows[TaskChange.__table__], key=lambda row: row["seq"])
+    base = max(_last_seq(target), _last_seq(source))
+    for offset, row in enumerate(changes, start=1):
+        row["seq"] = base + offset
+    for table in USER_TABLES:
+        if rows[table]:
+            target.execute(insert(table), rows[table])
+    target.commit()
+    for table in reversed(USER_TABLES):
+        source.execute(delete(table).where(table.c.user_id == user_id))
+    source.commit()
+    return sum(len(table_rows) for table_rows in rows.values())
+
+
+def rebalance_shards(dry_run: bool = False) -> Dict[str, int]:
+    """Move every user whose data is not where the router expects it; counts of users and rows moved.
+
+    Scans the global database and every shard file, including those beyond a
+    lowered DATABASE_SHARDS. ``dry_run`` only counts the users.
+    """
+    if not dry_run:
+        database.create_schema()
+    moved = {"users": 0, "rows": 0}
+    for location in _locations():
+        source = _sessionmaker(location)()
+        try:
+            for user_id in _user_ids(source):
+                target_location = database.shard_for(user_id)
+                if target_location == location:
+                    continue
+                moved["users"] += 1
+                if dry_run:
+                    continue
+                target = _sessionmaker(target_location)()
+                try:
+                    moved["rows"] += move_user(user_id, source, target)
+                finally:
+                    target.close()
+        finally:
+            source.close()
+    return moved
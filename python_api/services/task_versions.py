@@ -0,0 +1,14 @@
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+from ..models.task_version import TaskVersion
+from ..utils.sql import upsert_increment
+
+
+def bump_task_version(db: Session, user_id: str):
+    """Mark the user's task list as changed; call inside the mutating transaction."""
+    if user_id:
+        upsert_increment(db, TaskVersion, {"user_id": user_id}, "version", 1)
+
+
+def get_task_version(db: Session, user_id: str) -> int:
+    return db.execute(select(TaskVersion.version).where(TaskVersion.user_id == user_id)).scalar() or 0
@@ -0,0 +1,56 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional
+from ..core.config import settings
+
+
+class TokenCache:
+    """Bounded LRU of already-verified JWTs -> user id.
+
+    Entries expire at the token's own ``exp`` so a cached token is never
+    accepted after it would have failed verification.
+    """
+
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, token: str) -> Optional[str]:
+        if self.max_size <= 0:
+            return None
+        with self._lock:
+            entry = self._entries.get(token)
+            if entry is None:
+                self.misses += 1
+                return None
+            user_id, expires_at = entry
+            if expires_at <= time.time():
+                del self._entries[token]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(token)
+            self.hits += 1
+            return user_id
+
+    def put(self, token: str, user_id: str, expires_at) -> None:
+        if self.max_size <= 0 or expires_at is None:
+            return
+        with self._lock:
+            self._entries[token] = (user_id, float(expires_at))
+            self._entries.move_to_end(token)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        return {"size": len(self._entries), "max_size": self.max_size, "hits": self.hits, "misses": self.misses}
+
+
+token_cache = TokenCache(settings.TOKEN_CACHE_SIZE)
@@ -0,0 +1,46 @@
+import heapq
+import threading
+import time
+from typing import Dict, List, Tuple
+
+
+class RevokedTokens:
+    """In-memory set of revoked token ids (``jti``), each kept only until its token expires.
+
+    After ``exp`` a token fails signature verification anyway, so the entry can
+    go: the set holds at most the tokens revoked within one refresh lifetime.
+    Ids are stored as the 16 raw bytes of their UUID, with a heap ordered by
+    expiry so dropping expired entries never scans the whole set.
+    """
+
+    def __init__(self, clock=time.time):
+        self.clock = clock
+        self._expires: Dict[bytes, float] = {}
+        self._heap: List[Tuple[float, bytes]] = []
+        self._lock = threading.Lock()
+
+    def revoke(self, jti: str, expires_at: float) -> bool:
+        """Revoke ``jti`` until ``expires_at``; False if it already was (the token was reused)."""
+        key = bytes.fromhex(jti)
+        with self._lock:
+            self._purge(self.clock())
+            if key in self._expires:
+                return False
+            self._expires[key] = float(expires_at)
+            heapq.heappush(self._heap, (float(expires_at), key))
+            return True
+
+    def is_revoked(self, jti: str) -> bool:
+        with self._lock:
+            return bytes.fromhex(jti) in self._expires
+
+    def _purge(self, now: float) -> None:
+        while self._heap and self._heap[0][0] <= now:
+            _, key = heapq.heappop(self._heap)
+            del self._expires[key]
+
+    def __len__(self) -> int:
+        return len(self._expires)
+
+
+revoked_tokens = RevokedTokens()
@@ -3,6 +3,18 @@ from fastapi.responses import JSONResponse
 from ..schemas.error import ErrorDetail, ErrorResponse
 from datetime import datetime, timezone
 
+def validation_details(errors, skip: int = 0) -> dict:
+    """Collapse pydantic errors into ``{field: [messages]}``.
+
+    ``skip`` drops leading location segments such as ``body`` or ``query``.
+    """
+    details = {}
+    for err in errors:
+        loc = list(err.get("loc", []))
+        key_parts = [str(p) for p in loc[skip:]] if len(loc) > skip else [str(loc[0])] if loc else ["__root__"]
+        details.setdefault(".".join(key_parts), []).append(err.get("msg", "Invalid value"))
+    return details
+
 def format_error(code: str, message: str, details: dict = None, path: str = None):
     return ErrorResponse(
         error=ErrorDetail(code=code, message=message, details=details),
@@ -0,0 +1,22 @@
+import base64
+import json
+
+
+def encode_cursor(*values) -> str:
+    # Opaque cursor: base64url(JSON [sort key..., created_at, id]) without padding
+    raw = json.dumps([value if isinstance(value, int) else str(value) for value in values], separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, size: int = 2) -> list:
+    """Values of a cursor made by ``encode_cursor`` with ``size`` keys (ValueError if it does not fit)."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except Exception:
+        raise ValueError("Invalid cursor")
+    if not isinstance(values, list) or len(values) != size:
+        raise ValueError("Invalid cursor")
+    if not all(isinstance(value, (str, int)) and not isinstance(value, bool) for value in values):
+        raise ValueError("Invalid cursor")
+    return values
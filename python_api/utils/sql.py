@@ -0,0 +1,31 @@
+from sqlalchemy import insert, update
+from sqlalchemy.orm import Session
+
+
+def upsert_increment(db: Session, model, keys: dict, column: str, delta: int):
+    """``column += delta`` on the row identified by ``keys``, inserting it with ``delta`` if missing.
+
+    Uses INSERT ... ON CONFLICT on SQLite/PostgreSQL and UPDATE-then-INSERT elsewhere.
+    """
+    dialect = db.get_bind().dialect.name
+    target = getattr(model, column)
+    values = {**keys, column: delta}
+    if dialect in ("sqlite", "postgresql"):
+        if dialect == "sqlite":
+            from sqlalchemy.dialects.sqlite import insert as upsert
+        else:
+            from sqlalchemy.dialects.postgresql import insert as upsert
+        stmt = upsert(model).values(**values)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[getattr(model, key) for key in keys],
+            set_={column: target + getattr(stmt.excluded, column)},
+        )
+        db.execute(stmt)
+        return
+    result = db.execute(
+        update(model)
+        .where(*(getattr(model, key) == value for key, value in keys.items()))
+        .values({column: target + delta})
+    )
+    if result.rowcount == 0:
+        db.execute(insert(model).values(**values))
@@ -13,19 +13,25 @@ TEST_DB_PATH = pathlib.Path("test_todo.db")
 
 @pytest.fixture(scope="session")
 def test_client():
-    # Ensure clean test DB
-    if TEST_DB_PATH.exists():
-        TEST_DB_PATH.unlink()
+    # Ensure clean test DB (and shards left by an interrupted run)
+    for path in [TEST_DB_PATH, *TEST_DB_PATH.parent.glob(f"{TEST_DB_PATH.stem}-shard*{TEST_DB_PATH.suffix}")]:
+        path.unlink(missing_ok=True)
 
     # Configure test environment before importing the app
     os.environ["DATABASE_URL"] = f"sqlite:///{TEST_DB_PATH.as_posix()}"
     os.environ["SECRET_KEY"] = os.environ.get("SECRET_KEY", "test-secret-key")
+    # Cheapest bcrypt cost keeps the suite fast
+    os.environ.setdefault("BCRYPT_ROUNDS", "4")
+    # Every test logs in from the same client address; rate limits get their own tests
+    os.environ.setdefault("RATE_LIMIT_ENABLED", "false")
 
     # Import app after env and alias are ready
     from importlib import import_module
 
     app_mod = import_module("python_api.main")
     app = app_mod.app
+    # Importing the app does not touch the database; create the schema explicitly
+    import_module("python_api.database").create_schema()
 
     client = TestClient(app)
     try:
@@ -36,30 +42,32 @@ def test_client():
             client.close()
         except Exception:
             pass
-        # Dispose SQLAlchemy engine to release SQLite file handle on Windows
+        # Dispose every engine (global and shards) to release SQLite file handles on Windows
         try:
+            import asyncio
             from importlib import import_module
-            db_mod = import_module("python_api.database")
-            if hasattr(db_mod, "engine"):
-                db_mod.engine.dispose()
-        except Exception:
-            pass
-        # Teardown DB file (ignore if locked)
-        try:
-            TEST_DB_PATH.unlink(missing_ok=True)
+            asyncio.run(import_module("python_api.database").dispose_engines())
         except Exception:
             pass
+        # Teardown DB files, including DATABASE_SHARDS files (ignore if locked)
+        databases = [TEST_DB_PATH, *TEST_DB_PATH.parent.glob(f"{TEST_DB_PATH.stem}-shard*{TEST_DB_PATH.suffix}")]
+        for path in [db.with_name(db.name + suffix) for db in databases for suffix in ("", "-wal", "-shm")]:
+            try:
+                path.unlink(missing_ok=True)
+            except Exception:
+                pass
 
 
 @pytest.fixture()
 def auth_headers(test_client: TestClient):
     # Register a user and return Authorization headers
-    email = f"user_{uuid.uuid4().hex[:8]}@example.com"
+    suffix = uuid.uuid4().hex[:8]
+    email = f"user_{suffix}@example.com"
     password = "password123"
 
     resp = test_client.post(
         "/auth/register",
-        json={"email": email, "password": password, "username": "tester"},
+        json={"email": email, "password": password, "username": f"tester_{suffix}"},
     )
     assert resp.status_code in (200, 201), resp.text
 
@@ -72,3 +80,27 @@ def auth_headers(test_client: TestClient):
     assert login.status_code == 200, login.text
     token = login.json()["accessToken"]
     return {"Authorization": f"Bearer {token}"}
+
+
+@pytest.fixture()
+def auth_user_id(auth_headers):
+    from jose import jwt
+
+    return jwt.get_unverified_claims(auth_headers["Authorization"].split()[1])["sub"]
+
+
+@pytest.fixture()
+def task_engines(auth_user_id):
+    # Engines serving the auth user's task routes (their shard with DATABASE_SHARDS), for statement listeners
+    from python_api import database
+
+    return {database.user_engine(auth_user_id), database.user_engine(auth_user_id, read=True)}
+
+
+@pytest.fixture()
+def explain_engine(auth_user_id):
+    # Sync engine on the database holding the auth user's tasks, for EXPLAIN QUERY PLAN
+    from python_api import database
+
+    index = database.shard_for(auth_user_id)
+    return database.engine if index is None else database.shard(index, "engine")
@@ -24,3 +24,141 @@ def test_register_and_login_flow(test_client):
     assert "refreshToken" in tokens
     assert tokens["expiresIn"] > 0
 
+
+
+def _register(test_client, email, password="password123"):
+    r = test_client.post("/auth/register", json={"email": email, "password": password})
+    assert r.status_code == 201, r.text
+
+
+def _login(test_client, email, password="password123"):
+    return test_client.post(
+        "/auth/login",
+        data={"username": email, "password": password},
+        headers={"Content-Type": "application/x-www-form-urlencoded"},
+    )
+
+
+def test_login_rejected_when_hash_queue_full(test_client):
+    from python_api.services.passwords import password_hasher
+
+    _register(test_client, "busy@example.com")
+    max_pending = password_hasher.max_pending
+    password_hasher.max_pending = 0
+    try:
+        r = _login(test_client, "busy@example.com")
+    finally:
+        password_hasher.max_pending = max_pending
+    assert r.status_code == 503
+    assert int(r.headers["Retry-After"]) >= 1
+    assert r.json()["error"]["code"] == "HTTP_ERROR"
+    assert password_hasher.stats()["rejected"] >= 1
+
+
+def test_login_after_hash_worker_dies(test_client):
+    from python_api.services.passwords import password_hasher
+
+    _register(test_client, "oom@example.com")
+    executor = password_hasher._get_executor()
+    if executor is None:
+        import pytest
+        pytest.skip("password hashing runs in threads (PASSWORD_HASH_WORKERS=0)")
+    # Like an OOM kill: the pool is broken for every later job
+    worker = next(iter(executor._processes.values()))
+    worker.kill()
+    worker.join(timeout=10)
+    assert _login(test_client, "oom@example.com").status_code == 200
+    assert password_hasher._executor is not executor
+    assert _login(test_client, "oom@example.com").status_code == 200
+
+
+def test_login_rehashes_when_cost_changes(test_client):
+    from python_api.database import SessionLocal
+    from python_api.models.user import User
+    from python_api.services.passwords import password_hasher, bcrypt_rounds
+
+    _register(test_client, "rehash@example.com")
+    rounds = password_hasher.rounds
+    password_hasher.rounds = rounds + 1
+    try:
+        assert _login(test_client, "rehash@example.com").status_code == 200
+    finally:
+        password_hasher.rounds = rounds
+    db = SessionLocal()
+    try:
+        stored = db.query(User).filter(User.email == "rehash@example.com").one().hashed_password
+    finally:
+        db.close()
+    assert bcrypt_rounds(stored) == rounds + 1
+    # The upgraded hash still verifies
+    assert _login(test_client, "rehash@example.com").status_code == 200
+    stats = password_hasher.stats()
+    assert stats["jobs"] > 0 and stats["hash_seconds"] > 0
+
+
+def test_token_cache_hits_and_expiry(test_client, auth_headers):
+    import time
+    from python_api.services.token_cache import TokenCache, token_cache
+
+    hits = token_cache.hits
+    for _ in range(3):
+        assert test_client.get("/tasks/", headers=auth_headers).status_code == 200
+    assert token_cache.hits >= hits + 2
+
+    # A tampered token is never served from the cache
+    bad = {"Authorization": auth_headers["Authorization"] + "x"}
+    assert test_client.get("/tasks/", headers=bad).status_code == 401
+
+    cache = TokenCache(max_size=2)
+    cache.put("a", "user-a", time.time() - 1)
+    assert cache.get("a") is None
+    cache.put("b", "user-b", time.time() + 60)
+    cache.put("c", "user-c", time.time() + 60)
+    cache.put("d", "user-d", time.time() + 60)
+    assert cache.get("b") is None and cache.get("d") == "user-d"
+    assert cache.stats()["size"] == 2
+
+
+def test_refresh_rotates_tokens_without_bcrypt(test_client):
+    from python_api.services.passwords import password_hasher
+
+    _register(test_client, "refresh@example.com")
+    tokens = _login(test_client, "refresh@example.com").json()
+
+    # A refresh token is not an access token, and vice versa
+    assert test_client.get("/tasks/", headers={"Authorization": f"Bearer {tokens['refreshToken']}"}).status_code == 401
+    assert test_client.post("/auth/refresh", json={"refreshToken": tokens["accessToken"]}).status_code == 401
+    assert test_client.post("/auth/refresh", json={"refreshToken": "not-a-jwt"}).status_code == 401
+
+    jobs = password_hasher.stats()["jobs"]
+    r = test_client.post("/auth/refresh", json={"refreshToken": tokens["refreshToken"]})
+    assert r.status_code == 200, r.text
+    refreshed = r.json()
+    assert refreshed["expiresIn"] > 0
+    assert refreshed["refreshToken"] != tokens["refreshToken"]
+    assert test_client.get("/tasks/", headers={"Authorization": f"Bearer {refreshed['accessToken']}"}).status_code == 200
+    assert password_hasher.stats()["jobs"] == jobs
+
+    # Rotated out: the old refresh token is rejected, the new one works once
+    assert test_client.post("/auth/refresh", json={"refreshToken": tokens["refreshToken"]}).status_code == 401
+    assert test_client.post("/auth/refresh", json={"refreshToken": refreshed["refreshToken"]}).status_code == 200
+    assert test_client.post("/auth/refresh", json={"refreshToken": refreshed["refreshToken"]}).status_code == 401
+
+
+def test_revoked_tokens_expire():
+    import uuid
+    from python_api.services.token_revocation import RevokedTokens
+
+    now = [100.0]
+    revoked = RevokedTokens(clock=lambda: now[0])
+    a, b = uuid.uuid4().hex, uuid.uuid4().hex
+    assert revoked.revoke(a, 110)
+    assert not revoked.revoke(a, 110)
+    assert revoked.revoke(b, 200)
+    assert revoked.is_revoked(a) and len(revoked) == 2
+
+    # Entries leave once their token would have expired anyway
+    now[0] = 150.0
+    revoked.revoke(uuid.uuid4().hex, 300)
+    assert not revoked.is_revoked(a) and revoked.is_revoked(b)
+    assert len(revoked) == 2
@@ -12,3 +12,77 @@ def test_categories_crud_minimal(test_client):
     cats = r.json()
     assert any(c["id"] == cat["id"] for c in cats)
 
+
+
+def test_categories_cache_hits_invalidation_and_parity(test_client):
+    import pytest
+    from python_api.routers import categories
+
+    cache = categories.category_cache
+    if cache is None:
+        pytest.skip("CATEGORY_CACHE_URL=none")
+    test_client.post("/categories/", json={"name": "Home ✓", "color": "#00ff00"})
+    first = test_client.get("/categories/")
+    hits = cache.hits
+    second = test_client.get("/categories/")
+    assert cache.hits == hits + 1
+    assert second.content == first.content
+    etag = second.headers["etag"]
+    assert test_client.get("/categories/", headers={"If-None-Match": etag}).status_code == 304
+
+    # Same bytes and ETag as the uncached path
+    categories.category_cache = None
+    try:
+        uncached = test_client.get("/categories/")
+    finally:
+        categories.category_cache = cache
+    assert uncached.content == second.content
+    assert uncached.headers["etag"] == etag
+
+    # Writes invalidate
+    created = test_client.post("/categories/", json={"name": "Fresh"}).json()
+    r = test_client.get("/categories/", headers={"If-None-Match": etag})
+    assert r.status_code == 200
+    assert any(c["id"] == created["id"] for c in r.json())
+    stats = cache.stats()
+    assert 0 < stats["hit_ratio"] < 1 and stats["rebuilds"] >= 2
+
+
+def test_categories_uncached_path_matches_cached_bytes_and_etag(test_client):
+    from python_api.routers import categories
+    from python_api.services.category_cache import CategoryCache, MemoryBackend
+
+    test_client.post("/categories/", json={"name": "Uncached", "color": "#0000ff"})
+    cache = categories.category_cache
+    try:
+        categories.category_cache = None
+        uncached = test_client.get("/categories/")
+        assert test_client.get("/categories/", headers={"If-None-Match": uncached.headers["etag"]}).status_code == 304
+        categories.category_cache = CategoryCache(MemoryBackend())
+        cached = test_client.get("/categories/")
+    finally:
+        categories.category_cache = cache
+    assert uncached.status_code == cached.status_code == 200
+    assert uncached.content == cached.content
+    assert uncached.headers["etag"] == cached.headers["etag"]
+
+
+def test_category_cache_shared_backend_keeps_workers_consistent():
+    import asyncio
+    from python_api.services.category_cache import CategoryCache, MemoryBackend
+
+    async def scenario():
+        # One backend shared by two caches stands in for Redis shared by two workers
+        shared = MemoryBackend()
+        worker_a, worker_b = CategoryCache(shared), CategoryCache(shared)
+        for worker in (worker_a, worker_b):
+            generation, cached = await worker.lookup()
+            assert cached is None
+            body, etag = worker.rebuild(generation, lambda: b"[]")
+            assert (await worker.lookup())[1] == (b"[]", etag)
+
+        await worker_a.invalidate()
+        assert (await worker_b.lookup())[1] is None
+        assert (await worker_a.lookup())[1] is None
+
+    asyncio.run(scenario())
@@ -0,0 +1,166 @@
+import asyncio
+from sqlalchemy import create_engine, text
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import Session
+
+
+def test_async_database_url_mapping(test_client):
+    from python_api.core.config import _async_database_url
+
+    assert _async_database_url("sqlite:///./todo.db") == "sqlite+aiosqlite:///./todo.db"
+    assert _async_database_url("postgresql://u:p@db/todo") == "postgresql+asyncpg://u:p@db/todo"
+    assert _async_database_url("postgresql+asyncpg://u:p@db/todo") == "postgresql+asyncpg://u:p@db/todo"
+
+
+def test_run_db_accepts_sync_and_async_sessions(test_client):
+    from python_api.database import run_db
+
+    def answer(db: Session, value):
+        assert isinstance(db, Session)
+        return db.execute(text("SELECT :v"), {"v": value}).scalar_one()
+
+    async def scenario():
+        sync_engine = create_engine("sqlite://", connect_args={"check_same_thread": False})
+        with Session(sync_engine) as db:
+            assert await run_db(db, answer, 1) == 1
+        async_engine = create_async_engine("sqlite+aiosqlite://")
+        async with AsyncSession(async_engine) as db:
+            assert await run_db(db, answer, 2) == 2
+        await async_engine.dispose()
+
+    asyncio.run(scenario())
+
+
+def test_sqlite_profile_and_read_only_pool(test_client):
+    import pytest
+    from sqlalchemy.exc import OperationalError
+    from python_api import database
+
+    def pragmas(conn):
+        return {
+            name: conn.execute(text(f"PRAGMA {name}")).scalar()
+            for name in ("journal_mode", "synchronous", "busy_timeout", "temp_store", "query_only")
+        }
+
+    with database.engine.connect() as conn:
+        # synchronous NORMAL = 1, temp_store MEMORY = 2
+        assert pragmas(conn) == {"journal_mode": "wal", "synchronous": 1, "busy_timeout": 5000, "temp_store": 2, "query_only": 0}
+
+    assert database.read_engine is not database.engine
+    with database.read_engine.connect() as conn:
+        assert pragmas(conn)["query_only"] == 1
+        with pytest.raises(OperationalError):
+            conn.execute(text("DELETE FROM users"))
+
+    # Reads proceed while another connection holds the write lock
+    with database.engine.connect() as writer:
+        writer.execute(text("BEGIN IMMEDIATE"))
+        writer.execute(text("DELETE FROM users WHERE id = 'nobody'"))
+        with database.read_engine.connect() as reader:
+            assert reader.execute(text("SELECT count(*) FROM users")).scalar() >= 0
+        writer.rollback()
+
+
+def test_forked_child_gets_fresh_pools(test_client):
+    import os
+    import pytest
+    from python_api import database
+
+    if not hasattr(os, "fork"):
+        pytest.skip("needs os.fork")
+    with database.engine.connect() as conn:
+        conn.execute(text("SELECT 1"))
+    parent_pool = database.engine.pool
+    read, write = os.pipe()
+    pid = os.fork()
+    if pid == 0:
+        try:
+            with database.engine.connect() as conn:
+                ok = database.engine.pool is not parent_pool and conn.execute(text("SELECT count(*) FROM users")).scalar() >= 0
+            os.write(write, b"ok" if ok else b"shared")
+        finally:
+            os._exit(0)
+    os.close(write)
+    os.waitpid(pid, 0)
+    assert os.read(read, 16) == b"ok"
+    os.close(read)
+    # The parent's pool (and its pooled connection) is untouched
+    assert database.engine.pool is parent_pool
+    with database.engine.connect() as conn:
+        assert conn.execute(text("SELECT 1")).scalar() == 1
+
+
+def test_user_shards_route_tasks_and_rebalance(test_client, tmp_path):
+    import sqlite3
+    from fastapi.testclient import TestClient
+    from jose import jwt
+    from python_api import database
+    from python_api.core.config import Settings, _async_database_url, settings
+    from python_api.main import create_app
+    from python_api.routers.users import create_access_token
+    from python_api.services.task_shards import rebalance_shards
+
+    cfg = Settings()
+    cfg.DATABASE_URL = f"sqlite:///{(tmp_path / 'todo.db').as_posix()}"
+    cfg.ASYNC_DATABASE_URL = _async_database_url(cfg.DATABASE_URL)
+    cfg.DATABASE_SHARDS = 2
+
+    def app_client(cfg):
+        # Close pooled (async) connections before the engines are rebuilt for cfg
+        asyncio.run(database.dispose_engines())
+        return TestClient(create_app(cfg))
+
+    def tasks_in(path):
+        with sqlite3.connect(path) as conn:
+            return {row[0] for row in conn.execute("SELECT user_id FROM tasks")}
+
+    try:
+        client = app_client(cfg)
+        database.create_schema()
+        category = client.post("/categories/", json={"name": "Sharded"}).json()
+        users = {}
+        for i in range(40):
+            if len(set(users.values())) == 2:
+                break
+            email = f"shard_{i}@example.com"
+            client.post("/auth/register", json={"email": email, "password": "password123"})
+            token = client.post("/auth/login", data={"username": email, "password": "password123"}).json()["accessToken"]
+            headers = {"Authorization": f"Bearer {token}"}
+            created = client.post("/tasks/", json={"title": f"Task {i}", "categoryId": category["id"]}, headers=headers)
+            assert created.status_code == 201, created.text
+            user_id = jwt.get_unverified_claims(token)["sub"]
+            users[user_id] = database.shard_for(user_id)
+            # Category joins reach the global database from the shard
+            listed = client.get("/tasks/", params={"include": "category"}, headers=headers).json()["tasks"]
+            assert [task["category"]["name"] for task in listed] == ["Sharded"]
+        assert set(users.values()) == {0, 1}
+
+        # Each user's tasks are in their own shard only; the global database has no task tables
+        for index in (0, 1):
+            assert tasks_in(tmp_path / f"todo-shard{index}.db") == {u for u, s in users.items() if s == index}
+        with sqlite3.connect(tmp_path / "todo.db") as conn:
+            assert conn.execute("SELECT count(*) FROM sqlite_master WHERE name = 'tasks'").fetchone() == (0,)
+
+        # Growing to 3 shards moves only the users the router now sends elsewhere
+        cfg.DATABASE_SHARDS = 3
+        client = app_client(cfg)
+        expected = {user_id: database.shard_for(user_id) for user_id in users}
+        # Rendezvous hashing: a user either stays or moves to the new shard
+        assert all(expected[u] in (users[u], 2) for u in users)
+        moved = rebalance_shards()
+        assert moved["users"] == sum(users[u] != expected[u] for u in users)
+        for index in (0, 1, 2):
+            assert tasks_in(tmp_path / f"todo-shard{index}.db") == {u for u, s in expected.items() if s == index}
+        assert rebalance_shards() == {"users": 0, "rows": 0}
+
+        # Back to one database: everything returns to todo.db and stays readable
+        cfg.DATABASE_SHARDS = 0
+        client = app_client(cfg)
+        assert rebalance_shards()["users"] == len(users)
+        assert tasks_in(tmp_path / "todo.db") == set(users)
+        headers = {"Authorization": f"Bearer {create_access_token({'sub': next(iter(users))})}"}
+        changes = client.get("/tasks/changes", params={"since": 0}, headers=headers).json()["changes"]
+        assert [change["task"]["categoryId"] for change in changes] == [category["id"]]
+    finally:
+        asyncio.run(database.dispose_engines())
+        database.configure(settings)
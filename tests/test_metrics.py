@@ -0,0 +1,54 @@
+import logging
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import text
+
+
+def test_metrics_endpoint_reports_routes_and_sql(test_client, auth_headers):
+    task = test_client.post("/tasks/", json={"title": "Measured"}, headers=auth_headers).json()
+    test_client.get(f"/tasks/{task['id']}", headers=auth_headers)
+    test_client.get("/tasks/00000000-0000-0000-0000-000000000000", headers=auth_headers)
+    test_client.get("/no/such/path")
+
+    r = test_client.get("/metrics")
+    assert r.status_code == 200
+    assert r.headers["content-type"].startswith("text/plain; version=0.0.4")
+    body = r.text
+    # Labelled by route template, not the concrete path
+    assert 'http_request_duration_seconds_count{method="GET",route="/tasks/{id}",status="200"}' in body
+    assert 'http_request_duration_seconds_count{method="GET",route="/tasks/{id}",status="404"}' in body
+    assert 'route="unmatched"' in body
+    assert task["id"] not in body
+    assert 'http_request_db_statements_count{route="/tasks/"}' in body
+    assert 'db_pool_checkout_seconds_count{pool="write"}' in body
+    assert 'password_hash_seconds_count{operation="verify"}' in body
+    assert "token_cache_hits_total" in body
+
+
+def test_server_timing_header_counts_queries(test_client):
+    from python_api import database
+    from python_api.services.metrics import MetricsMiddleware
+
+    app = FastAPI()
+
+    @app.get("/probe")
+    def probe():
+        with database.engine.connect() as conn:
+            conn.execute(text("SELECT 1"))
+            conn.execute(text("SELECT 2"))
+        return {}
+
+    app.add_middleware(MetricsMiddleware, server_timing=True)
+    r = TestClient(app).get("/probe")
+    timing = r.headers["server-timing"]
+    assert 'desc="2 queries"' in timing
+    assert all(f"{name};dur=" in timing for name in ("app", "db", "pool", "bcrypt"))
+
+
+def test_slow_queries_are_logged(caplog):
+    from python_api.services.metrics import record_statement
+
+    with caplog.at_level(logging.WARNING, logger="python_api.slow_query"):
+        record_statement(0.001, "SELECT fast", 0.5)
+        record_statement(0.75, "SELECT  slow\n  FROM tasks", 0.5)
+    assert [r.getMessage() for r in caplog.records] == ["Slow query (750.0 ms): SELECT slow FROM tasks"]
@@ -0,0 +1,88 @@
+import asyncio
+import httpx
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+
+def test_token_bucket_refills_and_evicts_idle_clients():
+    from python_api.services import rate_limit
+    from python_api.services.rate_limit import RateLimiter
+
+    now = [0.0]
+    limiter = RateLimiter("test", per_minute=60, burst=2, shards=1, clock=lambda: now[0])
+    assert limiter.acquire("a") == 0
+    assert limiter.acquire("a") == 0
+    assert limiter.acquire("a") == 1.0
+    assert limiter.acquire("b") == 0  # other keys have their own bucket
+    now[0] = 1.0
+    assert limiter.acquire("a") == 0
+
+    # Buckets idle long enough to be full again are dropped on the next sweep
+    now[0] = 10.0
+    sweep_every, rate_limit.SWEEP_EVERY = rate_limit.SWEEP_EVERY, 1
+    try:
+        limiter.acquire("c")
+    finally:
+        rate_limit.SWEEP_EVERY = sweep_every
+    assert len(limiter) == 1
+
+
+def test_rate_limits_per_user_and_per_ip(test_client, auth_headers):
+    from python_api.core.config import Settings
+    from python_api.main import create_app
+    from python_api.routers.users import create_access_token
+
+    cfg = Settings()
+    cfg.RATE_LIMIT_ENABLED = True
+    cfg.RATE_LIMIT_TASKS_PER_MINUTE, cfg.RATE_LIMIT_TASKS_BURST = 60, 3
+    cfg.RATE_LIMIT_AUTH_PER_MINUTE, cfg.RATE_LIMIT_AUTH_BURST = 60, 2
+    client = TestClient(create_app(cfg))
+
+    for _ in range(3):
+        assert client.get("/tasks/", headers=auth_headers).status_code == 200
+    r = client.get("/tasks/", headers=auth_headers)
+    assert r.status_code == 429
+    assert int(r.headers["Retry-After"]) >= 1
+    body = r.json()
+    assert body["error"]["message"] == "Too many requests"
+    assert body["path"] == "/tasks/"
+
+    # Another user still has a full bucket
+    other = {"Authorization": f"Bearer {create_access_token({'sub': 'someone-else'})}"}
+    assert client.get("/tasks/", headers=other).status_code == 200
+
+    # /auth is keyed by client address, before credentials are checked
+    login = {"username": "nobody@example.com", "password": "wrong-password"}
+    assert client.post("/auth/login", data=login).status_code == 401
+    assert client.post("/auth/login", data=login).status_code == 401
+    assert client.post("/auth/login", data=login).status_code == 429
+
+
+def test_load_shedding_rejects_beyond_in_flight_limit():
+    from python_api.services.rate_limit import LoadSheddingMiddleware
+
+    app = FastAPI()
+    started, release = asyncio.Event(), asyncio.Event()
+
+    @app.get("/slow")
+    async def slow():
+        started.set()
+        await release.wait()
+        return {}
+
+    app.add_middleware(LoadSheddingMiddleware, max_in_flight=1)
+
+    async def scenario():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            first = asyncio.ensure_future(client.get("/slow"))
+            await started.wait()
+            shed = await client.get("/slow")
+            release.set()
+            return shed, await first
+
+    shed, first = asyncio.run(scenario())
+    assert first.status_code == 200
+    assert shed.status_code == 503
+    assert shed.headers["Retry-After"] == "1"
+    assert shed.json()["error"]["message"] == "Server busy, retry later"
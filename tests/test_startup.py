@@ -0,0 +1,151 @@
+import json
+import os
+import subprocess
+import sys
+import textwrap
+from pathlib import Path
+
+# Cold-start budgets for a fresh interpreter; importing fastapi alone takes a
+# good share of IMPORT_BUDGET_S, so a regression here usually means something
+# heavy (or a database connection) crept back into import time.
+IMPORT_BUDGET_S = 2.5
+FIRST_REQUEST_BUDGET_S = 1.5
+
+PROBE = textwrap.dedent("""
+    import json, os, sys, time
+    started = time.perf_counter()
+    from python_api.main import app
+    imported = time.perf_counter()
+    db_created_on_import = os.path.exists(os.environ["PROBE_DB_PATH"])
+    deferred = [name for name in ("sqlalchemy.ext.asyncio", "passlib", "redis") if name in sys.modules]
+    from fastapi.testclient import TestClient
+    with TestClient(app) as client:
+        status = client.get("/categories/").status_code
+    print(json.dumps({
+        "import_s": imported - started,
+        "first_request_s": time.perf_counter() - imported,
+        "db_created_on_import": db_created_on_import,
+        "loaded_heavy_modules": deferred,
+        "status": status,
+    }))
+""")
+
+
+def test_import_and_first_request_budget(tmp_path: Path):
+    db_path = tmp_path / "startup.db"
+    env = {
+        **os.environ,
+        "DATABASE_URL": f"sqlite:///{db_path.as_posix()}",
+        "DB_MODE": "sync",
+        "CREATE_SCHEMA_ON_STARTUP": "true",
+        "PROBE_DB_PATH": str(db_path),
+    }
+    out = subprocess.run(
+        [sys.executable, "-c", PROBE], env=env, capture_output=True, text=True, check=True,
+        cwd=Path(__file__).resolve().parents[1],
+    ).stdout
+    result = json.loads(out.strip().splitlines()[-1])
+
+    # Importing the app has no side effects: no database file, no optional heavy modules
+    assert result["db_created_on_import"] is False
+    assert result["loaded_heavy_modules"] == []
+    # The lifespan created the schema before the first request
+    assert result["status"] == 200
+    assert result["import_s"] < IMPORT_BUDGET_S, result
+    assert result["first_request_s"] < FIRST_REQUEST_BUDGET_S, result
+
+
+def test_serve_creates_schema_once_and_drains_on_sigterm(tmp_path: Path):
+    import signal
+    import socket
+    import threading
+    import time
+    import httpx
+
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+    db_path = tmp_path / "serve.db"
+    env = {
+        **os.environ,
+        "DATABASE_URL": f"sqlite:///{db_path.as_posix()}",
+        "DB_MODE": "sync",
+        "SECRET_KEY": "serve-secret",
+        "BCRYPT_ROUNDS": "4",
+        "RATE_LIMIT_ENABLED": "false",
+        "SERVE_GRACEFUL_TIMEOUT_SECONDS": "10",
+    }
+    server = subprocess.Popen(
+        [sys.executable, "-m", "python_api", "serve", "--host", "127.0.0.1", "--port", str(port),
+         "--workers", "2", "--log-level", "warning"],
+        env=env, stdout=subprocess.PIPE, text=True, cwd=Path(__file__).resolve().parents[1],
+    )
+    try:
+        # The supervisor created the schema before any worker started
+        assert "with 2 worker(s)" in server.stdout.readline()
+        assert db_path.exists()
+        base = f"http://127.0.0.1:{port}"
+        deadline = time.monotonic() + 30
+        while True:
+            try:
+                httpx.get(f"{base}/openapi.json", timeout=1)
+                break
+            except httpx.TransportError:
+                assert time.monotonic() < deadline, "server did not start"
+                time.sleep(0.2)
+        httpx.post(f"{base}/auth/register", json={"email": "serve@example.com", "password": "password123"})
+        token = httpx.post(
+            f"{base}/auth/login", data={"username": "serve@example.com", "password": "password123"}
+        ).json()["accessToken"]
+
+        # A long-poll in flight when SIGTERM arrives still gets its response
+        result = {}
+        poll = threading.Thread(target=lambda: result.update(response=httpx.get(
+            f"{base}/tasks/changes", params={"since": 10**9, "wait": 2},
+            headers={"Authorization": f"Bearer {token}"}, timeout=15,
+        )))
+        poll.start()
+        time.sleep(0.5)
+        server.send_signal(signal.SIGTERM)
+        poll.join(timeout=15)
+        assert result["response"].status_code == 200
+        assert result["response"].json()["changes"] == []
+        assert server.wait(timeout=15) == 0
+    finally:
+        if server.poll() is None:
+            server.kill()
+            server.wait()
+
+
+def test_create_app_settings_apply_per_request(test_client, auth_headers):
+    import pytest
+    from fastapi.testclient import TestClient
+    from python_api.core.config import Settings
+    from python_api.main import create_app
+
+    cfg = Settings()
+    cfg.FAST_JSON_RESPONSES = not cfg.FAST_JSON_RESPONSES
+    cfg.TASK_BATCH_MAX_ITEMS = 2
+    cfg.TASK_CHANGES_MAX_WAIT_SECONDS = 1
+    cfg.TASK_DUE_SOON_HOURS = 5
+    cfg.TASK_IMPORT_MAX_ERRORS = 1
+    client = TestClient(create_app(cfg))
+
+    assert client.get("/tasks/stats", headers=auth_headers).json()["dueSoonHours"] == 5
+    r = client.get("/tasks/changes", params={"wait": 2}, headers=auth_headers)
+    assert r.status_code == 422
+    assert r.json()["error"]["details"] == {"wait": ["Input should be less than or equal to 1"]}
+    r = client.post("/tasks/batch", json={"tasks": [{"title": "t"}] * 3}, headers=auth_headers)
+    assert r.status_code == 422
+    assert "tasks" in r.json()["error"]["details"]
+    assert client.post("/tasks/batch", json={"tasks": [{"title": "t"}] * 2}, headers=auth_headers).status_code == 200
+    r = client.post("/tasks/import", content=b"{}\n{}\n", headers=auth_headers)
+    assert r.json()["rejected"] == 2 and len(r.json()["errors"]) == 1
+    # The module-level app keeps the environment's limits
+    assert test_client.post("/tasks/batch", json={"tasks": [{"title": "t"}] * 3}, headers=auth_headers).status_code == 200
+
+    # DB_MODE is fixed when python_api.database is imported
+    other_mode = Settings()
+    other_mode.DB_MODE = "async" if other_mode.DB_MODE == "sync" else "sync"
+    with pytest.raises(ValueError):
+        create_app(other_mode)
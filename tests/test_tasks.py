@@ -1,3 +1,5 @@
+import uuid
+import pytest
 from datetime import datetime, timedelta, timezone
 
 
@@ -58,3 +60,845 @@ def test_task_crud_and_filters(test_client, auth_headers):
     assert "error" in body and "message" in body["error"]
     assert body.get("path", "").startswith("/tasks/")
 
+
+
+def test_task_cursor_pagination(test_client, auth_headers):
+    created = []
+    for i in range(5):
+        r = test_client.post("/tasks/", json={"title": f"Task {i}"}, headers=auth_headers)
+        assert r.status_code == 201, r.text
+        created.append(r.json()["id"])
+
+    # Offset mode still works and hands out a cursor for the next page
+    r = test_client.get("/tasks/?limit=2", headers=auth_headers)
+    assert r.status_code == 200
+    page = r.json()
+    assert page["pagination"]["offset"] == 0
+    assert page["pagination"]["total"] == 5
+    seen = [t["id"] for t in page["tasks"]]
+    cursor = page["pagination"]["nextCursor"]
+
+    while cursor:
+        r = test_client.get(f"/tasks/?limit=2&cursor={cursor}", headers=auth_headers)
+        assert r.status_code == 200, r.text
+        page = r.json()
+        assert "offset" not in page["pagination"]
+        seen.extend(t["id"] for t in page["tasks"])
+        cursor = page["pagination"]["nextCursor"]
+
+    # Every task exactly once, even when several share the same created_at second
+    assert sorted(seen) == sorted(created)
+
+    r = test_client.get("/tasks/?cursor=not-a-cursor", headers=auth_headers)
+    assert r.status_code == 400
+    assert "error" in r.json()
+
+
+def test_task_sorting_and_range_filters(test_client, auth_headers):
+    category = test_client.post("/categories/", json={"name": "Sorted", "color": "#654321"}).json()["id"]
+    now = datetime.now(timezone.utc)
+    specs = [
+        ("d+2", 2, "low", None),
+        ("undated", None, "high", category),
+        ("d-1", -1, "medium", category),
+        ("d+5", 5, "high", None),
+        ("d+3", 3, "medium", None),
+    ]
+    for title, days, priority, category_id in specs:
+        body = {"title": title, "priority": priority, "categoryId": category_id}
+        if days is not None:
+            body["dueDate"] = (now + timedelta(days=days)).isoformat()
+        r = test_client.post("/tasks/", json=body, headers=auth_headers)
+        assert r.status_code == 201, r.text
+
+    def titles(**params):
+        r = test_client.get("/tasks/", params={"limit": 100, **params}, headers=auth_headers)
+        assert r.status_code == 200, r.text
+        return [t["title"] for t in r.json()["tasks"]]
+
+    # Undated tasks sort after every date; descending is the exact reverse
+    assert titles(sort="dueDate") == ["d-1", "d+2", "d+3", "d+5", "undated"]
+    assert titles(sort="dueDate", order="desc") == ["undated", "d+5", "d+3", "d+2", "d-1"]
+    # low < medium < high, ties in creation order (then id)
+    by_priority = titles(sort="priority")
+    assert by_priority[0] == "d+2"
+    assert set(by_priority[1:3]) == {"d-1", "d+3"} and set(by_priority[3:]) == {"undated", "d+5"}
+    assert titles(sort="priority", order="desc") == by_priority[::-1]
+    assert titles(sort="createdAt", order="desc") == titles()[::-1]
+
+    assert titles(sort="dueDate", dueBefore=(now + timedelta(days=3)).isoformat()) == ["d-1", "d+2"]
+    assert titles(sort="dueDate", dueAfter=now.isoformat()) == ["d+2", "d+3", "d+5"]
+    assert titles(sort="dueDate", dueAfter=now.isoformat(), dueBefore=(now + timedelta(days=4)).isoformat()) == ["d+2", "d+3"]
+    assert set(titles(sort="priority", categoryId=category)) == {"d-1", "undated"}
+    r = test_client.get("/tasks/", params={"categoryId": category, "priority": "high"}, headers=auth_headers)
+    assert r.json()["pagination"]["total"] == 1
+    assert len(titles(createdAfter=(now - timedelta(days=1)).isoformat())) == 5
+    assert titles(createdAfter=(now + timedelta(days=1)).isoformat()) == []
+
+    # Cursor pages follow the requested order, including across the undated tail
+    for sort, order in (("dueDate", "asc"), ("dueDate", "desc"), ("priority", "desc"), ("createdAt", "desc")):
+        seen, params = [], {"sort": sort, "order": order, "limit": 2}
+        while True:
+            page = test_client.get("/tasks/", params=params, headers=auth_headers).json()
+            seen += [t["title"] for t in page["tasks"]]
+            if not page["pagination"]["nextCursor"]:
+                break
+            params["cursor"] = page["pagination"]["nextCursor"]
+        assert seen == titles(sort=sort, order=order)
+    # A cursor only fits the sort it came from
+    first = test_client.get("/tasks/", params={"limit": 1}, headers=auth_headers).json()
+    r = test_client.get("/tasks/", params={"sort": "dueDate", "cursor": first["pagination"]["nextCursor"]}, headers=auth_headers)
+    assert r.status_code == 400
+    assert test_client.get("/tasks/?sort=title", headers=auth_headers).status_code == 422
+
+
+def test_task_list_plans_never_sort(test_client, auth_headers, task_engines, explain_engine):
+    import itertools
+    from sqlalchemy import event
+    from python_api import database
+
+    engines = task_engines
+    if database.engine.dialect.name != "sqlite":
+        pytest.skip("query plans are checked on SQLite")
+    now = datetime.now(timezone.utc)
+    for i in range(3):
+        body = {"title": f"Planned {i}", "dueDate": (now + timedelta(days=i)).isoformat()}
+        test_client.post("/tasks/", json=body, headers=auth_headers)
+
+    statements = []
+    listener = lambda conn, cursor, statement, params, *args: statements.append((statement, params))
+    for engine in engines:
+        event.listen(engine, "before_cursor_execute", listener)
+    try:
+        combinations = itertools.product(
+            (None, "pending"), (None, "medium"), (None, str(uuid.uuid4())), (None, "dueAfter"),
+            (None, now - timedelta(days=1)), ("createdAt", "dueDate", "priority"),
+        )
+        for i, (status, priority, category, due, created, sort) in enumerate(combinations):
+            # Sort is the fastest-varying key, so each sort alternates between both directions
+            params = {"sort": sort, "order": ("asc", "desc")[i % 2], "limit": 1, "status": status, "priority": priority,
+                      "categoryId": category, "createdAfter": created and created.isoformat()}
+            if due:
+                params[due] = now.isoformat()
+            params = {key: value for key, value in params.items() if value is not None}
+            page = test_client.get("/tasks/", params=params, headers=auth_headers).json()
+            if page["pagination"]["nextCursor"]:
+                test_client.get("/tasks/", params={**params, "cursor": page["pagination"]["nextCursor"]}, headers=auth_headers)
+    finally:
+        for engine in engines:
+            event.remove(engine, "before_cursor_execute", listener)
+
+    pages = [(sql, params) for sql, params in statements if "ORDER BY" in sql]
+    assert len(pages) > 96
+    with explain_engine.connect() as conn:
+        for sql, params in pages:
+            plan = " ".join(row[-1] for row in conn.exec_driver_sql("EXPLAIN QUERY PLAN " + sql, tuple(params)))
+            assert "TEMP B-TREE" not in plan, (sql, plan)
+            assert "USING INDEX ix_tasks_user_" in plan, (sql, plan)
+
+
+def test_task_counters_track_mutations(test_client, auth_headers):
+    ids = []
+    for priority in ("low", "high", "high"):
+        r = test_client.post("/tasks/", json={"title": "Counted", "priority": priority}, headers=auth_headers)
+        assert r.status_code == 201, r.text
+        ids.append(r.json()["id"])
+
+    def total(query=""):
+        r = test_client.get(f"/tasks/?limit=1{query}", headers=auth_headers)
+        assert r.status_code == 200, r.text
+        return r.json()["pagination"]["total"]
+
+    assert total() == 3
+    assert total("&priority=high") == 2
+
+    test_client.patch(f"/tasks/{ids[1]}/complete", headers=auth_headers)
+    test_client.put(f"/tasks/{ids[0]}", json={"priority": "medium"}, headers=auth_headers)
+    test_client.delete(f"/tasks/{ids[2]}", headers=auth_headers)
+
+    assert total() == 2
+    assert total("&status=completed") == 1
+    assert total("&status=pending&priority=medium") == 1
+    assert total("&priority=high") == 1
+
+    # Rebuilding from the tasks table yields the same numbers
+    from python_api.__main__ import main
+    main(["rebuild-counters"])
+    assert total() == 2
+    assert total("&status=completed&priority=high") == 1
+
+
+def test_task_change_feed(test_client, auth_headers):
+    from jose import jwt
+
+    def changes(since, **params):
+        r = test_client.get("/tasks/changes", params={"since": since, **params}, headers=auth_headers)
+        assert r.status_code == 200, r.text
+        return r.json()
+
+    head = changes(0)
+    assert head == {"changes": [], "nextSince": 0, "hasMore": False}
+
+    a = test_client.post("/tasks/", json={"title": "Sync A"}, headers=auth_headers).json()
+    b = test_client.post("/tasks/", json={"title": "Sync B"}, headers=auth_headers).json()
+    batch = test_client.post("/tasks/batch", json={"tasks": [{"title": "Sync C"}, {"title": "Sync D"}]}, headers=auth_headers)
+    c, d = (item["id"] for item in batch.json()["results"])
+    feed = changes(0)
+    assert [(item["op"], item["id"]) for item in feed["changes"]] == [("upsert", t) for t in (a["id"], b["id"], c, d)]
+    seqs = [item["seq"] for item in feed["changes"]]
+    assert seqs == sorted(seqs) and feed["nextSince"] == seqs[-1]
+    assert feed["changes"][0]["task"] == a
+
+    # Only what changed after ``since``; a task updated twice shows once, as it is now
+    since = feed["nextSince"]
+    test_client.put(f"/tasks/{a['id']}", json={"title": "Sync A2"}, headers=auth_headers)
+    test_client.patch(f"/tasks/{a['id']}/complete", headers=auth_headers)
+    test_client.delete(f"/tasks/{b['id']}", headers=auth_headers)
+    test_client.request("DELETE", "/tasks/batch", json={"ids": [c]}, headers=auth_headers)
+    feed = changes(since)
+    assert [(item["op"], item["id"]) for item in feed["changes"]] == [("upsert", a["id"]), ("delete", b["id"]), ("delete", c)]
+    assert feed["changes"][0]["task"]["title"] == "Sync A2"
+    assert feed["changes"][0]["task"]["status"] == "completed"
+    assert feed["changes"][1]["task"] is None
+
+    # Batches of ``limit`` entries
+    first = changes(since, limit=2)
+    assert first["hasMore"] is True
+    rest = changes(first["nextSince"], limit=2)
+    assert rest["hasMore"] is False and rest["nextSince"] == feed["nextSince"]
+    assert [item["id"] for item in first["changes"] + rest["changes"]] == [item["id"] for item in feed["changes"]]
+
+    # Nothing new: a long-poll waits out ``wait`` and returns the same position
+    assert changes(feed["nextSince"], wait=1) == {"changes": [], "nextSince": feed["nextSince"], "hasMore": False}
+
+    # Server-Sent Events
+    r = test_client.get(
+        "/tasks/changes", params={"wait": 1}, headers={**auth_headers, "Accept": "text/event-stream", "Last-Event-ID": str(since)}
+    )
+    assert r.status_code == 200
+    assert r.headers["content-type"].startswith("text/event-stream")
+    events = [block.splitlines() for block in r.text.strip().split("\n\n") if block.startswith("id:")]
+    assert [lines[1] for lines in events] == ["event: upsert", "event: delete", "event: delete"]
+    assert [lines[0] for lines in events][-1] == f"id: {feed['nextSince']}"
+
+    # Compaction keeps one entry per live task; dropped tombstones make older positions expire
+    from python_api.__main__ import main
+    user_id = jwt.get_unverified_claims(auth_headers["Authorization"].split()[1])["sub"]
+    main(["compact-changes", "--user", user_id])
+    compacted = changes(0)["changes"]
+    assert [(item["op"], item["id"]) for item in compacted] == [("upsert", d), ("upsert", a["id"]), ("delete", b["id"]), ("delete", c)]
+    main(["compact-changes", "--user", user_id, "--retention-days", "-1"])
+    r = test_client.get("/tasks/changes", params={"since": 0}, headers=auth_headers)
+    assert r.status_code == 410
+    assert r.json()["error"]["message"].startswith("Changes since this point were compacted")
+    assert changes(feed["nextSince"])["changes"] == []
+
+
+def test_task_change_long_poll_wakes_on_write(test_client, auth_headers):
+    import asyncio
+    import time
+    import httpx
+
+    since = test_client.get("/tasks/changes", headers=auth_headers).json()["nextSince"]
+
+    async def scenario():
+        transport = httpx.ASGITransport(app=test_client.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test", headers=auth_headers) as client:
+            started = time.perf_counter()
+            poll = asyncio.ensure_future(client.get("/tasks/changes", params={"since": since, "wait": 20}))
+            await asyncio.sleep(0.2)
+            created = await client.post("/tasks/", json={"title": "Wake up"})
+            return created.json(), await poll, time.perf_counter() - started
+
+    task, r, elapsed = asyncio.run(scenario())
+    assert r.status_code == 200
+    assert [item["id"] for item in r.json()["changes"]] == [task["id"]]
+    # Woken by the write, not by the poll interval or the end of the wait
+    assert elapsed < 3
+
+
+def test_due_dates_with_utc_offsets(test_client, auth_headers, auth_user_id):
+    # 10:00+05:00 is 05:00Z, whichever route writes it
+    local = "2030-01-01T10:00:00+05:00"
+    test_client.post("/tasks/", json={"title": "post", "dueDate": local}, headers=auth_headers)
+    test_client.post("/tasks/batch", json={"tasks": [{"title": "batch", "dueDate": local}]}, headers=auth_headers)
+    test_client.post("/tasks/import", content=f'{{"title": "import", "dueDate": "{local}"}}\n'.encode(), headers=auth_headers)
+    put = test_client.post("/tasks/", json={"title": "put"}, headers=auth_headers).json()
+    r = test_client.put(f"/tasks/{put['id']}", json={"dueDate": local}, headers=auth_headers)
+    assert r.json()["dueDate"].startswith("2030-01-01T05:00:00")
+    patched = test_client.post("/tasks/", json={"title": "patch"}, headers=auth_headers).json()
+    test_client.patch("/tasks/batch", json={"tasks": [{"id": patched["id"], "dueDate": local}]}, headers=auth_headers)
+
+    def titles(**params):
+        return sorted(t["title"] for t in test_client.get("/tasks/", params=params, headers=auth_headers).json()["tasks"])
+
+    everything = ["batch", "import", "patch", "post", "put"]
+    assert titles(dueBefore="2030-01-01T06:00:00Z") == everything
+    assert titles(dueAfter="2030-01-01T04:00:00Z") == everything
+    assert titles(dueAfter="2030-01-01T07:00:00Z") == []
+    assert titles(dueBefore="2030-01-01T09:00:00+05:00") == []
+
+    # Overdue / due soon compare instants, not wall-clock times
+    now = datetime.now(timezone.utc)
+    plus5, minus8 = timezone(timedelta(hours=5)), timezone(timedelta(hours=-8))
+    for title, due in (("overdue", (now - timedelta(hours=2)).astimezone(plus5)), ("soon", (now + timedelta(hours=3)).astimezone(minus8))):
+        test_client.post("/tasks/", json={"title": title, "dueDate": due.isoformat()}, headers=auth_headers)
+    stats = test_client.get("/tasks/stats", headers=auth_headers).json()
+    assert (stats["overdue"], stats["dueSoon"]) == (1, 1)
+
+    # Due dates stored as local time before this are shifted once by the operator
+    from python_api.__main__ import main
+    main(["shift-due-dates", "--utc-offset", "+05:00", "--user", auth_user_id])
+    assert titles(dueAfter="2029-12-31T23:30:00Z", dueBefore="2030-01-01T00:30:00Z") == everything
+
+
+def test_create_schema_backfills_new_counter_tables(tmp_path):
+    from sqlalchemy import create_engine, func, insert, select
+    from python_api import database
+    from python_api.models.task import Task, TaskPriority, TaskStatus
+    from python_api.models.task_counter import TaskCategoryCounter, TaskCounter
+
+    engine = create_engine(f"sqlite:///{(tmp_path / 'upgrade.db').as_posix()}")
+    try:
+        # A database from before the counters: tasks, but no counter tables
+        database.create_schema(bind=engine)
+        TaskCounter.__table__.drop(engine)
+        TaskCategoryCounter.__table__.drop(engine)
+        with engine.begin() as conn:
+            conn.execute(insert(Task), [
+                {"id": str(uuid.uuid4()), "title": f"old {i}", "user_id": "u", "status": TaskStatus.pending,
+                 "priority": TaskPriority.low, "category_id": "c" if i else None}
+                for i in range(3)
+            ])
+        database.create_schema(bind=engine)
+        with engine.connect() as conn:
+            assert conn.execute(select(func.sum(TaskCounter.count))).scalar() == 3
+            assert conn.execute(select(TaskCategoryCounter.count).where(TaskCategoryCounter.category_id == "c")).scalar() == 2
+    finally:
+        engine.dispose()
+
+
+def test_task_stats(test_client, auth_headers, task_engines, explain_engine):
+    from sqlalchemy import event, text
+    from python_api import database
+
+    cats = [test_client.post("/categories/", json={"name": f"Stats {i}", "color": "#123456"}).json()["id"] for i in range(2)]
+    now = datetime.now(timezone.utc)
+    due = lambda hours: (now + timedelta(hours=hours)).isoformat().replace("+00:00", "Z")
+    created = [
+        test_client.post("/tasks/", json=body, headers=auth_headers).json()
+        for body in (
+            {"title": "Overdue", "dueDate": due(-5), "categoryId": cats[0], "priority": "high"},
+            {"title": "Soon", "dueDate": due(3), "categoryId": cats[0]},
+            {"title": "Later", "dueDate": due(24 * 7), "categoryId": cats[1]},
+            {"title": "Undated"},
+            {"title": "Soon too", "dueDate": due(2)},
+            {"title": "Done overdue", "dueDate": due(-1), "status": "completed"},
+        )
+    ]
+    test_client.put(f"/tasks/{created[2]['id']}", json={"categoryId": cats[0]}, headers=auth_headers)
+    test_client.put(f"/tasks/{created[3]['id']}", json={"categoryId": cats[1]}, headers=auth_headers)
+    test_client.delete(f"/tasks/{created[1]['id']}", headers=auth_headers)
+    test_client.patch("/tasks/batch", json={"tasks": [{"id": created[0]["id"], "categoryId": None}]}, headers=auth_headers)
+
+    engines = task_engines
+    statements = []
+    listener = lambda conn, cursor, statement, *args: statements.append(statement)
+    for engine in engines:
+        event.listen(engine, "before_cursor_execute", listener)
+    try:
+        r = test_client.get("/tasks/stats", headers=auth_headers)
+    finally:
+        for engine in engines:
+            event.remove(engine, "before_cursor_execute", listener)
+    assert r.status_code == 200, r.text
+    stats = r.json()
+    assert stats == {
+        "total": 5,
+        "byStatus": {"pending": 4, "completed": 1},
+        "byPriority": {"low": 0, "medium": 4, "high": 1},
+        "byCategory": {cats[0]: 1, cats[1]: 1},
+        "uncategorized": 3,
+        "overdue": 1,
+        "dueSoon": 1,
+        "dueSoonHours": 24,
+    }
+    # Counters (status/priority, category) and one due_date range count
+    assert len(statements) == 3
+
+    # Rebuilt counters agree with the incremental ones, and list ETags (which carry the total) go stale
+    from python_api.__main__ import main
+    etag = test_client.get("/tasks/", headers=auth_headers).headers["etag"]
+    main(["rebuild-counters"])
+    assert test_client.get("/tasks/stats", headers=auth_headers).json() == stats
+    assert test_client.get("/tasks/", headers={**auth_headers, "If-None-Match": etag}).status_code == 200
+
+    with explain_engine.connect() as conn:
+        plan = " ".join(str(row[-1]) for row in conn.execute(text(
+            "EXPLAIN QUERY PLAN SELECT count(*) FROM tasks WHERE user_id = 'u' AND status = 'pending' "
+            "AND coalesce(due_date, '9999-12-31 23:59:59.999999') < '2030-01-01'"
+        )))
+    assert "ix_tasks_user_status_due_created" in plan
+
+
+def test_include_category_and_fields(test_client, auth_headers, task_engines):
+    from sqlalchemy import event, update
+    from python_api import database
+    from python_api.models.category import Category
+
+    category = test_client.post("/categories/", json={"name": f"Embed {uuid.uuid4().hex[:6]}", "color": "#112233"}).json()
+    ids = []
+    for i in range(12):
+        body = {"title": f"Embed {i}", "categoryId": category["id"] if i % 2 else None}
+        ids.append(test_client.post("/tasks/", json=body, headers=auth_headers).json()["id"])
+
+    engines = task_engines
+
+    def get(url, **params):
+        statements = []
+        listener = lambda conn, cursor, statement, *args: statements.append(statement)
+        for engine in engines:
+            event.listen(engine, "before_cursor_execute", listener)
+        try:
+            r = test_client.get(url, params=params, headers=auth_headers)
+        finally:
+            for engine in engines:
+                event.remove(engine, "before_cursor_execute", listener)
+        assert r.status_code == 200, r.text
+        return r, statements
+
+    # One JOIN per page: the same number of statements for 2 or 12 rows
+    small, small_statements = get("/tasks/", include="category", limit=2)
+    r, statements = get("/tasks/", include="category", limit=12)
+    assert len(statements) == len(small_statements)
+    # Tasks created within the same second are ordered by id
+    tasks = {t["id"]: t for t in r.json()["tasks"]}
+    assert set(tasks) == set(ids)
+    assert tasks[ids[1]]["category"] == {"id": category["id"], "name": category["name"], "color": "#112233"}
+    assert tasks[ids[0]]["category"] is None
+    plain = test_client.get(f"/tasks/{ids[1]}", headers=auth_headers).json()
+    assert {k: v for k, v in tasks[ids[1]].items() if k != "category"} == plain
+
+    # fields= selects and returns only those columns (plus the cursor's sort keys)
+    r, statements = get("/tasks/", fields="id,title", limit=5)
+    assert [set(t) for t in r.json()["tasks"]] == [{"id", "title"}] * 5
+    page = next(sql for sql in statements if "LIMIT" in sql)
+    assert "tasks.description" not in page and "tasks.title" in page
+    cursor, seen = None, []
+    while True:
+        params = {"fields": "title", "include": "category", "limit": 5, **({"cursor": cursor} if cursor else {})}
+        body = get("/tasks/", **params)[0].json()
+        seen += [(t["title"], t["category"] is not None) for t in body["tasks"]]
+        cursor = body["pagination"]["nextCursor"]
+        if cursor is None:
+            break
+    assert sorted(seen) == sorted((f"Embed {i}", bool(i % 2)) for i in range(12))
+    assert test_client.get("/tasks/?fields=title,nope", headers=auth_headers).status_code == 400
+    assert test_client.get("/tasks/?include=user", headers=auth_headers).status_code == 422
+
+    one = get(f"/tasks/{ids[3]}", fields="title,categoryId", include="category")[0]
+    assert one.json() == {"title": "Embed 3", "categoryId": category["id"], "category": {"id": category["id"], "name": category["name"], "color": "#112233"}}
+
+    # A category edit changes the ETag of lists that embed it, though no task changed
+    r = test_client.get("/tasks/?include=category&limit=2", headers=auth_headers)
+    etag = r.headers["etag"]
+    assert test_client.get("/tasks/?include=category&limit=2", headers={**auth_headers, "If-None-Match": etag}).status_code == 304
+    db = database.SessionLocal()
+    try:
+        db.execute(update(Category).where(Category.id == category["id"]).values(color="#445566"))
+        db.commit()
+    finally:
+        db.close()
+    r = test_client.get("/tasks/?include=category&limit=2", headers={**auth_headers, "If-None-Match": etag})
+    assert r.status_code == 200
+    assert {t["category"]["color"] for t in r.json()["tasks"] if t["category"]} <= {"#445566"}
+    assert test_client.get(f"/tasks/{ids[1]}?include=category", headers=auth_headers).json()["category"]["color"] == "#445566"
+
+
+def test_task_batch_endpoints(test_client, auth_headers):
+    cat = test_client.post("/categories/", json={"name": "Batch"}).json()
+    r = test_client.post(
+        "/tasks/batch",
+        json={"tasks": [
+            {"title": "One", "priority": "high", "categoryId": cat["id"]},
+            {"title": ""},
+            {"title": "Two"},
+        ]},
+        headers=auth_headers,
+    )
+    assert r.status_code == 200, r.text
+    results = r.json()["results"]
+    assert [item["status"] for item in results] == [201, 422, 201]
+    assert "title" in results[1]["error"]["details"]
+    assert results[0]["task"]["categoryId"] == cat["id"]
+    assert results[0]["task"]["created_at"]
+    one, two = results[0]["id"], results[2]["id"]
+
+    r = test_client.patch(
+        "/tasks/batch",
+        json={"tasks": [
+            {"id": one, "status": "completed"},
+            {"id": two, "title": "Two (renamed)", "priority": "low"},
+            {"id": str(uuid.uuid4()), "status": "completed"},
+            {"id": two, "title": None},
+        ]},
+        headers=auth_headers,
+    )
+    assert r.status_code == 200, r.text
+    results = r.json()["results"]
+    assert [item["status"] for item in results] == [200, 200, 404, 422]
+    assert results[0]["task"]["status"] == "completed"
+    assert results[1]["task"]["title"] == "Two (renamed)"
+    assert results[1]["task"]["updated_at"]
+
+    r = test_client.get("/tasks/?status=completed&priority=high&limit=1", headers=auth_headers)
+    assert r.json()["pagination"]["total"] == 1
+
+    r = test_client.request("DELETE", "/tasks/batch", json={"ids": [one, two, one]}, headers=auth_headers)
+    assert r.status_code == 200, r.text
+    assert [item["status"] for item in r.json()["results"]] == [204, 204, 404]
+    r = test_client.get("/tasks/?limit=1", headers=auth_headers)
+    assert r.json()["pagination"]["total"] == 0
+
+
+def test_task_export_streams_ndjson_and_csv(test_client, auth_headers):
+    import csv
+    import gzip
+    import io
+    import json
+
+    for i, priority in enumerate(("low", "high", "high")):
+        test_client.post("/tasks/", json={"title": f"Export {i}", "priority": priority}, headers=auth_headers)
+    listed = test_client.get("/tasks/?priority=high", headers=auth_headers).json()["tasks"]
+
+    r = test_client.get("/tasks/export?priority=high", headers=auth_headers)
+    assert r.status_code == 200, r.text
+    assert r.headers["content-type"].startswith("application/x-ndjson")
+    rows = [json.loads(line) for line in r.text.splitlines()]
+    # Same objects as the paginated listing, in the same order
+    assert rows == listed
+
+    r = test_client.get("/tasks/export?format=csv&gzip=true", headers=auth_headers)
+    assert r.status_code == 200
+    assert r.headers["content-encoding"] == "gzip"
+    # httpx decodes Content-Encoding transparently; the raw stream is gzip
+    body = r.text if not r.content.startswith(b"\x1f\x8b") else gzip.decompress(r.content).decode()
+    records = list(csv.DictReader(io.StringIO(body)))
+    assert len(records) == 3
+    assert {rec["title"] for rec in records} == {"Export 0", "Export 1", "Export 2"}
+
+    r = test_client.get("/tasks/export?format=csv&status=completed", headers=auth_headers)
+    assert r.text.strip() == "id,title,description,status,priority,dueDate,categoryId,created_at,updated_at"
+
+
+def test_task_import_ndjson(test_client, auth_headers):
+    import json
+
+    lines = [json.dumps({"title": f"Imported {i}", "priority": "low"}) for i in range(5)]
+    lines.insert(2, "{not json")
+    lines.insert(4, json.dumps({"title": ""}))
+    lines.insert(5, "")
+    body = ("\n".join(lines) + "\n").encode()
+
+    def chunks():
+        # Split mid-line to exercise incremental parsing
+        for start in range(0, len(body), 7):
+            yield body[start:start + 7]
+
+    r = test_client.post(
+        "/tasks/import", content=chunks(), headers={**auth_headers, "Content-Type": "application/x-ndjson"}
+    )
+    assert r.status_code == 200, r.text
+    result = r.json()
+    assert result["inserted"] == 5
+    assert result["rejected"] == 2
+    assert [e["line"] for e in result["errors"]] == [3, 5]
+    assert result["errors"][0]["error"]["details"] == {"__root__": ["Invalid JSON"]}
+    assert "title" in result["errors"][1]["error"]["details"]
+
+    r = test_client.get("/tasks/?priority=low", headers=auth_headers)
+    assert r.json()["pagination"]["total"] == 5
+
+
+def test_ndjson_line_splitter_bounds_line_length():
+    import asyncio
+    from python_api.services.task_import import iter_ndjson_lines
+
+    async def collect(parts):
+        async def chunks():
+            for part in parts:
+                yield part
+        return [item async for item in iter_ndjson_lines(chunks(), max_line_bytes=8)]
+
+    lines = asyncio.run(collect([b'{"a"', b':1}\n' + b"x" * 20, b"y" * 20 + b"\nshort\nlast"]))
+    assert lines == [(1, b'{"a":1}'), (2, None), (3, b"short"), (4, b"last")]
+
+
+def test_fast_json_matches_response_model_output(test_client, auth_headers):
+    from python_api.core.config import settings
+
+    cat = test_client.post("/categories/", json={"name": "Golden", "color": "#00ff00"}).json()
+    payloads = [
+        {"title": "Plain"},
+        {"title": "Ünïcode ✓ \"quoted\"", "description": "line\nbreak", "priority": "high",
+         "dueDate": "2030-01-02T03:04:05.678901Z", "categoryId": cat["id"]},
+        {"title": "Offset due", "dueDate": "2030-06-01T12:00:00+02:00", "status": "completed"},
+    ]
+    ids = [test_client.post("/tasks/", json=p, headers=auth_headers).json()["id"] for p in payloads]
+    test_client.put(f"/tasks/{ids[0]}", json={"description": "now with updated_at"}, headers=auth_headers)
+
+    urls = ["/tasks/?limit=2", "/tasks/?status=completed", "/tasks/?priority=high&limit=1"] + [f"/tasks/{i}" for i in ids]
+    first_page = test_client.get(urls[0], headers=auth_headers).json()
+    urls.append(f"/tasks/?limit=2&cursor={first_page['pagination']['nextCursor']}")
+
+    def fetch(fast):
+        settings.FAST_JSON_RESPONSES = fast
+        try:
+            responses = [test_client.get(url, headers=auth_headers) for url in urls]
+        finally:
+            settings.FAST_JSON_RESPONSES = True
+        assert all(r.status_code == 200 for r in responses)
+        return responses
+
+    from python_api.services import task_serialization
+
+    slow_responses = fetch(False)
+    fast_responses = fetch(True)
+    orjson = task_serialization.orjson
+    task_serialization.orjson = None  # stdlib json fallback
+    try:
+        fallback_responses = fetch(True)
+    finally:
+        task_serialization.orjson = orjson
+    for slow, fast, fallback in zip(slow_responses, fast_responses, fallback_responses):
+        assert fast.content == slow.content
+        assert fallback.content == slow.content
+        assert fast.headers["content-type"] == slow.headers["content-type"]
+    task = test_client.get(f"/tasks/{ids[1]}", headers=auth_headers).json()
+    assert list(task) == ["title", "description", "status", "priority", "dueDate", "categoryId", "id", "created_at", "updated_at"]
+
+
+def test_concurrent_if_match_updates(test_client, auth_headers, monkeypatch):
+    import threading
+    from python_api.routers import tasks as tasks_router
+
+    task = test_client.post("/tasks/", json={"title": "Contended", "priority": "medium"}, headers=auth_headers)
+    url, etag = f"/tasks/{task.json()['id']}", task.headers["etag"]
+
+    # Both requests read the task (and pass If-Match) before either writes
+    barrier, lock, calls = threading.Barrier(2, timeout=10), threading.Lock(), []
+    get_owned_task = tasks_router._get_owned_task
+
+    def racing_get_owned_task(*args):
+        found = get_owned_task(*args)
+        with lock:
+            calls.append(None)
+            first_read = len(calls) <= 2
+        if first_read:
+            barrier.wait()
+        return found
+
+    monkeypatch.setattr(tasks_router, "_get_owned_task", racing_get_owned_task)
+    statuses = []
+
+    def put(priority):
+        r = test_client.put(url, json={"priority": priority}, headers={**auth_headers, "If-Match": etag})
+        statuses.append(r.status_code)
+
+    threads = [threading.Thread(target=put, args=(priority,)) for priority in ("high", "low")]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(timeout=30)
+    assert sorted(statuses) == [200, 412]
+
+    winner = test_client.get(url, headers=auth_headers).json()["priority"]
+    counts = test_client.get("/tasks/stats", headers=auth_headers).json()["byPriority"]
+    assert counts == {"low": 0, "medium": 0, "high": 0, winner: 1}
+
+
+def test_etags_and_conditional_requests(test_client, auth_headers, auth_user_id):
+    from sqlalchemy import event
+    from python_api import database
+
+    task = test_client.post("/tasks/", json={"title": "Cached"}, headers=auth_headers).json()
+    r = test_client.get("/tasks/?limit=5", headers=auth_headers)
+    list_etag = r.headers["etag"]
+
+    engine = database.user_engine(auth_user_id)
+    statements = []
+    listener = lambda conn, cursor, statement, *args: statements.append(statement)
+    event.listen(engine, "before_cursor_execute", listener)
+    try:
+        r = test_client.get("/tasks/?limit=5", headers={**auth_headers, "If-None-Match": list_etag})
+    finally:
+        event.remove(engine, "before_cursor_execute", listener)
+    assert r.status_code == 304
+    assert r.headers["etag"] == list_etag
+    assert not any("FROM tasks" in s for s in statements)
+
+    # Different query parameters, different ETag
+    assert test_client.get("/tasks/?limit=6", headers=auth_headers).headers["etag"] != list_etag
+
+    r = test_client.get(f"/tasks/{task['id']}", headers=auth_headers)
+    task_etag = r.headers["etag"]
+    r = test_client.get(f"/tasks/{task['id']}", headers={**auth_headers, "If-None-Match": task_etag})
+    assert r.status_code == 304
+
+    # Optimistic concurrency on PUT
+    r = test_client.put(f"/tasks/{task['id']}", json={"title": "v2"}, headers={**auth_headers, "If-Match": task_etag})
+    assert r.status_code == 200, r.text
+    new_etag = r.headers["etag"]
+    assert new_etag != task_etag
+    r = test_client.put(f"/tasks/{task['id']}", json={"title": "v3"}, headers={**auth_headers, "If-Match": task_etag})
+    assert r.status_code == 412
+    assert r.json()["error"]["message"] == "Task has been modified"
+    assert test_client.get(f"/tasks/{task['id']}", headers=auth_headers).headers["etag"] == new_etag
+
+    # Any mutation moves the list version
+    r = test_client.get("/tasks/?limit=5", headers={**auth_headers, "If-None-Match": list_etag})
+    assert r.status_code == 200
+    assert r.headers["etag"] != list_etag
+
+    # An empty PUT changes nothing: no change-log entry, list ETag still valid
+    list_etag = r.headers["etag"]
+    since = test_client.get("/tasks/changes", params={"since": 0, "limit": 1000}, headers=auth_headers).json()["nextSince"]
+    r = test_client.put(f"/tasks/{task['id']}", json={}, headers=auth_headers)
+    assert r.status_code == 200 and r.json()["title"] == "v2"
+    assert test_client.get("/tasks/changes", params={"since": since}, headers=auth_headers).json()["changes"] == []
+    assert test_client.get("/tasks/?limit=5", headers={**auth_headers, "If-None-Match": list_etag}).status_code == 304
+
+    # Explicit nulls on NOT NULL fields are a validation error, not a 500
+    for field in ("title", "status", "priority"):
+        r = test_client.put(f"/tasks/{task['id']}", json={field: None}, headers=auth_headers)
+        assert r.status_code == 422, r.text
+        assert r.json()["error"]["details"] == {field: ["Field cannot be null"]}
+    assert test_client.get(f"/tasks/{task['id']}", headers=auth_headers).json()["title"] == "v2"
+
+
+def test_task_search(test_client, auth_headers):
+    def create(title, **extra):
+        r = test_client.post("/tasks/", json={"title": title, **extra}, headers=auth_headers)
+        assert r.status_code == 201, r.text
+        return r.json()
+
+    groceries = create("Buy groceries", description="milk and eggs", priority="high")
+    create("Write report", description="quarterly groceries budget")
+    create("Call plumber", priority="high")
+
+    r = test_client.get("/tasks/?q=groceries", headers=auth_headers)
+    assert r.status_code == 200, r.text
+    body = r.json()
+    # Title matches outrank description matches
+    assert [t["title"] for t in body["tasks"]] == ["Buy groceries", "Write report"]
+    assert body["pagination"]["total"] == 2
+    assert body["pagination"]["nextCursor"] is None
+
+    # Prefix match on the last word, combined with filters
+    r = test_client.get("/tasks/?q=grocer&priority=high", headers=auth_headers)
+    assert [t["id"] for t in r.json()["tasks"]] == [groceries["id"]]
+    assert test_client.get("/tasks/?q=milk eggs", headers=auth_headers).json()["pagination"]["total"] == 1
+    # FTS5 syntax in user input is treated as plain words
+    assert test_client.get('/tasks/?q="OR*(', headers=auth_headers).json()["tasks"] == []
+
+    # Cursor pagination is not available for ranked results
+    assert test_client.get("/tasks/?q=groceries&cursor=abc", headers=auth_headers).status_code == 400
+
+    # Index follows updates and deletes
+    test_client.put(f"/tasks/{groceries['id']}", json={"title": "Buy vegetables", "description": None}, headers=auth_headers)
+    assert [t["title"] for t in test_client.get("/tasks/?q=groceries", headers=auth_headers).json()["tasks"]] == ["Write report"]
+    assert test_client.get("/tasks/?q=vegetables", headers=auth_headers).json()["pagination"]["total"] == 1
+    test_client.delete(f"/tasks/{groceries['id']}", headers=auth_headers)
+    assert test_client.get("/tasks/?q=vegetables", headers=auth_headers).json()["tasks"] == []
+
+    # Other users never see these tasks
+    email = f"other_{uuid.uuid4().hex[:8]}@example.com"
+    test_client.post("/auth/register", json={"email": email, "password": "password123"})
+    token = test_client.post("/auth/login", data={"username": email, "password": "password123"}).json()["accessToken"]
+    r = test_client.get("/tasks/?q=groceries", headers={"Authorization": f"Bearer {token}"})
+    assert r.json()["tasks"] == []
+
+
+def test_single_statement_mutations(test_client, auth_headers, auth_user_id):
+    from sqlalchemy import event
+    from python_api import database
+
+    engine = database.user_engine(auth_user_id)
+    if not engine.dialect.update_returning:
+        pytest.skip("database has no RETURNING; mutations use the read-modify-write path")
+
+    def run(method, url, **kwargs):
+        statements = []
+        listener = lambda conn, cursor, statement, *args: statements.append(statement)
+        event.listen(engine, "before_cursor_execute", listener)
+        try:
+            r = test_client.request(method, url, headers=auth_headers, **kwargs)
+        finally:
+            event.remove(engine, "before_cursor_execute", listener)
+        return r, len(statements)
+
+    # INSERT ... RETURNING, counter, change log, list version
+    r, count = run("POST", "/tasks/", json={"title": "One shot", "priority": "low"})
+    assert r.status_code == 201, r.text
+    assert count == 4
+    task = r.json()
+    assert task["created_at"] is not None
+    url = f"/tasks/{task['id']}"
+
+    # UPDATE ... RETURNING, change log, list version
+    r, count = run("PUT", url, json={"title": "Renamed"})
+    assert r.status_code == 200 and r.json()["title"] == "Renamed"
+    assert r.json()["updated_at"] is not None
+    assert count == 3
+    # Moving between counters adds the two counter writes
+    r, count = run("PUT", url, json={"priority": "high"})
+    assert r.json()["priority"] == "high"
+    assert count == 5
+
+    r, count = run("PATCH", f"{url}/complete")
+    assert r.json()["status"] == "completed"
+    assert count == 5
+    r, count = run("PATCH", f"{url}/complete")
+    assert r.status_code == 200 and r.json()["status"] == "completed"
+    assert count == 2
+
+    totals = lambda query: test_client.get(f"/tasks/?{query}", headers=auth_headers).json()["pagination"]["total"]
+    assert totals("status=completed&priority=high") == 1
+    assert totals("priority=low") == 0
+
+    r, count = run("DELETE", url)
+    assert r.status_code == 204
+    assert count == 4
+    assert totals("status=completed") == 0
+
+    # Zero rows affected is a 404
+    r, count = run("DELETE", url)
+    assert r.status_code == 404 and count == 1
+    r, count = run("PUT", url, json={"title": "Gone"})
+    assert r.status_code == 404
+    r, count = run("PUT", url, json={"status": "pending"})
+    assert r.status_code == 404
+    assert test_client.patch(f"{url}/complete", headers=auth_headers).status_code == 404
+
+
+def test_mutations_without_returning(test_client, auth_headers, monkeypatch):
+    from python_api.routers import tasks as tasks_router
+
+    monkeypatch.setattr(tasks_router, "_supports_returning", lambda db, kind: False)
+    task = test_client.post("/tasks/", json={"title": "Fallback"}, headers=auth_headers).json()
+    url = f"/tasks/{task['id']}"
+    r = test_client.put(url, json={"priority": "high"}, headers=auth_headers)
+    assert r.status_code == 200 and r.json()["priority"] == "high"
+    assert r.headers["etag"] == test_client.get(url, headers=auth_headers).headers["etag"]
+    assert test_client.patch(f"{url}/complete", headers=auth_headers).json()["status"] == "completed"
+    assert test_client.get("/tasks/?status=completed&priority=high", headers=auth_headers).json()["pagination"]["total"] == 1
+    # Completing again changes nothing: no change-feed entry, list ETag still valid
+    listing = test_client.get("/tasks/", headers=auth_headers)
+    feed = test_client.get("/tasks/changes", headers=auth_headers).json()
+    assert test_client.patch(f"{url}/complete", headers=auth_headers).json()["status"] == "completed"
+    assert test_client.get("/tasks/changes", params={"since": feed["nextSince"]}, headers=auth_headers).json()["changes"] == []
+    assert test_client.get("/tasks/", headers={**auth_headers, "If-None-Match": listing.headers["etag"]}).status_code == 304
+    assert test_client.get("/tasks/?status=completed&priority=high", headers=auth_headers).json()["pagination"]["total"] == 1
+    assert test_client.delete(url, headers=auth_headers).status_code == 204
+    assert test_client.delete(url, headers=auth_headers).status_code == 404
+    assert test_client.get("/tasks/?status=completed", headers=auth_headers).json()["pagination"]["total"] == 0